@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from ....core.database import get_db
+from ....core.database import get_read_db, get_write_db
+from ....core.query_guard import query_budget
 from ....schemas.user import TokenResponse, GoogleLoginURLResponse, UserResponse, UserRoleResponse
 from ....schemas.company import CompanyResponse
 from ....schemas.student import StudentResponse
 from ....crud import user as crud_user, student as crud_student, company as crud_company
 from ....utils.google_oauth import GoogleOAuth
-from ....utils.auth import create_access_token, get_current_user
-from ....models.user import User
+from ....utils.auth import create_access_token, get_current_identity
 
 router = APIRouter()
 
 
 @router.get("/google/login", response_model=GoogleLoginURLResponse)
+@query_budget(0)
 async def google_login(role: str = Query("student")):
     """
     Returns the Google OAuth2 login URL for user authentication.
@@ -23,7 +24,7 @@ async def google_login(role: str = Query("student")):
     to Google's consent screen where they can grant permission to access their profile.
     """
     try:
-        auth_url = GoogleOAuth.get_authorization_url(state=role)
+        auth_url = await GoogleOAuth.get_authorization_url(state=role)
         return GoogleLoginURLResponse(url=auth_url)
     except Exception as e:
         raise HTTPException(
@@ -33,12 +34,13 @@ async def google_login(role: str = Query("student")):
 
 
 @router.get("/google/callback", response_model=TokenResponse)
+@query_budget(5)
 async def google_callback(
     code: Optional[str] = Query(None),
     state: Optional[str] = Query(None),
     role: Optional[str] = Query(None),
     error: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_write_db)
 ):
     """
     Handles the OAuth2 callback from Google after user consent.
@@ -69,7 +71,7 @@ async def google_callback(
         )
 
     try:
-        token_data = GoogleOAuth.exchange_code_for_token(code)
+        token_data = await GoogleOAuth.exchange_code_for_token(code)
         access_token = token_data.get("access_token")
 
         if not access_token:
@@ -78,7 +80,7 @@ async def google_callback(
                 detail="Failed to obtain access token"
             )
 
-        user_info = GoogleOAuth.get_user_info(access_token)
+        user_info = await GoogleOAuth.get_user_info_from_tokens(token_data)
 
         email = user_info.get("email")
         google_id = user_info.get("id")
@@ -92,16 +94,16 @@ async def google_callback(
                 detail="Failed to retrieve user information from Google"
             )
 
-        user = crud_user.get_user_by_google_id(db, google_id)
+        user = await db.run_sync(crud_user.get_user_by_google_id, google_id)
         user_role = state or role or "student"
 
         if not user:
-            user = crud_user.get_user_by_email(db, email)
+            user = await db.run_sync(crud_user.get_user_by_email, email)
             if user:
-                user = crud_user.update_user_oauth_info(db, user, google_id, picture)
+                user = await db.run_sync(crud_user.update_user_oauth_info, user, google_id, picture)
             else:
-                user = crud_user.create_user(
-                    db=db,
+                user = await db.run_sync(
+                    crud_user.create_user,
                     email=email,
                     first_name=given_name,
                     last_name=family_name,
@@ -114,7 +116,7 @@ async def google_callback(
 
         user_status = "pending"
         if user_role == "student":
-            student = crud_student.get_student_by_user_id(db, user.id)
+            student = await db.run_sync(crud_student.get_student_by_user_id, user.id)
             if student:
                 user_status = "approved"
             # TODO: Tempory disable error while debugging
@@ -126,7 +128,7 @@ async def google_callback(
             )
             # --------------------------
         else:
-            company = crud_company.get_company_by_user_id(db, user.id)
+            company = await db.run_sync(crud_company.get_company_by_user_id, user.id)
             if company:
                 user_status = "approved"
             # TODO: Tempory disable error while debugging
@@ -138,7 +140,7 @@ async def google_callback(
             )
             # --------------------------
 
-        jwt_token = create_access_token(data={"sub": user.id})
+        jwt_token = create_access_token(data={"sub": str(user.id)})
 
         user_response = UserResponse.from_orm(user)
         user_dict = user_response.model_dump()
@@ -161,7 +163,8 @@ async def google_callback(
 
 
 @router.get("/user/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+@query_budget(1)
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_identity)):
     """
     Returns the authenticated user's profile information.
 
@@ -170,16 +173,17 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     email, name, and profile picture.
 
     Args:
-        current_user: Authenticated user from JWT token (injected by dependency)
+        current_user: Snapshot of the authenticated user from the auth cache (injected by dependency)
 
     Returns:
         UserResponse with the current user's information
     """
-    return UserResponse.from_orm(current_user)
+    return current_user
 
 
 @router.get("/user/{user_id}/role", response_model=UserRoleResponse)
-async def get_user_info(user_id: int, db: Session = Depends(get_db)):
+@query_budget(2)
+async def get_user_info(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Returns a user's role information by user ID.
 
@@ -192,19 +196,17 @@ async def get_user_info(user_id: int, db: Session = Depends(get_db)):
     Returns:
         UserRoleResponse with the specified user's role information
     """
-    company = crud_company.get_company_by_user_id(db, user_id)
-    student = crud_student.get_student_by_user_id(db, user_id)
+    company = await db.run_sync(crud_company.get_company_by_user_id, user_id)
+    student = await db.run_sync(crud_student.get_student_by_user_id, user_id)
     if company:
         role = "company"
         status = "approved"
-        data = CompanyResponse.from_orm(company)
+        data = CompanyResponse.model_validate(company)
     elif student:
         role = "student"
         status = "approved"
-        data = StudentResponse.from_orm(student)
+        data = StudentResponse.model_validate(student)
     else:
         raise HTTPException(status_code=404, detail="User not found")
 
-    roleData = {"role": role, "status": status, "data": data}
-    userRole = UserRoleResponse.model_validate(roleData)
-    return UserRoleResponse.from_orm(userRole)
+    return UserRoleResponse(role=role, status=status, data=data)
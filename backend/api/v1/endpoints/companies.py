@@ -1,41 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional, List
-from ....core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ....config import settings
+from ....core.database import get_read_db, get_write_db
+from ....core.query_guard import query_budget
+from ....schemas.bulk import BulkCreateResponse, BulkItemResult
 from ....schemas.company import CompanyCreate, CompanyResponse
 from ....crud import company as crud_company
+from ....crud import table_version as crud_table_version
+from ....utils.etag import check_etag, make_etag, query_key
+from ....utils.pagination import set_page_headers
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CompanyResponse])
+@query_budget(3)
 async def get_companies(
+    request: Request,
+    response: Response,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_count: Optional[bool] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    companies = crud_company.get_companies(db, search)
+    """
+    Lists companies with their number of posts, as a JSON array.
+
+    Pages can be requested by number with ``page``, or by passing the
+    ``X-Next-Cursor`` header of the previous response as ``cursor``; the
+    header is absent on the last page. The total goes in ``X-Total-Count``;
+    cursor requests skip it unless ``include_count`` is set. Supports
+    If-None-Match against the companies and posts change stamps.
+    """
+    versions = await db.run_sync(crud_table_version.get_table_versions, "companies", "posts")
+    not_modified = check_etag(request, response, make_etag("companies", versions, query_key(request)))
+    if not_modified:
+        return not_modified
+
+    if include_count is None:
+        include_count = cursor is None
+
+    try:
+        companies, total, next_cursor = await db.run_sync(
+            crud_company.get_companies, search, page=page, page_size=limit,
+            cursor=cursor, include_count=include_count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     result = []
-    for company in companies:
+    for company, posts_count in companies:
         company_dict = CompanyResponse.from_orm(company)
-        company_dict.posts_count = len(company.posts)
+        company_dict.posts_count = posts_count
         result.append(company_dict)
     
+    set_page_headers(response, total, next_cursor)
     return result
 
 @router.get("/{company_id}", response_model=CompanyResponse)
-async def get_company(company_id: int, db: Session = Depends(get_db)):
-    company = crud_company.get_company(db, company_id)
-    if not company:
+@query_budget(2)
+async def get_company(
+    company_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    versions = await db.run_sync(crud_table_version.get_table_versions, "companies", "posts")
+    not_modified = check_etag(request, response, make_etag("company", company_id, versions))
+    if not_modified:
+        return not_modified
+
+    row = await db.run_sync(crud_company.get_company_with_posts_count, company_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Company not found")
     
+    company, posts_count = row
     response = CompanyResponse.from_orm(company)
-    response.posts_count = len(company.posts)
+    response.posts_count = posts_count
     return response
 
 @router.post("/", response_model=CompanyResponse)
-async def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
-    db_company = crud_company.create_company(db, company)
+@query_budget(5)
+async def create_company(company: CompanyCreate, db: AsyncSession = Depends(get_write_db)):
+    db_company = await db.run_sync(crud_company.create_company, company)
     
     response = CompanyResponse.from_orm(db_company)
     response.posts_count = 0
-    return response
\ No newline at end of file
+    return response
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+@query_budget(5)
+async def create_companies(companies: List[CompanyCreate], db: AsyncSession = Depends(get_write_db)):
+    """
+    Creates a batch of companies in one transaction with a single multi-row insert.
+    """
+    if not companies:
+        raise HTTPException(status_code=400, detail="No companies given")
+    if len(companies) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_ITEMS} companies per request")
+
+    db_companies = await db.run_sync(crud_company.create_companies, companies)
+
+    results = [BulkItemResult(index=index, id=company.id) for index, company in enumerate(db_companies)]
+    return BulkCreateResponse(created=len(results), failed=0, results=results)
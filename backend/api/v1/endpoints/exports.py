@@ -0,0 +1,46 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from ....config import settings
+from ....core.query_guard import query_budget
+from ....crud import export as crud_export
+from ....schemas.user import UserResponse
+from ....utils.auth import get_current_identity
+from ....utils.export import MEDIA_TYPES, csv_chunks, ndjson_chunks, stream_partitions
+
+router = APIRouter()
+
+@router.get("/{dataset}")
+@query_budget(2)
+async def export_dataset(
+    dataset: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    current_user: UserResponse = Depends(get_current_identity)
+):
+    """
+    Streams a full table export as NDJSON (one object per line) or CSV.
+
+    Requires a signed-in user, and only the dataset's ``EXPORT_COLUMNS``
+    are exported, so student emails and account ids stay out of it.
+
+    Rows are read through a server-side cursor and sent in chunks of
+    ``EXPORT_BATCH_SIZE`` rows, so memory use does not grow with the table.
+    Supported datasets are posts (with company_name), companies and students.
+    """
+    try:
+        statement = crud_export.export_statement(dataset)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    partitions = stream_partitions(statement, settings.EXPORT_BATCH_SIZE)
+    if format == "csv":
+        chunks = csv_chunks([column.key for column in statement.selected_columns], partitions)
+    else:
+        chunks = ndjson_chunks(partitions)
+
+    filename = f"{dataset}-{datetime.now():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
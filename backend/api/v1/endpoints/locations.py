@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from ....core.database import get_read_db
+from ....core.query_guard import query_budget
+from ....schemas.location import LocationResponse, RegionResponse
+from ....crud import location as crud_location
+
+router = APIRouter()
+
+@router.get("/", response_model=List[RegionResponse])
+@query_budget(1)
+async def get_regions(db: AsyncSession = Depends(get_read_db)):
+    """
+    Lists the regions with their locations.
+
+    The slugs are the values the posts listing and facets accept as
+    ``region`` and ``location`` filters.
+    """
+    regions = await db.run_sync(crud_location.get_regions)
+    return [
+        RegionResponse(
+            slug=slug, name=name,
+            locations=[LocationResponse(slug=location, name=location_name) for location, location_name in locations]
+        )
+        for slug, name, locations in regions
+    ]
@@ -1,62 +1,163 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import Optional
-from ....core.database import get_db
-from ....schemas.post import PostCreate, PostResponse
-from ....schemas.enums import WorkField
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from .... import recommendations
+from ....config import settings
+from ....core.database import get_read_db, get_write_db
+from ....core.query_guard import query_budget
+from ....schemas.bulk import BulkCreateResponse, BulkItemResult
+from ....schemas.post import PostCreate, PostResponse, PostFacetsResponse, PostListItem, PostListResponse
+from ....schemas.recommendation import RecommendedPost, SimilarPostsResponse
+from ....schemas.enums import PostSort, WorkField
 from ....crud import post as crud_post
 from ....crud import company as crud_company
+from ....crud import table_version as crud_table_version
+from ....utils.etag import check_etag, make_etag, query_key
+from ....utils.result_cache import result_cache
+from ....utils.responses import fast_json_response
 
 router = APIRouter()
 
-@router.get("/", response_model=dict)
+def _post_response(post, company) -> PostResponse:
+    data = {column.key: getattr(post, column.key) for column in post.__table__.columns}
+    return PostResponse(**data, company_name=company.name, company_logo=company.logo_url)
+
+@router.get("/", response_model=PostListResponse, response_class=ORJSONResponse)
+@query_budget(3)
 async def get_posts(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     search: Optional[str] = None,
     work_field: Optional[str] = None,
     location: Optional[str] = None,
+    region: Optional[str] = None,
     onsite: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    salary_min: Optional[int] = Query(None, ge=0),
+    salary_max: Optional[int] = Query(None, ge=0),
+    min_year_min: Optional[int] = Query(None, ge=0),
+    min_year_max: Optional[int] = Query(None, ge=0),
+    sort: Optional[PostSort] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(12, ge=1, le=100),
+    include_count: Optional[bool] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
+    """
+    Lists posts, newest first or by relevance when searching, unless ``sort`` is given.
+
+    Pages can be requested by number with ``page``, or by passing the
+    ``next_cursor`` of the previous response as ``cursor``. Cursor requests
+    cost the same at any depth and skip the total count unless
+    ``include_count`` is set. Supports If-None-Match against the posts and
+    companies change stamps. Results are served from the result cache
+    when the same normalized query was answered since the last write.
+    ``region`` (see /api/locations/) lists the posts of all its locations.
+    ``salary_min``/``salary_max`` and ``min_year_min``/``min_year_max`` are
+    inclusive bounds; ``sort`` orders by ``salary`` (highest first),
+    ``min_year`` (lowest first) or ``newest``, each paged by its own cursor.
+
+    Only the card columns are read, in one query joined with the company,
+    and the page is serialized once through PostListItem and orjson.
+    """
+    versions = await db.run_sync(crud_table_version.get_table_versions, "posts", "companies")
+    not_modified = check_etag(request, response, make_etag("posts", versions, query_key(request)))
+    if not_modified:
+        return not_modified
+
     # Clean and prepare query parameters
     if location == "remote":
         location = None
         onsite = False
 
-    posts, total = crud_post.get_posts(
-        db, page=page, search=search, work_field=work_field,
-        location=location, onsite=onsite
-    )
-    
-    results = []
-    for post in posts:
-        post_dict = {
-            "id": post.id,
-            "title": post.title,
-            "company_name": post.company.name,
-            "work_field": post.work_field,
-            "employment_type": post.employment_type,
-            "location": post.location,
-            "onsite": post.onsite,
-            "salary": f"{post.salary:,}",
-            "min_year": post.min_year,
-            "requirement": post.requirement,
-            "description": post.description,
-            "image_url": post.image_url or post.company.logo_url,
-            "created_at": post.created_at,
-            "updated_at": post.updated_at
-        }
-        results.append(post_dict)
+    if include_count is None:
+        include_count = cursor is None
+
+    params = {
+        "versions": versions, "page": None if cursor else page, "limit": limit,
+        "search": search or None, "work_field": work_field or None, "location": location or None,
+        "region": region or None, "onsite": onsite, "cursor": cursor or None, "include_count": include_count,
+        "salary_min": salary_min, "salary_max": salary_max, "min_year_min": min_year_min,
+        "min_year_max": min_year_max, "sort": sort.value if sort else None,
+    }
+    cached = result_cache.get("posts", params)
+    if cached is not None:
+        return fast_json_response(cached, response)
+
+    try:
+        rows, total, next_cursor = await db.run_sync(
+            crud_post.get_posts, page=page, page_size=limit, search=search, work_field=work_field,
+            location=location, onsite=onsite, cursor=cursor, include_count=include_count, region=region,
+            salary_min=salary_min, salary_max=salary_max, min_year_min=min_year_min, min_year_max=min_year_max,
+            sort=sort, versions=versions
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {"count": total, "results": results}
+    result = PostListResponse(
+        count=total, results=[PostListItem.model_validate(row) for row in rows], next_cursor=next_cursor
+    ).model_dump(mode="json")
+    result_cache.set("posts", params, result)
+    return fast_json_response(result, response)
+
+@router.get("/facets", response_model=PostFacetsResponse)
+@query_budget(2)
+async def get_post_facets(
+    search: Optional[str] = None,
+    work_field: Optional[str] = None,
+    location: Optional[str] = None,
+    region: Optional[str] = None,
+    onsite: Optional[bool] = None,
+    employment_type: Optional[str] = None,
+    salary_min: Optional[int] = Query(None, ge=0),
+    salary_max: Optional[int] = Query(None, ge=0),
+    min_year_min: Optional[int] = Query(None, ge=0),
+    min_year_max: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Returns post counts per work_field, location, onsite and employment_type value.
+
+    Takes the same filters as the posts listing. Each facet is counted with
+    every filter applied except its own, so the filter sidebar can render all
+    options with their counts from a single request.
+    """
+    if location == "remote":
+        location = None
+        onsite = False
+
+    facets, total = await db.run_sync(
+        crud_post.get_post_facets, search=search, work_field=work_field, location=location,
+        onsite=onsite, employment_type=employment_type, region=region,
+        salary_min=salary_min, salary_max=salary_max, min_year_min=min_year_min, min_year_max=min_year_max
+    )
+    return PostFacetsResponse(total=total, **facets)
 
 @router.get("/{post_id}", response_model=dict)
-async def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = crud_post.get_post(db, post_id)
+@query_budget(2)
+async def get_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    versions = await db.run_sync(crud_table_version.get_table_versions, "posts", "companies")
+    not_modified = check_etag(request, response, make_etag("post", post_id, versions))
+    if not_modified:
+        return not_modified
+
+    params = {"versions": versions, "post_id": post_id}
+    cached = result_cache.get("posts", params)
+    if cached is not None:
+        return cached
+
+    post = await db.run_sync(crud_post.get_post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    return {
+    result = {
         "id": post.id,
         "title": post.title,
         "company_name": post.company.name,
@@ -65,7 +166,7 @@ async def get_post(post_id: int, db: Session = Depends(get_db)):
         "employment_type": post.employment_type,
         "location": post.location,
         "onsite": post.onsite,
-        "salary": f"{post.salary:,}",
+        "salary": f"{post.salary:,}" if post.salary is not None else None,
         "min_year": post.min_year,
         "requirement": post.requirement,
         "description": post.description,
@@ -74,17 +175,91 @@ async def get_post(post_id: int, db: Session = Depends(get_db)):
         "created_at": post.created_at,
         "updated_at": post.updated_at
     }
+    result_cache.set("posts", params, result)
+    return result
+
+@router.get("/{post_id}/similar", response_model=SimilarPostsResponse)
+@query_budget(2)
+async def get_similar_posts(
+    post_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Posts whose title, requirement and descriptions read most like this post's, best match first.
+
+    Answered from the in-process similarity index on a worker thread. While
+    the index is still being built the answer is 503 with Retry-After.
+    Supports If-None-Match and the result cache like the post detail.
+    """
+    versions = await db.run_sync(crud_table_version.get_table_versions, "posts", "companies")
+    not_modified = check_etag(request, response, make_etag("similar", post_id, versions, query_key(request)))
+    if not_modified:
+        return not_modified
+
+    params = {"versions": versions, "similar_to": post_id, "limit": limit}
+    cached = result_cache.get("posts", params)
+    if cached is not None:
+        return cached
+
+    # The executor does not carry the request context, so the index's own
+    # reads are not charged to this endpoint's query budget
+    try:
+        similar = await asyncio.get_running_loop().run_in_executor(
+            None, recommendations.similar_posts, post_id, limit
+        )
+    except recommendations.SimilarIndexNotReady:
+        raise HTTPException(
+            status_code=503, detail="Similar posts are not ready yet", headers={"Retry-After": "5"}
+        )
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    scores = dict(similar)
+    rows = await db.run_sync(crud_post.get_post_list_items, list(scores))
+    result = SimilarPostsResponse(
+        post_id=post_id,
+        results=[RecommendedPost.model_validate({**row._mapping, "score": scores[row.id]}) for row in rows],
+    ).model_dump(mode="json")
+    result_cache.set("posts", params, result)
+    return result
 
 @router.post("/", response_model=PostResponse)
-async def create_post(post: PostCreate, db: Session = Depends(get_db)):
-    company = crud_company.get_company(db, post.company_id)
+@query_budget(8)
+async def create_post(post: PostCreate, db: AsyncSession = Depends(get_write_db)):
+    company = await db.run_sync(crud_company.get_company, post.company_id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
-    db_post = crud_post.create_post(db, post)
-    
-    response_data = PostResponse.from_orm(db_post)
-    response_data.company_name = company.name
-    response_data.company_logo = company.logo_url
+    db_post = await db.run_sync(crud_post.create_post, post)
+    recommendations.schedule_refresh()
     
-    return response_data
\ No newline at end of file
+    return _post_response(db_post, company)
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+@query_budget(9)
+async def create_posts(posts: List[PostCreate], db: AsyncSession = Depends(get_write_db)):
+    """
+    Creates a batch of posts in one transaction.
+
+    The whole batch is validated up front and written with a single
+    multi-row insert. Posts that reference an unknown company are reported
+    in their item result; the others are still created.
+    """
+    if not posts:
+        raise HTTPException(status_code=400, detail="No posts given")
+    if len(posts) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_ITEMS} posts per request")
+
+    created = await db.run_sync(crud_post.create_posts, posts)
+    if any(db_post for db_post, _ in created):
+        recommendations.schedule_refresh()
+
+    results = [
+        BulkItemResult(index=index, id=db_post.id if db_post else None, error=error)
+        for index, (db_post, error) in enumerate(created)
+    ]
+    failed = sum(1 for result in results if result.error)
+    return BulkCreateResponse(created=len(results) - failed, failed=failed, results=results)
\ No newline at end of file
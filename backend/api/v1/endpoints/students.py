@@ -1,25 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from ....core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from .... import recommendations
+from ....config import settings
+from ....core.database import get_read_db, get_write_db
+from ....core.query_guard import query_budget
 from ....schemas.student import StudentCreate, StudentResponse
+from ....schemas.recommendation import RecommendedPost, StudentRecommendationsResponse
 from ....crud import student as crud_student
+from ....crud import recommendation as crud_recommendation
+from ....crud import table_version as crud_table_version
+from ....utils.etag import check_etag, make_etag, query_key
+from ....utils.pagination import set_page_headers
 
 router = APIRouter()
 
-@router.get("/", response_model=List[StudentResponse])
-async def get_students(db: Session = Depends(get_db)):
-    students = crud_student.get_students(db)
-    return [StudentResponse.from_orm(student) for student in students]
+@router.get("/", response_model=List[Dict[str, Any]])
+@query_budget(3)
+async def get_students(
+    request: Request,
+    response: Response,
+    search: Optional[str] = None,
+    faculty: Optional[str] = None,
+    major: Optional[str] = None,
+    year: Optional[int] = Query(None, ge=1),
+    ku_generation: Optional[int] = Query(None, ge=1),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. name,faculty,year"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_count: Optional[bool] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Searches the student directory; answers with a JSON array of students.
+
+    Filters on faculty, major, year and ku_generation, and ``search``
+    matches name, nick name and about me. ``fields`` limits the returned
+    fields so list views can leave out ``about_me``; id is always included.
+    Pages work like the company listing: by ``page`` or by passing the
+    ``X-Next-Cursor`` header back as ``cursor``, with the total in
+    ``X-Total-Count``. Supports If-None-Match against the students change
+    stamp.
+    """
+    versions = await db.run_sync(crud_table_version.get_table_versions, "students")
+    not_modified = check_etag(request, response, make_etag("students", versions, query_key(request)))
+    if not_modified:
+        return not_modified
+
+    if include_count is None:
+        include_count = cursor is None
+    selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+    try:
+        students, total, next_cursor = await db.run_sync(
+            crud_student.get_students, search=search, faculty=faculty, major=major, year=year,
+            ku_generation=ku_generation, fields=selected, page=page, page_size=limit,
+            cursor=cursor, include_count=include_count
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    set_page_headers(response, total, next_cursor)
+    return students
 
 @router.get("/{student_id}", response_model=StudentResponse)
-async def get_student(student_id: int, db: Session = Depends(get_db)):
-    student = crud_student.get_student(db, student_id)
+@query_budget(2)
+async def get_student(
+    student_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    versions = await db.run_sync(crud_table_version.get_table_versions, "students")
+    not_modified = check_etag(request, response, make_etag("student", student_id, versions))
+    if not_modified:
+        return not_modified
+
+    student = await db.run_sync(crud_student.get_student, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return StudentResponse.from_orm(student)
 
+@router.get("/{student_id}/recommendations", response_model=StudentRecommendationsResponse)
+@query_budget(2)
+async def get_student_recommendations(
+    student_id: int,
+    limit: int = Query(settings.RECOMMENDATIONS_TOP_K, ge=1, le=settings.RECOMMENDATIONS_TOP_K),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Posts recommended to a student, best match first.
+
+    Served from the precomputed lists, which are refreshed in the
+    background when posts or students are created; a new student's list
+    can be empty for a moment.
+    """
+    rows = await db.run_sync(crud_recommendation.get_student_recommendations, student_id, limit)
+    if not rows and not await db.run_sync(crud_student.get_student, student_id):
+        raise HTTPException(status_code=404, detail="Student not found")
+    return StudentRecommendationsResponse(
+        student_id=student_id, results=[RecommendedPost.model_validate(row) for row in rows]
+    )
+
 @router.post("/", response_model=StudentResponse)
-async def create_student(student: StudentCreate, db: Session = Depends(get_db)):
-    db_student = crud_student.create_student(db, student)
+@query_budget(3)
+async def create_student(student: StudentCreate, db: AsyncSession = Depends(get_write_db)):
+    db_student = await db.run_sync(crud_student.create_student, student)
+    recommendations.schedule_refresh()
     return StudentResponse.from_orm(db_student)
\ No newline at end of file
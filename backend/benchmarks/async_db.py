@@ -0,0 +1,129 @@
+"""
+Compares concurrent throughput of the blocking and the async database paths.
+
+Both routes run the same query inside an ``async def`` endpoint. The
+blocking route uses the sync ``SessionLocal`` like the endpoints used to, the
+async route uses ``AsyncSessionLocal`` with ``run_sync`` like they do now.
+A ``bench_sleep`` SQL function registered on every connection stands in for
+the round trip to a database server, which SQLite does not have. While the
+queries run, a trivial route is pinged to show how long the event loop stalls.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.async_db --requests 200 --concurrency 20 --latency-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event, text
+from ..core.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT bench_sleep(:ms) + count(*) FROM c"
+)
+
+
+def _bench_sleep(ms: float) -> int:
+    time.sleep(ms / 1000)
+    return 0
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("bench_sleep", 1, _bench_sleep)
+
+
+def _slow_query(db, rows: int, latency_ms: float) -> int:
+    return db.execute(SLOW_QUERY, {"n": rows, "ms": latency_ms}).scalar()
+
+
+def build_app(rows: int, latency_ms: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/blocking")
+    async def blocking():
+        with SessionLocal() as db:
+            return {"count": _slow_query(db, rows, latency_ms)}
+
+    @app.get("/async")
+    async def non_blocking():
+        async with AsyncSessionLocal() as db:
+            return {"count": await db.run_sync(_slow_query, rows, latency_ms)}
+
+    @app.get("/ping")
+    async def ping():
+        return {}
+
+    return app
+
+
+async def _run(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+    ping_latencies = []
+
+    async def one():
+        async with semaphore:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    async def pinger():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/ping")
+            ping_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.005)
+
+    ping_task = asyncio.create_task(pinger())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ping_task
+
+    return {
+        "path": path,
+        "seconds": elapsed,
+        "throughput": requests / elapsed,
+        "pings": len(ping_latencies),
+        "ping_p50_ms": statistics.median(ping_latencies) * 1000,
+        "ping_max_ms": max(ping_latencies) * 1000,
+    }
+
+
+async def main(requests: int, concurrency: int, rows: int, latency_ms: float):
+    event.listen(engine, "connect", _register_sleep)
+    event.listen(async_engine.sync_engine, "connect", _register_sleep)
+    app = build_app(rows, latency_ms)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up both connection pools
+        await client.get("/blocking")
+        await client.get("/async")
+        results = [
+            await _run(client, "/blocking", requests, concurrency),
+            await _run(client, "/async", requests, concurrency),
+        ]
+    await async_engine.dispose()
+
+    print(f"{requests} requests, concurrency {concurrency}, {latency_ms} ms latency, query over {rows} rows")
+    # A stalled event loop shows up as few pings answered during the run
+    print(f"{'path':<10} {'seconds':>8} {'req/s':>8} {'pings':>6} {'ping p50 ms':>12} {'ping max ms':>12}")
+    for result in results:
+        print(
+            f"{result['path']:<10} {result['seconds']:>8.2f} {result['throughput']:>8.1f} {result['pings']:>6} "
+            f"{result['ping_p50_ms']:>12.1f} {result['ping_max_ms']:>12.1f}"
+        )
+    print(f"speedup: {results[1]['throughput'] / results[0]['throughput']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.rows, args.latency_ms))
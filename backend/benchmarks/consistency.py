@@ -0,0 +1,112 @@
+"""
+Checks that the posts listing's counts agree with the rows after writes from another process.
+
+Seeds a scratch SQLite database, serves the app with the in-memory result
+cache, and reads the posts listing before and after a post is created by
+a separate interpreter, as another worker would. Checks that the listing
+``count`` then matches both the rows and ``/facets``, instead of a total
+cached before the write, and that a location written as users type it
+("Chiang Mai") filters the listing and the facets alike.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.consistency
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from typing import List, Tuple
+from . import endpoints as bench
+
+NEW_POST = {
+    "company_id": 1, "title": "Consistency Engineer", "location": "bangkok",
+    "salary": 45000, "min_year": 1, "requirement": "python",
+}
+
+
+def child():
+    """Creates ``NEW_POST`` through crud, in this fresh interpreter."""
+    from ..core.database import SessionLocal
+    from ..crud import post as crud_post
+    from ..schemas.post import PostCreate
+
+    with SessionLocal() as db:
+        print(crud_post.create_post(db, PostCreate(**NEW_POST)).id)
+
+
+def write_from_another_process() -> int:
+    output = subprocess.run(
+        [sys.executable, "-m", "backend.benchmarks.consistency", "--child"],
+        env=os.environ.copy(), check=True, capture_output=True, text=True,
+    ).stdout
+    return int(output.strip().splitlines()[-1])
+
+
+async def run() -> List[Tuple[str, bool, str]]:
+    import httpx
+    from sqlalchemy import func, select
+    from ..core.database import SessionLocal, async_engine
+    from ..main import app
+    from ..models import Post
+
+    checks = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        before = (await client.get("/api/posts/")).json()
+        new_id = write_from_another_process()
+        with SessionLocal() as db:
+            rows = db.scalar(select(func.count(Post.id)))
+        after = (await client.get("/api/posts/")).json()
+        facets = (await client.get("/api/posts/facets")).json()
+        typed = {"location": "Chiang Mai"}
+        typed_listing = (await client.get("/api/posts/", params=typed)).json()
+        typed_facets = (await client.get("/api/posts/facets", params=typed)).json()
+
+    checks.append((
+        "new post listed",
+        bool(after["results"]) and after["results"][0]["id"] == new_id,
+        f"first card {after['results'][0]['id'] if after['results'] else None}, new post {new_id}",
+    ))
+    checks.append((
+        "count matches the rows after an outside write",
+        after["count"] == rows == before["count"] + 1,
+        f"count {before['count']} -> {after['count']}, {rows} rows",
+    ))
+    checks.append(("count matches the facets total", after["count"] == facets["total"], f"facets {facets['total']}"))
+    checks.append((
+        "typed location filters listing and facets alike",
+        typed_listing["count"] > 0 and typed_listing["count"] == typed_facets["total"],
+        f"listing {typed_listing['count']}, facets {typed_facets['total']}",
+    ))
+    await async_engine.dispose()
+    return checks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench.configure_environment(os.path.join(directory, "consistency.db"), "memory")
+        bench.seed(args.companies, args.posts, 0, random.Random(args.seed))
+        checks = asyncio.run(run())
+
+    for name, passed, detail in checks:
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<48} {detail}")
+    failed = sum(1 for _, passed, _ in checks if not passed)
+    print(f"{len(checks)} checks, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
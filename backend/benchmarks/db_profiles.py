@@ -0,0 +1,158 @@
+"""
+Compares read/write concurrency of the SQLite database profiles.
+
+Seeds one scratch database, then for every profile in
+``core.db_profiles.DATABASE_PROFILES`` runs a copy of it under reader
+threads paging through the post listing and writer threads creating posts,
+all sharing one engine built with that profile's pragmas and a pool of
+``--pool-size`` connections (one per thread by default; a smaller pool
+shows up as checkout waits). Reports read and write throughput, latency
+percentiles, "database is locked" failures and how long threads waited to
+check a connection out of the pool.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.db_profiles --readers 8 --writers 2 --seconds 5
+    python -m backend.benchmarks.db_profiles --profiles default wal --pool-size 4
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, List
+from . import endpoints as bench
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def run_profile(path: str, profile: str, args) -> Dict:
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+    from ..core.db_profiles import apply_sqlite_pragmas, engine_options, sqlite_pragmas
+    from ..crud import post as crud_post
+    from ..schemas import PostCreate
+
+    url = f"sqlite:///{path}"
+    engine = create_engine(url, **engine_options(
+        url, pool_size=args.pool_size, max_overflow=0, pool_timeout=args.seconds * 10
+    ))
+    apply_sqlite_pragmas(engine, sqlite_pragmas(profile))
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    latencies: Dict[str, List[float]] = {"read": [], "write": []}
+    failures = {"read": 0, "write": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def read(db, rng):
+        crud_post.get_posts(db, page=rng.randint(1, 20), include_count=False)
+
+    def write(db, rng):
+        crud_post.create_posts(db, [PostCreate(
+            company_id=rng.randint(1, args.companies), title="Profile Benchmark Engineer",
+            location=rng.choice(bench.LOCATIONS), salary=rng.randint(15, 90) * 1000,
+            min_year=rng.randint(1, 4), requirement="python sql",
+        )])
+
+    def worker(kind: str, operation, seed: int):
+        rng = random.Random(seed)
+        samples = []
+        failed = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session() as db:
+                    operation(db, rng)
+            except OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                failed += 1
+                continue
+            samples.append(time.perf_counter() - start)
+        with lock:
+            latencies[kind].extend(samples)
+            failures[kind] += failed
+
+    threads = [
+        threading.Thread(target=worker, args=("read", read, args.seed + n)) for n in range(args.readers)
+    ] + [
+        threading.Thread(target=worker, args=("write", write, args.seed + 1000 + n)) for n in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    waits = engine.pool.wait_metrics.snapshot()
+    engine.dispose()
+    return {
+        "profile": profile,
+        **{
+            f"{kind}s_per_s": len(values) / args.seconds for kind, values in latencies.items()
+        },
+        **{
+            f"{kind}_p{percent}_ms": _percentile(values, percent) * 1000
+            for kind, values in latencies.items() for percent in (50, 95)
+        },
+        "read_failures": failures["read"],
+        "write_failures": failures["write"],
+        "pool_wait_avg_ms": waits["wait_ms_avg"],
+        "pool_wait_max_ms": waits["wait_ms_max"],
+    }
+
+
+def main():
+    from ..core.db_profiles import DATABASE_PROFILES
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", choices=list(DATABASE_PROFILES), default=list(DATABASE_PROFILES))
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--pool-size", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    args.pool_size = args.pool_size or args.readers + args.writers
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        template = os.path.join(directory, "template.db")
+        # Seed in rollback journal mode so the file can be copied on its own
+        os.environ["DATABASE_PROFILE"] = "default"
+        bench.configure_environment(template, "none")
+        bench.seed(args.companies, args.posts, 0, random.Random(args.seed))
+        from ..core.database import engine
+        engine.dispose()
+
+        for profile in args.profiles:
+            path = os.path.join(directory, f"{profile}.db")
+            shutil.copyfile(template, path)
+            results.append(run_profile(path, profile, args))
+
+    print(f"{args.readers} readers, {args.writers} writers, pool of {args.pool_size}, "
+          f"{args.seconds:g}s per profile, {args.posts} posts")
+    print(f"{'profile':<12} {'reads/s':>8} {'p95 ms':>7} {'writes/s':>9} {'p95 ms':>7} "
+          f"{'locked r/w':>11} {'pool wait avg/max ms':>21}")
+    for result in results:
+        locked = f"{result['read_failures']}/{result['write_failures']}"
+        waits = f"{result['pool_wait_avg_ms']:.2f}/{result['pool_wait_max_ms']:.1f}"
+        print(
+            f"{result['profile']:<12} {result['reads_per_s']:>8.1f} {result['read_p95_ms']:>7.1f} "
+            f"{result['writes_per_s']:>9.1f} {result['write_p95_ms']:>7.1f} {locked:>11} {waits:>21}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+"""
+Endpoint benchmark: drives the API in-process with a realistic request mix.
+
+Seeds a scratch SQLite database with the requested volumes, then fires a
+weighted mix of listing, search, detail, facet and login calls at the ASGI
+app concurrently through httpx. Logins go through a local OpenID issuer
+stub, so the full callback path runs without touching Google. Reports
+p50/p95/p99 latency, throughput and SQL statements per request for every
+scenario.
+
+Results can be stored as a named baseline in ``benchmarks/baselines`` and
+later runs compared against it; the comparison exits with status 1 when a
+scenario got slower than the tolerance allows or issues more SQL.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.endpoints --posts 20000 --requests 2000 --concurrency 20
+    python -m backend.benchmarks.endpoints --save-baseline default
+    python -m backend.benchmarks.endpoints --compare default
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+ISSUER = "http://oauth.bench"
+CLIENT_ID = "bench-client"
+
+LOCATIONS = ["bangkok", "chiang-mai", "phuket", "khon-kaen", "chonburi"]
+ROLES = ["Developer", "Engineer", "Designer", "Analyst", "Specialist", "Intern", "Lead", "Consultant"]
+SKILLS = [
+    "python", "fastapi", "django", "react", "vue", "typescript", "docker", "kubernetes",
+    "aws", "sql", "postgresql", "figma", "flutter", "kotlin", "swift", "tableau",
+    "terraform", "linux", "golang", "rust", "pandas", "pytorch", "security", "networking",
+]
+SEARCH_TERMS = SKILLS + ["backend developer", "data", "cloud engineer", "mobile", "design"]
+
+# (scenario, relative weight)
+DEFAULT_MIX = {
+    "posts_list": 30,
+    "posts_filtered": 10,
+    "posts_search": 15,
+    "posts_detail": 20,
+    "posts_facets": 5,
+    "companies_list": 8,
+    "company_detail": 4,
+    "auth_me": 5,
+    "auth_login": 3,
+}
+
+# SQL statements issued by the current request, counted by an engine event
+_statements: ContextVar[Optional[List[int]]] = ContextVar("bench_statements", default=None)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def configure_environment(database_path: str, result_cache: str):
+    """Points the settings at the scratch database and the stub issuer; must run before the app is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ["ASYNC_DATABASE_URL"] = ""
+    os.environ["GOOGLE_OAUTH_BASE_URL"] = ISSUER
+    os.environ["GOOGLE_CLIENT_ID"] = CLIENT_ID
+    os.environ["RESULT_CACHE_BACKEND"] = result_cache
+
+
+def seed(companies: int, posts: int, students: int, rng: random.Random):
+    """Fills the scratch database with synthetic users, companies, students and posts."""
+    from sqlalchemy import insert
+    from sqlalchemy.orm import Session
+    from .. import migrations
+    from ..core.database import engine
+    from ..crud.location import link_locations
+    from ..crud.post import rebuild_facet_counts
+    from ..crud.table_version import bump_table_version
+    from ..models import Company, Post, Student, User
+    from ..schemas import EmploymentType, WorkField
+
+    migrations.upgrade(engine)
+    now = datetime.now().replace(microsecond=0)
+
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": i, "email": f"company{i}@bench.example.com", "first_name": "Company", "last_name": str(i)}
+            for i in range(1, companies + 1)
+        ] + [
+            {
+                "id": companies + i, "email": f"student{i}@bench.ku.th", "first_name": "Student",
+                "last_name": str(i), "google_id": f"bench-google-{i}",
+            }
+            for i in range(1, students + 1)
+        ])
+        conn.execute(insert(Company), [
+            {
+                "id": i, "user_id": i, "name": f"Bench Company {i}", "location": rng.choice(LOCATIONS),
+                "description": f"Synthetic company {i}",
+            }
+            for i in range(1, companies + 1)
+        ])
+        conn.execute(insert(Student), [
+            {
+                "user_id": companies + i, "year": rng.randint(1, 4), "ku_generation": rng.randint(75, 85),
+                "faculty": "Engineering", "major": "Computer Engineering", "email": f"student{i}@bench.ku.th",
+            }
+            for i in range(1, students + 1)
+        ])
+
+        work_fields = [field.value for field in WorkField]
+        employment_types = [kind.value for kind in EmploymentType]
+        batch = []
+        for i in range(1, posts + 1):
+            skills = rng.sample(SKILLS, 4)
+            batch.append({
+                "company_id": rng.randint(1, companies),
+                "title": f"{skills[0].title()} {rng.choice(ROLES)}",
+                "work_field": rng.choice(work_fields),
+                "employment_type": rng.choice(employment_types),
+                "location": rng.choice(LOCATIONS),
+                "onsite": rng.random() < 0.5,
+                "salary": rng.randrange(15000, 150000, 1000),
+                "min_year": rng.randint(0, 5),
+                "requirement": ", ".join(skills),
+                "description": f"Work with {skills[1]} and {skills[2]} on our {skills[3]} platform.",
+                "long_description": " ".join(rng.choices(SKILLS, k=30)),
+                "created_at": now - timedelta(minutes=posts - i),
+                "updated_at": now - timedelta(minutes=posts - i),
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(Post), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Post), batch)
+
+    with Session(engine) as db:
+        link_locations(db)
+        rebuild_facet_counts(db)
+        bump_table_version(db, "posts", "companies", "students")
+        db.commit()
+
+
+def build_oauth_stub(students: int):
+    """An OpenID issuer answering the code exchange with a signed ID token for ``bench-<n>`` codes."""
+    import rsa
+    from fastapi import FastAPI, HTTPException, Request
+    from jose import jwk, jwt
+
+    public_key, private_key = rsa.newkeys(2048)
+    private_pem = private_key.save_pkcs1().decode()
+    key = jwk.construct(public_key.save_pkcs1().decode(), "RS256").to_dict()
+    key["kid"] = "bench"
+
+    stub = FastAPI()
+
+    @stub.get("/.well-known/openid-configuration")
+    async def discovery():
+        return {
+            "issuer": ISSUER,
+            "authorization_endpoint": f"{ISSUER}/auth",
+            "token_endpoint": f"{ISSUER}/token",
+            "userinfo_endpoint": f"{ISSUER}/userinfo",
+            "jwks_uri": f"{ISSUER}/jwks",
+        }
+
+    @stub.get("/jwks")
+    async def jwks():
+        return {"keys": [key]}
+
+    @stub.post("/token")
+    async def token(request: Request):
+        code = parse_qs((await request.body()).decode()).get("code", [""])[0]
+        n = int(code.removeprefix("bench-") or 0)
+        if not 1 <= n <= students:
+            raise HTTPException(status_code=400, detail="invalid_grant")
+
+        now = int(time.time())
+        claims = {
+            "iss": ISSUER, "aud": CLIENT_ID, "sub": f"bench-google-{n}", "iat": now, "exp": now + 600,
+            "email": f"student{n}@bench.ku.th", "given_name": "Student", "family_name": str(n),
+        }
+        id_token = jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": "bench"})
+        return {"access_token": f"bench-access-{n}", "token_type": "Bearer", "id_token": id_token}
+
+    return stub
+
+
+def build_scenarios(companies: int, posts: int, students: int, tokens: List[str]) -> Dict[str, Callable]:
+    """Scenario name -> function returning the (path, headers) of one request."""
+    from ..schemas import WorkField
+
+    work_fields = [field.value for field in WorkField]
+
+    def posts_list(rng):
+        return f"/api/posts/?{urlencode({'page': rng.choice([1, 1, 1, 2, 3, rng.randint(1, 50)])})}", {}
+
+    def posts_filtered(rng):
+        params = {"work_field": rng.choice(work_fields)}
+        if rng.random() < 0.5:
+            params["location"] = rng.choice(LOCATIONS)
+        if rng.random() < 0.3:
+            params["onsite"] = rng.choice(["true", "false"])
+        return f"/api/posts/?{urlencode(params)}", {}
+
+    def posts_search(rng):
+        return f"/api/posts/?{urlencode({'search': rng.choice(SEARCH_TERMS)})}", {}
+
+    def posts_detail(rng):
+        return f"/api/posts/{rng.randint(1, posts)}", {}
+
+    def posts_facets(rng):
+        params = {"work_field": rng.choice(work_fields)} if rng.random() < 0.5 else {}
+        return f"/api/posts/facets?{urlencode(params)}", {}
+
+    def companies_list(rng):
+        return f"/api/companies/?{urlencode({'page': rng.randint(1, max(1, companies // 20))})}", {}
+
+    def company_detail(rng):
+        return f"/api/companies/{rng.randint(1, companies)}", {}
+
+    def auth_me(rng):
+        return "/api/auth/user/me", {"Authorization": f"Bearer {rng.choice(tokens)}"}
+
+    def auth_login(rng):
+        return f"/api/auth/google/callback?{urlencode({'code': f'bench-{rng.randint(1, students)}', 'state': 'student'})}", {}
+
+    return {
+        "posts_list": posts_list,
+        "posts_filtered": posts_filtered,
+        "posts_search": posts_search,
+        "posts_detail": posts_detail,
+        "posts_facets": posts_facets,
+        "companies_list": companies_list,
+        "company_detail": company_detail,
+        "auth_me": auth_me,
+        "auth_login": auth_login,
+    }
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def _summarize(samples: List[Tuple[float, int, bool]], seconds: float) -> dict:
+    latencies = sorted(latency for latency, _, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "throughput": len(samples) / seconds if seconds else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "sql_per_request": sum(count for _, count, _ in samples) / len(samples) if samples else 0.0,
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    from sqlalchemy import event
+    from ..core.database import async_engine, engine
+    from ..main import app
+    from ..utils.google_oauth import GoogleOAuth
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    seed(args.companies, args.posts, args.students, rng)
+    print(f"seeded {args.companies} companies, {args.posts} posts, {args.students} students "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    GoogleOAuth.configure(httpx.ASGITransport(app=build_oauth_stub(args.students)))
+    event.listen(engine, "before_cursor_execute", _count_statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+    mix = {name: weight for name, weight in DEFAULT_MIX.items() if weight > 0}
+    if args.scenarios:
+        mix = {name: weight for name, weight in mix.items() if name in args.scenarios}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        tokens = []
+        for n in range(1, min(args.students, 20) + 1):
+            response = await client.get(f"/api/auth/google/callback?code=bench-{n}&state=student")
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+
+        scenarios = build_scenarios(args.companies, args.posts, args.students, tokens)
+        names = list(mix)
+        plan = rng.choices(names, weights=[mix[name] for name in names], k=args.requests + args.warmup)
+        requests = [(name, *scenarios[name](rng)) for name in plan]
+        samples: Dict[str, List[Tuple[float, int, bool]]] = {name: [] for name in names}
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(name: str, path: str, headers: dict, record: bool):
+            async with semaphore:
+                counter = [0]
+                token = _statements.set(counter)
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path, headers=headers)
+                    ok = response.status_code < 400
+                finally:
+                    _statements.reset(token)
+                if record:
+                    samples[name].append((time.perf_counter() - start, counter[0], ok))
+
+        await asyncio.gather(*(one(*request, False) for request in requests[:args.warmup]))
+        start = time.perf_counter()
+        await asyncio.gather(*(one(*request, True) for request in requests[args.warmup:]))
+        seconds = time.perf_counter() - start
+
+    await GoogleOAuth.aclose()
+    await async_engine.dispose()
+    return {
+        "config": {
+            "companies": args.companies, "posts": args.posts, "students": args.students,
+            "requests": args.requests, "concurrency": args.concurrency, "seed": args.seed,
+            "result_cache": args.result_cache, "mix": mix,
+        },
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "overall": _summarize([sample for values in samples.values() for sample in values], seconds),
+        "scenarios": {name: _summarize(values, seconds) for name, values in samples.items() if values},
+    }
+
+
+def print_report(result: dict):
+    config = result["config"]
+    print(f"{config['requests']} requests, concurrency {config['concurrency']}, result cache {config['result_cache']}")
+    print(f"{'scenario':<16} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8}")
+    rows = list(result["scenarios"].items()) + [("overall", result["overall"])]
+    for name, stats in rows:
+        print(
+            f"{name:<16} {stats['requests']:>6} {stats['errors']:>6} {stats['throughput']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['sql_per_request']:>8.2f}"
+        )
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_ms: float) -> List[str]:
+    """Returns a description of every regression of ``result`` against ``baseline``."""
+    regressions = []
+    if result["config"] != baseline["config"]:
+        print("warning: run configuration differs from the baseline, comparison may be meaningless")
+
+    current = dict(result["scenarios"], overall=result["overall"])
+    previous = dict(baseline["scenarios"], overall=baseline["overall"])
+    print(f"\n{'scenario':<16} {'p95 ms':>16} {'sql/req':>14} {'req/s':>16}")
+    for name, stats in current.items():
+        old = previous.get(name)
+        if old is None:
+            continue
+        print(
+            f"{name:<16} {old['p95_ms']:>7.1f} -> {stats['p95_ms']:<6.1f} "
+            f"{old['sql_per_request']:>5.2f} -> {stats['sql_per_request']:<5.2f} "
+            f"{old['throughput']:>7.1f} -> {stats['throughput']:<6.1f}"
+        )
+        if stats["p95_ms"] > old["p95_ms"] * (1 + tolerance) and stats["p95_ms"] - old["p95_ms"] > min_ms:
+            regressions.append(f"{name}: p95 {old['p95_ms']:.1f} ms -> {stats['p95_ms']:.1f} ms")
+        # Statement counts only move with cache hit timing, real growth is a regression
+        if stats["sql_per_request"] > old["sql_per_request"] * 1.05 + 0.02:
+            regressions.append(f"{name}: {old['sql_per_request']:.2f} -> {stats['sql_per_request']:.2f} SQL statements per request")
+        if name == "overall" and stats["throughput"] < old["throughput"] / (1 + tolerance):
+            regressions.append(f"throughput {old['throughput']:.1f} -> {stats['throughput']:.1f} req/s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--result-cache", choices=["memory", "none"], default="memory")
+    parser.add_argument("--scenarios", nargs="+", choices=list(DEFAULT_MIX), help="run only these scenarios")
+    parser.add_argument("--save-baseline", metavar="NAME", help="store the results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baselines/NAME.json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95/throughput change")
+    parser.add_argument("--min-ms", type=float, default=2.0, help="ignore p95 changes smaller than this")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads((BASELINES_DIR / f"{args.compare}.json").read_text())
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure_environment(os.path.join(directory, "bench.db"), args.result_cache)
+        result = asyncio.run(run(args))
+    print_report(result)
+
+    status = 0
+    if result["overall"]["errors"]:
+        print(f"\n{result['overall']['errors']} requests failed")
+        status = 1
+
+    if args.save_baseline:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        path = BASELINES_DIR / f"{args.save_baseline}.json"
+        path.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"\nbaseline saved to {path}")
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.tolerance, args.min_ms)
+        if regressions:
+            print("\nregressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            status = 1
+        else:
+            print("\nno regressions")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Checks the versioned migrations against the models.
+
+Builds one scratch SQLite database with the migrations and one with
+``Base.metadata.create_all``, and checks that:
+
+    - the initial schema (version 1) is the frozen pre-migration schema,
+      not the current models, so later migrations still have work to do
+    - data written under the older schema is carried forward: facet
+      counters are backfilled, and "Chiang Mai" style locations are
+      normalized, linked to their region and counted under their slug
+    - the fully migrated schema has the tables, columns and indexes the
+      models describe
+    - running the migrations again changes nothing
+
+Usage (from the repository root):
+    python -m backend.benchmarks.migrations
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+# Tables that exist only in the migrated database: the migration log and the SQLite FTS5 indexes
+MIGRATION_ONLY = ("schema_migrations", "posts_fts", "students_fts")
+
+
+def describe(engine) -> Dict[str, dict]:
+    """Columns (name -> nullable, primary key) and indexes (name -> columns, unique) per table."""
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    schema = {}
+    for table in inspector.get_table_names():
+        if table in MIGRATION_ONLY or table.startswith(MIGRATION_ONLY):
+            continue
+        schema[table] = {
+            "columns": {
+                column["name"]: (column["nullable"], bool(column["primary_key"]))
+                for column in inspector.get_columns(table)
+            },
+            "indexes": {
+                index["name"]: (tuple(index["column_names"]), bool(index["unique"]))
+                for index in inspector.get_indexes(table)
+            },
+        }
+    return schema
+
+
+def differences(migrated: Dict[str, dict], modeled: Dict[str, dict]) -> List[str]:
+    found = [
+        f"table {table} {'missing' if table in modeled else 'extra'}" for table in migrated.keys() ^ modeled.keys()
+    ]
+    for table in sorted(migrated.keys() & modeled.keys()):
+        for part, label in (("columns", "column"), ("indexes", "index")):
+            ours, theirs = migrated[table][part], modeled[table][part]
+            for name in sorted(ours.keys() | theirs.keys()):
+                if ours.get(name) != theirs.get(name):
+                    found.append(f"{table} {label} {name}: migrated {ours.get(name)}, models {theirs.get(name)}")
+    return found
+
+
+def run(directory: str) -> List[Tuple[str, bool, str]]:
+    from sqlalchemy import create_engine, inspect, text
+    from .. import migrations
+    from ..core.database import Base
+    from .. import models  # noqa: F401  (registers every table on Base.metadata)
+
+    checks = []
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'migrated.db')}")
+
+    migrations.upgrade(engine, target=1)
+    columns = {column["name"] for column in inspect(engine).get_columns("posts")}
+    tables = set(inspect(engine).get_table_names())
+    checks.append((
+        "version 1 is the frozen initial schema",
+        "location_id" not in columns and "locations" not in tables and "student_recommendations" not in tables,
+        f"posts.location_id {'present' if 'location_id' in columns else 'absent'}, "
+        f"later tables present: {sorted(tables & {'locations', 'regions', 'student_recommendations'})}",
+    ))
+
+    # Rows written by the app before the facet counters and locations existed
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO companies (id, name, location) VALUES (1, 'Old Co', 'Khon  Kaen ')"))
+        conn.execute(text(
+            "INSERT INTO posts (company_id, title, work_field, location, onsite, created_at, updated_at) VALUES "
+            "(1, 'Old Post', 'backend', 'Chiang Mai', 1, '2024-01-02 03:04:05', '2024-01-02 03:04:05'), "
+            "(1, 'Older Post', 'backend', 'chiang-mai', 1, '2024-01-01 03:04:05', '2024-01-01 03:04:05')"
+        ))
+    migrations.upgrade(engine)
+
+    with engine.connect() as conn:
+        counts = conn.execute(text("SELECT work_field, location, count FROM post_facet_counts")).all()
+        posts = conn.execute(text(
+            "SELECT p.location, r.slug, p.updated_at FROM posts p "
+            "JOIN locations l ON l.id = p.location_id JOIN regions r ON r.id = l.region_id ORDER BY p.id"
+        )).all()
+        company = conn.execute(text(
+            "SELECT c.location, r.slug FROM companies c "
+            "JOIN locations l ON l.id = c.location_id JOIN regions r ON r.id = l.region_id"
+        )).first()
+        watermarks = dict(conn.execute(text("SELECT name, last_id FROM recommendation_watermarks")).all())
+    checks.append((
+        "facet counters backfilled under slugs",
+        [tuple(row) for row in counts] == [("backend", "chiang-mai", 2)], f"{[tuple(row) for row in counts]}"
+    ))
+    checks.append((
+        "old locations normalized and linked",
+        [tuple(row[:2]) for row in posts] == [("chiang-mai", "northern")] * 2
+        and posts[0][2].startswith("2024-01-02") and tuple(company or ()) == ("khon-kaen", "northeastern"),
+        f"posts {[tuple(row) for row in posts]}, company {tuple(company or ())}",
+    ))
+    checks.append((
+        "recommendation watermarks start at zero", watermarks == {"posts": 0, "students": 0}, f"{watermarks}"
+    ))
+
+    modeled_engine = create_engine(f"sqlite:///{os.path.join(directory, 'modeled.db')}")
+    Base.metadata.create_all(modeled_engine)
+    found = differences(describe(engine), describe(modeled_engine))
+    checks.append(("migrated schema matches the models", not found, "; ".join(found[:5])))
+
+    before = describe(engine)
+    for migration in migrations.load_migrations():
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+    with engine.connect() as conn:
+        locations = conn.execute(text("SELECT COUNT(*) FROM locations")).scalar()
+        rerun_counts = conn.execute(text("SELECT COUNT(*) FROM post_facet_counts")).scalar()
+    checks.append((
+        "migrations are idempotent",
+        describe(engine) == before and rerun_counts == len(counts),
+        f"{locations} locations, {rerun_counts} facet rows",
+    ))
+    engine.dispose()
+    modeled_engine.dispose()
+    return checks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        checks = run(directory)
+
+    for name, passed, detail in checks:
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<40} {detail}")
+    failed = sum(1 for _, passed, _ in checks if not passed)
+    print(f"{len(checks)} checks, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Measures the cost of building one page of the post listing.
+
+Compares three ways of reading and serializing the same page:
+
+    orm_lazy    full Post objects, company loaded lazily per row, dicts built
+                by hand and encoded like FastAPI's default JSONResponse
+    orm_eager   full Post objects with the company joined eagerly, same
+                serialization (what the listing did before the projection)
+    projected   crud.post.get_posts: only the card columns in one joined
+                query, validated into PostListItem and encoded with orjson
+
+and reports CPU time, wall time and SQL statements per page.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.post_list --posts 20000 --pages 300 --page-size 12
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from . import endpoints as bench
+
+
+def run(pages: int, page_size: int, rng: random.Random):
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import event
+    from sqlalchemy.orm import contains_eager
+    from ..core.database import SessionLocal, engine
+    from ..crud import post as crud_post
+    from ..models import Company, Post
+    from ..schemas.post import PostListItem, PostListResponse
+
+    statements = [0]
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+
+    def legacy_dicts(posts):
+        return [
+            {
+                "id": post.id,
+                "title": post.title,
+                "company_name": post.company.name,
+                "work_field": post.work_field,
+                "employment_type": post.employment_type,
+                "location": post.location,
+                "onsite": post.onsite,
+                "salary": f"{post.salary:,}",
+                "min_year": post.min_year,
+                "requirement": post.requirement,
+                "description": post.description,
+                "image_url": post.image_url or post.company.logo_url,
+                "created_at": post.created_at,
+                "updated_at": post.updated_at,
+            }
+            for post in posts
+        ]
+
+    def legacy_encode(result) -> bytes:
+        # What JSONResponse does with a response_model=dict return value
+        return json.dumps(
+            jsonable_encoder(result), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode()
+
+    def orm_page(db, page: int, eager: bool):
+        query = db.query(Post).join(Company)
+        if eager:
+            query = query.options(contains_eager(Post.company))
+        posts = query.order_by(Post.created_at.desc(), Post.id.desc()).offset((page - 1) * page_size).limit(page_size)
+        return legacy_encode({"count": None, "results": legacy_dicts(posts.all()), "next_cursor": None})
+
+    def projected_page(db, page: int):
+        rows, total, next_cursor = crud_post.get_posts(db, page=page, page_size=page_size, include_count=False)
+        result = PostListResponse(
+            count=total, results=[PostListItem.model_validate(row) for row in rows], next_cursor=next_cursor
+        ).model_dump(mode="json")
+        return orjson.dumps(result)
+
+    variants = {
+        "orm_lazy": lambda db, page: orm_page(db, page, eager=False),
+        "orm_eager": lambda db, page: orm_page(db, page, eager=True),
+        "projected": projected_page,
+    }
+
+    page_numbers = [rng.randint(1, 50) for _ in range(pages)]
+    results = {}
+    for name, build in variants.items():
+        # Warm up statement caches
+        with SessionLocal() as db:
+            build(db, 1)
+
+        statements[0] = 0
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        size = 0
+        for page in page_numbers:
+            with SessionLocal() as db:
+                size += len(build(db, page))
+        results[name] = {
+            "cpu_ms": (time.process_time() - cpu) * 1000 / pages,
+            "wall_ms": (time.perf_counter() - wall) * 1000 / pages,
+            "sql": statements[0] / pages,
+            "bytes": size / pages,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        bench.configure_environment(os.path.join(directory, "bench.db"), "none")
+        bench.seed(args.companies, args.posts, 0, rng)
+        results = run(args.pages, args.page_size, rng)
+
+    print(f"{args.pages} pages of {args.page_size} posts, {args.posts} posts from {args.companies} companies")
+    print(f"{'variant':<10} {'cpu ms/page':>12} {'wall ms/page':>13} {'sql/page':>9} {'bytes/page':>11}")
+    for name, stats in results.items():
+        print(
+            f"{name:<10} {stats['cpu_ms']:>12.2f} {stats['wall_ms']:>13.2f} "
+            f"{stats['sql']:>9.1f} {stats['bytes']:>11.0f}"
+        )
+    baseline = results["orm_lazy"]["cpu_ms"]
+    print(f"projected uses {results['projected']['cpu_ms'] / baseline:.0%} of the orm_lazy CPU time, "
+          f"{results['projected']['cpu_ms'] / results['orm_eager']['cpu_ms']:.0%} of orm_eager")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Checks every API endpoint for lazy loads and query budget overruns.
+
+Seeds a scratch SQLite database and calls each API route, with and
+without filters and for missing rows, with the query guard in "raise"
+mode. A lazy relationship load or more statements than the endpoint's
+``query_budget`` fails the call. Also fails for API routes that declare
+no budget or that no case below exercises, so new endpoints get covered.
+Prints the statements each case issued against its budget and exits with
+status 1 on any failure.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.query_budgets
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from typing import Dict, List, Optional, Tuple
+from . import endpoints as bench
+
+GUARD = {"X-Query-Guard": "raise"}
+
+POST = {
+    "company_id": 1, "title": "Budget Engineer", "location": "bangkok",
+    "salary": 40000, "min_year": 1, "requirement": "sql",
+}
+COMPANY = {"name": "Budget Company"}
+STUDENT = {"year": 2, "ku_generation": 82, "faculty": "Engineering", "email": "budget@bench.ku.th"}
+
+# (route path, method, request path, JSON body); {cursor:...} is filled in at run time
+CASES: List[Tuple[str, str, str, Optional[object]]] = [
+    ("/api/posts/", "GET", "/api/posts/", None),
+    ("/api/posts/", "GET", "/api/posts/?page=3&limit=50", None),
+    ("/api/posts/", "GET", "/api/posts/?search=python", None),
+    ("/api/posts/", "GET", "/api/posts/?work_field=backend&location=bangkok&onsite=true", None),
+    ("/api/posts/", "GET", "/api/posts/?cursor={cursor:posts}", None),
+    ("/api/posts/", "GET", "/api/posts/?region=northern&work_field=backend", None),
+    ("/api/posts/", "GET", "/api/posts/?salary_min=40000&min_year_max=1&sort=salary", None),
+    ("/api/posts/", "GET", "/api/posts/?sort=min_year&cursor={cursor:posts:min_year}", None),
+    ("/api/posts/facets", "GET", "/api/posts/facets?search=python&work_field=backend", None),
+    ("/api/posts/facets", "GET", "/api/posts/facets?region=central", None),
+    ("/api/posts/facets", "GET", "/api/posts/facets?salary_min=40000&work_field=backend", None),
+    ("/api/posts/{post_id}", "GET", "/api/posts/1", None),
+    ("/api/posts/{post_id}", "GET", "/api/posts/999999", None),
+    ("/api/posts/{post_id}/similar", "GET", "/api/posts/1/similar", None),
+    ("/api/posts/{post_id}/similar", "GET", "/api/posts/999999/similar?limit=5", None),
+    ("/api/posts/", "POST", "/api/posts/", POST),
+    ("/api/posts/", "POST", "/api/posts/", {**POST, "location": "budget-town"}),
+    ("/api/posts/bulk", "POST", "/api/posts/bulk", [POST, {**POST, "location": "budget-village"}, {**POST, "company_id": 999999}]),
+    ("/api/companies/", "GET", "/api/companies/", None),
+    ("/api/companies/", "GET", "/api/companies/?search=Bench", None),
+    ("/api/companies/", "GET", "/api/companies/?cursor={cursor:companies}", None),
+    ("/api/companies/{company_id}", "GET", "/api/companies/1", None),
+    ("/api/companies/{company_id}", "GET", "/api/companies/999999", None),
+    ("/api/companies/", "POST", "/api/companies/", {**COMPANY, "location": "phuket"}),
+    ("/api/companies/bulk", "POST", "/api/companies/bulk", [COMPANY, {**COMPANY, "location": "budget-city"}]),
+    ("/api/students/", "GET", "/api/students/", None),
+    ("/api/students/", "GET", "/api/students/?faculty=Engineering&year=2&fields=name,year", None),
+    ("/api/students/", "GET", "/api/students/?search=student", None),
+    ("/api/students/", "GET", "/api/students/?cursor={cursor:students}", None),
+    ("/api/students/{student_id}", "GET", "/api/students/1", None),
+    ("/api/students/{student_id}/recommendations", "GET", "/api/students/1/recommendations", None),
+    ("/api/students/{student_id}/recommendations", "GET", "/api/students/999999/recommendations?limit=5", None),
+    ("/api/students/", "POST", "/api/students/", STUDENT),
+    ("/api/locations/", "GET", "/api/locations/", None),
+    ("/api/exports/{dataset}", "GET", "/api/exports/posts", None),
+    ("/api/exports/{dataset}", "GET", "/api/exports/students?format=csv", None),
+    ("/api/auth/google/login", "GET", "/api/auth/google/login", None),
+    ("/api/auth/google/callback", "GET", "/api/auth/google/callback?code=bench-1&state=student", None),
+    ("/api/auth/user/me", "GET", "/api/auth/user/me", None),
+    ("/api/auth/user/{user_id}/role", "GET", "/api/auth/user/1/role", None),
+    ("/api/auth/user/{user_id}/role", "GET", "/api/auth/user/{student_user}/role", None),
+]
+
+
+async def run(companies: int, posts: int, students: int) -> List[Tuple[str, bool, str]]:
+    import httpx
+    from sqlalchemy import event
+    from .. import recommendations
+    from ..core.database import SessionLocal, async_engine, engine
+    from ..main import app
+    from ..utils.google_oauth import GoogleOAuth
+
+    GoogleOAuth.configure(httpx.ASGITransport(app=bench.build_oauth_stub(students)))
+    event.listen(engine, "before_cursor_execute", bench._count_statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", bench._count_statement)
+
+    with SessionLocal() as db:
+        recommendations.refresh(db)
+    recommendations.preload_similar_index().result()
+
+    routes = {
+        (route.path, method): route for route in app.routes if route.path.startswith("/api/")
+        for method in getattr(route, "methods", ())
+    }
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        # Unguarded setup: cursors for second pages and a token for /user/me
+        values: Dict[str, object] = {"student_user": companies + 1}
+        values["cursor:posts"] = (await client.get("/api/posts/?limit=5")).json()["next_cursor"]
+        for name in ("companies", "students"):
+            values[f"cursor:{name}"] = (await client.get(f"/api/{name}/?limit=5")).headers["X-Next-Cursor"]
+        values["cursor:posts:min_year"] = (await client.get("/api/posts/?limit=5&sort=min_year")).json()["next_cursor"]
+        login = await client.get("/api/auth/google/callback?code=bench-2&state=student")
+        headers = {**GUARD, "Authorization": f"Bearer {login.json()['access_token']}"}
+
+        for route_path, method, path, body in CASES:
+            for name, value in values.items():
+                path = path.replace("{" + name + "}", str(value))
+            budget = getattr(routes.get((route_path, method)) and routes[(route_path, method)].endpoint,
+                             "query_budget", None)
+            counter = [0]
+            token = bench._statements.set(counter)
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                error = "" if response.status_code < 500 else f"status {response.status_code}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            finally:
+                bench._statements.reset(token)
+            results.append((f"{method} {path}", not error, f"{counter[0]} of {budget} statements {error}".strip()))
+
+    for (route_path, method), route in sorted(routes.items()):
+        if getattr(route.endpoint, "query_budget", None) is None:
+            results.append((f"{method} {route_path}", False, "declares no query_budget"))
+        if not any(case[0] == route_path and case[1] == method for case in CASES):
+            results.append((f"{method} {route_path}", False, "not exercised by any case"))
+
+    # Refreshes scheduled by the POST cases must finish before the scratch database goes away
+    recommendations.shutdown()
+    await GoogleOAuth.aclose()
+    await async_engine.dispose()
+    return results
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        bench.configure_environment(os.path.join(directory, "budgets.db"), "none")
+        os.environ["QUERY_GUARD_HEADER"] = "true"
+        bench.seed(20, 500, 20, random.Random(42))
+        results = asyncio.run(run(20, 500, 20))
+
+    for name, passed, detail in results:
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<72} {detail}")
+    failed = sum(1 for _, passed, _ in results if not passed)
+    print(f"{len(results)} checks, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
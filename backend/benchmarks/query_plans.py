@@ -0,0 +1,187 @@
+"""
+Checks that the hot CRUD queries are served by indexes.
+
+Runs every query below against a scratch SQLite database built by the
+migrations, captures the SQL it issues and runs EXPLAIN QUERY PLAN on each
+statement. Exits with status 1 if any plan contains a full table scan
+("SCAN <table>" without an index) that the check does not explicitly allow.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.query_plans
+"""
+import os
+import re
+import sys
+import tempfile
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from .. import migrations
+from ..crud import company as crud_company
+from ..crud import location as crud_location
+from ..crud import post as crud_post
+from ..crud import recommendation as crud_recommendation
+from ..crud import student as crud_student
+from ..crud import user as crud_user
+from ..crud import table_version as crud_table_version
+from ..models import Company, Post, Student, User
+
+FULL_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+
+# (name, query, tables that may be scanned and why)
+CHECKS = [
+    ("posts: first page", lambda db: crud_post.get_posts(db, include_count=False), {}),
+    ("posts: cursor page", lambda db: crud_post.get_posts(db, cursor=_cursors["posts"], include_count=False), {}),
+    ("posts: work_field filter", lambda db: crud_post.get_posts(db, work_field="backend", include_count=False), {}),
+    (
+        "posts: work_field + location + onsite",
+        lambda db: crud_post.get_posts(db, work_field="backend", location="bangkok", onsite=True, include_count=False),
+        {},
+    ),
+    ("posts: location filter", lambda db: crud_post.get_posts(db, location="bangkok", include_count=False), {}),
+    ("posts: region filter", lambda db: crud_post.get_posts(db, region="central", include_count=False), {}),
+    (
+        "posts: region + work_field",
+        lambda db: crud_post.get_posts(db, region="northern", work_field="backend", include_count=False),
+        {},
+    ),
+    ("posts: region count", lambda db: crud_post.get_posts(db, region="central", page_size=1)[1], {}),
+    ("posts: by salary", lambda db: crud_post.get_posts(db, sort="salary", include_count=False), {}),
+    (
+        "posts: salary + min_year range, by salary",
+        lambda db: crud_post.get_posts(db, salary_min=40000, min_year_max=1, sort="salary", include_count=False),
+        {},
+    ),
+    (
+        "posts: work_field, by min_year",
+        lambda db: crud_post.get_posts(db, work_field="backend", sort="min_year", include_count=False),
+        {},
+    ),
+    (
+        "posts: salary cursor page",
+        lambda db: crud_post.get_posts(db, sort="salary", cursor=_cursors["posts:salary"], include_count=False),
+        {},
+    ),
+    ("posts: search", lambda db: crud_post.get_posts(db, search="python", include_count=False), {}),
+    ("posts: detail", lambda db: crud_post.get_post(db, 1), {}),
+    ("posts: list items by id", lambda db: crud_post.get_post_list_items(db, [3, 1, 2]), {}),
+    (
+        "posts: facets",
+        lambda db: crud_post.get_post_facets(db),
+        {"post_facet_counts": "one row per facet combination"},
+    ),
+    (
+        "posts: facets in a region",
+        lambda db: crud_post.get_post_facets(db, region="central"),
+        {"post_facet_counts": "one row per facet combination"},
+    ),
+    (
+        "locations: regions",
+        lambda db: crud_location.get_regions(db),
+        {"locations": "every location is listed"},
+    ),
+    (
+        "companies: first page",
+        lambda db: crud_company.get_companies(db, include_count=False),
+        {"companies": "rowid order, stops after LIMIT rows"},
+    ),
+    ("companies: cursor page", lambda db: crud_company.get_companies(db, cursor=_cursors["companies"], include_count=False), {}),
+    ("companies: detail", lambda db: crud_company.get_company_with_posts_count(db, 1), {}),
+    ("companies: by user", lambda db: crud_company.get_company_by_user_id(db, 1), {}),
+    ("students: by user", lambda db: crud_student.get_student_by_user_id(db, 1), {}),
+    (
+        "students: directory first page",
+        lambda db: crud_student.get_students(db, fields=["name"], include_count=False),
+        {"students": "rowid order, stops after LIMIT rows"},
+    ),
+    (
+        "students: faculty + major + year",
+        lambda db: crud_student.get_students(db, faculty="Engineering", major="CPE", year=1, include_count=False),
+        {},
+    ),
+    ("students: ku_generation", lambda db: crud_student.get_students(db, ku_generation=80, include_count=False), {}),
+    ("students: search", lambda db: crud_student.get_students(db, search="user", include_count=False), {}),
+    ("students: recommendations", lambda db: crud_recommendation.get_student_recommendations(db, 1), {}),
+    ("users: by email", lambda db: crud_user.get_user_by_email(db, "user1@example.com"), {}),
+    ("users: by google id", lambda db: crud_user.get_user_by_google_id(db, "google-1"), {}),
+    ("users: by id", lambda db: crud_user.get_user_by_id(db, 1), {}),
+    ("table versions", lambda db: crud_table_version.get_table_versions(db, "posts", "companies"), {}),
+]
+
+
+# Second-page cursors, taken after seeding so their queries are not captured
+_cursors = {}
+
+
+def _seed(db: Session):
+    for i in range(1, 4):
+        user = User(email=f"user{i}@example.com", first_name="User", last_name=str(i), google_id=f"google-{i}")
+        db.add(user)
+        db.flush()
+        company = Company(user_id=user.id, name=f"Company {i}", location="bangkok")
+        db.add(company)
+        db.add(Student(
+            user_id=user.id, name=f"User {i}", year=1, ku_generation=80, faculty="Engineering", major="CPE",
+            email=user.email
+        ))
+        db.flush()
+        for j in range(3):
+            db.add(Post(
+                company_id=company.id, title=f"Python Developer {j}", work_field="backend",
+                employment_type="full_time", location="bangkok", onsite=bool(j % 2),
+                salary=30000, min_year=0, requirement="Python"
+            ))
+    db.commit()
+    crud_location.link_locations(db)
+    crud_post.rebuild_facet_counts(db)
+    _cursors["posts"] = crud_post.get_posts(db, page_size=1, include_count=False)[2]
+    _cursors["posts:salary"] = crud_post.get_posts(db, page_size=1, sort="salary", include_count=False)[2]
+    _cursors["companies"] = crud_company.get_companies(db, page_size=1, include_count=False)[2]
+
+
+def main() -> int:
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'plans.db')}")
+    migrations.upgrade(engine)
+    with Session(engine) as db:
+        _seed(db)
+
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    failures = 0
+    for name, query, allowed in CHECKS:
+        failed = False
+        with Session(engine) as db:
+            captured.clear()
+            query(db)
+            statements = list(captured)
+
+        with engine.connect() as conn:
+            for statement, parameters in statements:
+                plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                details = [row[-1] for row in plan]
+                scans = [
+                    match.group(1) for match in map(FULL_SCAN_RE.match, details)
+                    if match and match.group(1) not in allowed
+                ]
+                if scans:
+                    failed = True
+                    print(f"FAIL  {name}: full scan of {', '.join(scans)}")
+                    print(f"      {' '.join(statement.split())}")
+                    for detail in details:
+                        print(f"      | {detail}")
+        if failed:
+            failures += 1
+        else:
+            print(f"ok    {name}")
+
+    print(f"\n{len(CHECKS)} checks, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
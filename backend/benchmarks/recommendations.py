@@ -0,0 +1,201 @@
+"""
+Measures building, refreshing and reading the stored student recommendations.
+
+Seeds a scratch database, gives the students varied faculties, majors
+and about-me texts, and reports:
+
+    build        recommendation rebuild over every student and post
+    cold load    a fresh engine reading the stored lists back before a no-op refresh
+    new post     refresh after one post is created
+    new student  refresh after one student is created
+    read         crud.recommendation.get_student_recommendations, per call
+
+It then checks that the incrementally refreshed lists agree with a full
+rebuild (the rebuild recomputes idf, so scores at the tail of a list
+can shift slightly) and that the read stays a single indexed statement.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.recommendations --posts 20000 --students 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from . import endpoints as bench
+
+# (faculty, major, skills the major's students tend to mention)
+MAJORS = [
+    ("Engineering", "Computer Engineering", ["python", "golang", "docker", "linux", "kubernetes"]),
+    ("Engineering", "Software Engineering", ["typescript", "react", "django", "fastapi", "postgresql"]),
+    ("Science", "Computer Science", ["python", "pytorch", "pandas", "sql", "rust"]),
+    ("Science", "Statistics", ["pandas", "sql", "tableau", "python"]),
+    ("Architecture", "Design", ["figma", "react", "vue"]),
+    ("Engineering", "Electrical Engineering", ["networking", "security", "linux", "aws"]),
+    ("Science", "Information Technology", ["aws", "terraform", "docker", "security"]),
+    ("Engineering", "Mobile Engineering", ["flutter", "kotlin", "swift"]),
+]
+
+
+def diversify_students(rng: random.Random):
+    """Gives the seeded students (all Computer Engineering) a mix of majors and about-me texts."""
+    from sqlalchemy import bindparam, select, update
+    from ..core.database import engine
+    from ..models import Student
+
+    with engine.begin() as conn:
+        rows = []
+        for student_id in conn.execute(select(Student.id)).scalars():
+            faculty, major, skills = rng.choice(MAJORS)
+            picked = rng.sample(skills, min(3, len(skills))) + rng.sample(bench.SKILLS, 1)
+            rows.append({
+                "student_id": student_id, "new_faculty": faculty, "new_major": major,
+                "new_about_me": f"I like {', '.join(picked)} and want to learn more.",
+            })
+        if rows:
+            conn.execute(
+                update(Student.__table__)
+                .where(Student.__table__.c.id == bindparam("student_id"))
+                .values(faculty=bindparam("new_faculty"), major=bindparam("new_major"),
+                        about_me=bindparam("new_about_me")),
+                rows,
+            )
+
+
+def stored_lists(db) -> Dict[int, List[int]]:
+    from sqlalchemy import select
+    from ..models import StudentRecommendation
+
+    lists: Dict[int, List[int]] = {}
+    rows = db.execute(
+        select(StudentRecommendation.student_id, StudentRecommendation.post_id)
+        .order_by(StudentRecommendation.student_id, StudentRecommendation.score.desc())
+    )
+    for student_id, post_id in rows:
+        lists.setdefault(student_id, []).append(post_id)
+    return lists
+
+
+def run(students: int, reads: int, rng: random.Random):
+    from sqlalchemy import event, insert
+    from ..config import settings
+    from ..core.database import SessionLocal, engine
+    from ..crud import recommendation as crud_recommendation
+    from ..models import Post, Student, User
+    from ..recommendations.engine import RecommendationEngine
+
+    timings = {}
+    checks = []
+    k = settings.RECOMMENDATIONS_TOP_K
+
+    recommender = RecommendationEngine(k)
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        stats = recommender.rebuild(db)
+        timings["build"] = time.perf_counter() - start
+    checks.append(("build ranks every student", stats["students"] == students, f"{stats['students']} students"))
+
+    with SessionLocal() as db:
+        cold = RecommendationEngine(k)
+        start = time.perf_counter()
+        stats = cold.refresh(db)
+        timings["cold load"] = time.perf_counter() - start
+    checks.append(("cold load refreshes nothing", not stats["rewritten"], f"{stats['rewritten']} rewritten"))
+
+    skills = rng.sample(bench.SKILLS, 4)
+    with engine.begin() as conn:
+        conn.execute(insert(Post).values(
+            company_id=1, title=f"{skills[0].title()} Developer", work_field="backend", location="bangkok",
+            salary=50000, min_year=0, requirement=", ".join(skills),
+            description=f"Work with {skills[1]} and {skills[2]}.",
+        ))
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        post_stats = recommender.refresh(db)
+        timings["new post"] = time.perf_counter() - start
+
+    with engine.begin() as conn:
+        user_id = conn.execute(insert(User).values(
+            email="fresh@bench.ku.th", first_name="Fresh", last_name="Student"
+        )).inserted_primary_key[0]
+        student_id = conn.execute(insert(Student).values(
+            user_id=user_id, year=2, ku_generation=82, faculty="Science", major="Computer Science",
+            email="fresh@bench.ku.th", about_me="python, pandas and pytorch",
+        )).inserted_primary_key[0]
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        student_stats = recommender.refresh(db)
+        timings["new student"] = time.perf_counter() - start
+    checks.append((
+        "new post refresh only rewrites changed lists",
+        post_stats["posts"] == 1 and post_stats["rewritten"] < students,
+        f"{post_stats['rewritten']} of {students} rewritten",
+    ))
+    checks.append((
+        "new student refresh rewrites one list",
+        student_stats["students"] == 1 and student_stats["rewritten"] == 1,
+        f"{student_stats['rewritten']} rewritten",
+    ))
+
+    with SessionLocal() as db:
+        incremental = stored_lists(db)
+        RecommendationEngine(k).rebuild(db)
+        rebuilt = stored_lists(db)
+    overlaps = [
+        len(set(incremental.get(sid, [])) & set(posts)) / len(posts) for sid, posts in rebuilt.items() if posts
+    ]
+    mean_overlap = sum(overlaps) / len(overlaps) if overlaps else 0.0
+    checks.append(("incremental lists match a rebuild", mean_overlap >= 0.95, f"mean overlap {mean_overlap:.1%}"))
+    checks.append((
+        "new student has recommendations", bool(rebuilt.get(student_id)), f"{len(rebuilt.get(student_id, []))} posts"
+    ))
+
+    statements = [0]
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    ids = [rng.randint(1, students) for _ in range(reads)]
+    with SessionLocal() as db:
+        crud_recommendation.get_student_recommendations(db, 1, k)
+        statements[0] = 0
+        start = time.perf_counter()
+        for sid in ids:
+            crud_recommendation.get_student_recommendations(db, sid, k)
+        timings["read"] = (time.perf_counter() - start) / reads
+    event.remove(engine, "before_cursor_execute", count)
+    checks.append(("read is one statement", statements[0] == reads, f"{statements[0] / reads:.1f} per read"))
+    return timings, checks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        bench.configure_environment(os.path.join(directory, "bench.db"), "none")
+        bench.seed(args.companies, args.posts, args.students, rng)
+        diversify_students(rng)
+        timings, checks = run(args.students, args.reads, rng)
+
+    print(f"{args.posts} posts, {args.students} students")
+    for name, seconds in timings.items():
+        print(f"{name:<12} {seconds * 1000:>10.2f} ms")
+    for name, passed, detail in checks:
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<48} {detail}")
+    failed = sum(1 for _, passed, _ in checks if not passed)
+    print(f"{len(checks)} checks, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
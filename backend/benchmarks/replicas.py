@@ -0,0 +1,140 @@
+"""
+Checks read/write routing against a primary and two replica SQLite files.
+
+Seeds a scratch primary database, copies it into two read-only replicas
+with the SQLite backup API and points READ_REPLICA_URLS at them. Then
+drives the API in-process and checks that reads are spread over the
+replicas, writes go to the primary, a client that just wrote reads its
+own write, and reads fall back to the other replica and finally to the
+primary when replicas disappear. Prints the statements each database
+served and exits with status 1 if any check fails.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.replicas --reads 60
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from . import endpoints as bench
+
+
+def refresh_replica(primary_path: str, replica_path: str):
+    """Copies the primary into the replica file; the copy uses a rollback journal so it can be opened read-only."""
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+        target.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        target.close()
+        source.close()
+
+
+async def run(args, replica_paths) -> list:
+    import httpx
+    from sqlalchemy import event
+    from ..core.database import async_engine, replicas
+    from ..main import app
+
+    served = {"primary": 0, "replica 1": 0, "replica 2": 0}
+
+    def counter(name):
+        def count(conn, cursor, statement, parameters, context, executemany):
+            served[name] += 1
+        return count
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter("primary"))
+    for index, replica in enumerate(replicas.engines, start=1):
+        event.listen(replica.sync_engine, "before_cursor_execute", counter(f"replica {index}"))
+
+    checks = []
+
+    def check(name: str, passed: bool, detail: str = ""):
+        checks.append((name, passed, detail))
+
+    def reset():
+        for name in served:
+            served[name] = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        reset()
+        for n in range(args.reads):
+            response = await client.get(f"/api/posts/?page={n % 10 + 1}")
+            response.raise_for_status()
+        check(
+            "reads are served by the replicas",
+            served["primary"] == 0 and served["replica 1"] > 0 and served["replica 2"] > 0,
+            str(dict(served)),
+        )
+
+        reset()
+        response = await client.post("/api/posts/", json={
+            "company_id": 1, "title": "Replica Routing Engineer", "location": "bangkok",
+            "salary": 50000, "min_year": 1, "requirement": "sql",
+        })
+        response.raise_for_status()
+        post_id = response.json()["id"]
+        cookie = client.cookies.get("primary_until")
+        client.cookies.clear()
+        check("writes go to the primary", served["replica 1"] + served["replica 2"] == 0, str(dict(served)))
+        check("writes start a read-your-writes window", cookie is not None)
+
+        response = await client.get(f"/api/posts/{post_id}", headers={"Cookie": f"primary_until={cookie}"})
+        check("the writer reads its own write", response.status_code == 200, f"status {response.status_code}")
+        response = await client.get(f"/api/posts/{post_id}")
+        check("other clients read the lagging replica", response.status_code == 404, f"status {response.status_code}")
+        response = await client.get(f"/api/posts/{post_id}", headers={"Cookie": f"primary_until={time.time() - 1}"})
+        check("the window expires", response.status_code == 404, f"status {response.status_code}")
+
+        for index, path in enumerate(replica_paths):
+            await replicas.engines[index].dispose()
+            os.rename(path, path + ".gone")
+            reset()
+            for n in range(args.reads // 3):
+                response = await client.get(f"/api/posts/?page={n % 10 + 1}")
+                response.raise_for_status()
+            healthy = [status["healthy"] for status in (await client.get("/stats/db")).json()["replicas"]]
+            expected = [position > index for position in range(len(replica_paths))]
+            target = "the other replica" if index + 1 < len(replica_paths) else "the primary"
+            check(f"replica {index + 1} gone: reads fall back to {target}", healthy == expected,
+                  f"{dict(served)}, healthy {healthy}")
+
+    await async_engine.dispose()
+    await replicas.dispose()
+    return checks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        primary = os.path.join(directory, "primary.db")
+        replica_paths = [os.path.join(directory, f"replica{n}.db") for n in (1, 2)]
+        bench.configure_environment(primary, "none")
+        os.environ["READ_REPLICA_URLS"] = ",".join(
+            f"sqlite:///file:{path}?mode=ro&uri=true" for path in replica_paths
+        )
+        bench.seed(args.companies, args.posts, 0, random.Random(args.seed))
+        for path in replica_paths:
+            refresh_replica(primary, path)
+        checks = asyncio.run(run(args, replica_paths))
+
+    for name, passed, detail in checks:
+        print(f"{'ok  ' if passed else 'FAIL'} {name}" + (f"  ({detail})" if detail else ""))
+    failed = sum(1 for _, passed, _ in checks if not passed)
+    print(f"{len(checks)} checks, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Measures the similar-posts index: building it, looking posts up and adding new ones.
+
+Seeds a scratch database and reports:
+
+    build     the background build, which reads and vectorizes every post
+    lookup    recommendations.similar_posts per call (p50/p95/max), new-post check included
+    add       a lookup right after a post is created, which appends it first
+
+and checks that a lookup during the build answers "not ready" at once
+instead of waiting for it, that a newly created post is found by a
+lookup of the post it was copied from, and that the pruned candidate
+search returns the same neighbours as scoring every post with the full
+vector.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.similar_posts --posts 100000 --lookups 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from . import endpoints as bench
+
+
+def run(posts: int, lookups: int, k: int, rng: random.Random):
+    import numpy as np
+    from sqlalchemy import insert, select
+    from .. import recommendations
+    from ..core.database import engine
+    from ..models import Post
+    from ..recommendations.vectors import top_k
+
+    timings = {}
+    checks = []
+
+    start = time.perf_counter()
+    build = recommendations.preload_similar_index()
+    try:
+        recommendations.similar_posts(1, k)
+        waited = None
+    except recommendations.SimilarIndexNotReady:
+        waited = time.perf_counter() - start
+    build.result()
+    timings["build"] = [time.perf_counter() - start]
+    checks.append((
+        "lookup during build is not kept waiting",
+        waited is not None and waited < 0.1,
+        "answered after the build" if waited is None else f"not ready after {waited * 1000:.1f} ms",
+    ))
+
+    ids = [rng.randint(1, posts) for _ in range(lookups)]
+    samples = []
+    results = {}
+    for post_id in ids:
+        start = time.perf_counter()
+        results[post_id] = recommendations.similar_posts(post_id, k)
+        samples.append(time.perf_counter() - start)
+    timings["lookup"] = samples
+
+    with engine.begin() as conn:
+        source = conn.execute(select(Post).where(Post.id == ids[0])).mappings().one()
+        copy = {column: source[column] for column in source.keys() if column not in ("id", "location_id")}
+        new_id = conn.execute(insert(Post).values(**copy)).inserted_primary_key[0]
+    start = time.perf_counter()
+    found = recommendations.similar_posts(ids[0], k)
+    timings["add"] = [time.perf_counter() - start]
+    checks.append((
+        "new post found by its source",
+        bool(found) and found[0][0] == new_id,
+        f"top match {found[0] if found else None}, new post {new_id}",
+    ))
+    checks.append(("missing post is None", recommendations.similar_posts(10 ** 9, k) is None, ""))
+
+    # Recall of the pruned search against scoring every post with the full vector
+    index = recommendations.get_similar_index().index
+    recalls = []
+    for post_id in ids[1:101]:
+        position = index.position(post_id)
+        scores = index.scores(index.row(position))
+        scores[position] = 0
+        exact = {int(index.ids[i]) for i in top_k(scores, k)[0] if i >= 0}
+        if exact:
+            recalls.append(len(exact & {match for match, _ in results[post_id]}) / len(exact))
+    recall = float(np.mean(recalls)) if recalls else 0.0
+    checks.append(("pruned search recall", recall >= 0.9, f"{recall:.1%} of the exact top {k}"))
+    return timings, checks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        bench.configure_environment(os.path.join(directory, "bench.db"), "none")
+        bench.seed(args.companies, args.posts, 0, rng)
+        timings, checks = run(args.posts, args.lookups, args.limit, rng)
+
+    print(f"{args.posts} posts, top {args.limit}")
+    for name, samples in timings.items():
+        samples = sorted(samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        print(
+            f"{name:<8} p50 {statistics.median(samples) * 1000:>9.2f} ms   "
+            f"p95 {p95 * 1000:>9.2f} ms   max {samples[-1] * 1000:>9.2f} ms"
+        )
+    for name, passed, detail in checks:
+        print(f"{'ok  ' if passed else 'FAIL'} {name:<40} {detail}")
+    failed = sum(1 for _, passed, _ in checks if not passed)
+    print(f"{len(checks)} checks, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Startup benchmark: how long a fresh worker takes to serve its first request.
+
+Seeds a scratch SQLite database once, then boots the app in ``--runs``
+fresh interpreters and records, per run, the time to import
+``backend.main``, to run the lifespan startup (schema handling per
+SCHEMA_ON_STARTUP), and to answer the first and second post listing
+requests. Also lists the lazily imported packages that were loaded
+during boot anyway. Reports the median of every phase.
+
+Results can be stored as a named baseline in ``benchmarks/baselines`` and
+later runs compared against it; the comparison exits with status 1 when a
+phase got slower than the tolerance allows.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.startup --runs 7
+    python -m backend.benchmarks.startup --schema skip --runs 7
+    python -m backend.benchmarks.startup --save-baseline startup
+    python -m backend.benchmarks.startup --compare startup
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from . import endpoints as bench
+
+PHASES = ("import_ms", "startup_ms", "first_request_ms", "second_request_ms", "total_ms")
+
+# Packages that boot must not import; they are loaded on first use
+LAZY_PACKAGES = ("jose", "httpx", "numpy")
+
+
+def child():
+    """Boots the app in this fresh interpreter and prints the phase timings as JSON."""
+    started = time.perf_counter()
+    from ..main import app
+    imported = time.perf_counter()
+    eager = [name for name in LAZY_PACKAGES if name in sys.modules]
+
+    async def serve():
+        import httpx
+
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                (await client.get("/api/posts/")).raise_for_status()
+                first = time.perf_counter()
+                (await client.get("/api/posts/?page=2")).raise_for_status()
+                second = time.perf_counter()
+        return ready, first, second
+
+    import asyncio
+    ready, first, second = asyncio.run(serve())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_request_ms": (first - ready) * 1000,
+        "second_request_ms": (second - first) * 1000,
+        "total_ms": (first - started) * 1000,
+        "eager_imports": eager,
+    }))
+
+
+def run(args) -> dict:
+    runs: List[Dict] = []
+    env = {**os.environ, "SCHEMA_ON_STARTUP": args.schema}
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "backend.benchmarks.startup", "--child"],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "config": {"runs": args.runs, "schema": args.schema, "posts": args.posts},
+        "phases": {phase: statistics.median(run[phase] for run in runs) for phase in PHASES},
+        "eager_imports": sorted({name for run in runs for name in run["eager_imports"]}),
+    }
+
+
+def print_report(result: dict):
+    config = result["config"]
+    print(f"{config['runs']} cold starts, SCHEMA_ON_STARTUP={config['schema']}, median per phase")
+    for phase, value in result["phases"].items():
+        print(f"{phase:<18} {value:>9.1f}")
+    eager = result["eager_imports"]
+    print(f"lazy packages imported during boot: {', '.join(eager) if eager else 'none'}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_ms: float) -> List[str]:
+    regressions = []
+    for phase, old in baseline["phases"].items():
+        new = result["phases"].get(phase)
+        if new is not None and new > old * (1 + tolerance) and new - old > min_ms:
+            regressions.append(f"{phase}: {old:.1f} -> {new:.1f} ms")
+    for name in result["eager_imports"]:
+        if name not in baseline["eager_imports"]:
+            regressions.append(f"{name} is now imported during boot")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--schema", choices=["migrate", "check", "skip"], default="migrate")
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench.configure_environment(os.path.join(directory, "startup.db"), "none")
+        bench.seed(args.companies, args.posts, 0, random.Random(42))
+        result = run(args)
+
+    print_report(result)
+    if args.save_baseline:
+        path = bench.BASELINES_DIR / f"{args.save_baseline}.json"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(result, indent=2) + "\n")
+        print(f"saved baseline {path}")
+    if args.compare:
+        baseline = json.loads((bench.BASELINES_DIR / f"{args.compare}.json").read_text())
+        regressions = compare(result, baseline, args.tolerance, args.min_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
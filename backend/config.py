@@ -1,18 +1,90 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./app.db"
+    # Derived from DATABASE_URL (e.g. sqlite -> sqlite+aiosqlite) when empty
+    ASYNC_DATABASE_URL: str = ""
     PROJECT_NAME: str = "KUTechnest API"
 
+    # Schema handling at startup, run in the lifespan hook rather than on
+    # import: "migrate" applies pending migrations, "check" refuses to start
+    # while any are pending, "skip" trusts the deployment to have migrated
+    SCHEMA_ON_STARTUP: str = "migrate"
+
+    # SQLite pragma profile applied on connect: "default", "wal" or "wal_durable"
+    DATABASE_PROFILE: str = "wal"
+    # Per-pragma overrides of the profile, unset keeps the profile's value
+    SQLITE_JOURNAL_MODE: Optional[str] = None
+    SQLITE_SYNCHRONOUS: Optional[str] = None
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = None
+    SQLITE_MMAP_SIZE: Optional[int] = None
+    SQLITE_CACHE_SIZE: Optional[int] = None
+    # Connection pool of file and server databases (per engine)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Seconds before a pooled connection is replaced, -1 keeps it forever
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+
+    # Comma separated read replica URLs, empty sends reads to the primary.
+    # Open SQLite replicas read-only: sqlite:///file:replica.db?mode=ro&uri=true
+    READ_REPLICA_URLS: str = ""
+    # Seconds a client keeps reading from the primary after a write
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    READ_YOUR_WRITES_COOKIE: str = "primary_until"
+    # Seconds a replica that failed to connect is skipped
+    REPLICA_RETRY_SECONDS: float = 30.0
+
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:5173/auth/callback"
+    # Issuer serving /.well-known/openid-configuration, empty for Google
+    GOOGLE_OAUTH_BASE_URL: str = ""
+    GOOGLE_OAUTH_TIMEOUT: float = 10.0
+    GOOGLE_OAUTH_MAX_CONNECTIONS: int = 20
+    GOOGLE_OAUTH_MAX_CONCURRENCY: int = 50
+    GOOGLE_OAUTH_CACHE_TTL: float = 3600.0
 
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL: float = 60.0
+
+    # Post listing result cache: "memory", "redis" (needs the redis package) or "none"
+    RESULT_CACHE_BACKEND: str = "memory"
+    RESULT_CACHE_TTL: float = 300.0
+    RESULT_CACHE_MAX_ENTRIES: int = 2048
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESULT_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Prometheus metrics at /metrics, fed by a middleware and SQL event hooks
+    METRICS_ENABLED: bool = True
+    # Statements at least this slow are logged with the route that issued them
+    SLOW_QUERY_MS: float = 200.0
+
+    # Query guard for every request: "" (off), "log" or "raise". Flags lazy
+    # relationship loads and endpoints going over their query_budget.
+    QUERY_GUARD: str = ""
+    # Let a request turn the guard on with an X-Query-Guard: log|raise header
+    QUERY_GUARD_HEADER: bool = False
+
+    # Largest batch accepted by the bulk create endpoints
+    BULK_MAX_ITEMS: int = 1000
+    # Rows fetched and sent per chunk by the streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Posts stored per student by the recommendation refresh
+    RECOMMENDATIONS_TOP_K: int = 20
+    # Refresh recommendations on a background thread after posts or students are created
+    RECOMMENDATIONS_REFRESH: bool = True
+    # Build the similar-posts index in the background at startup; otherwise the first lookup starts
+    # the build, and lookups answer 503 until it is done
+    SIMILAR_POSTS_PRELOAD: bool = True
 
     class Config:
         env_file = ".env"
@@ -1,21 +1,177 @@
+import math
+import time
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from ..config import settings
+from .db_profiles import apply_sqlite_pragmas, engine_options, pool_stats, sqlite_pragmas
+from .query_guard import guard_engine
+from .replicas import ReplicaSet
+from ..utils.metrics import instrument_engine
 
-# Database setup
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def _engine_options(url: str, async_driver: bool = False) -> dict:
+    return engine_options(
+        url,
+        async_driver=async_driver,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+SQLITE_PRAGMAS = sqlite_pragmas(
+    settings.DATABASE_PROFILE,
+    journal_mode=settings.SQLITE_JOURNAL_MODE,
+    synchronous=settings.SQLITE_SYNCHRONOUS,
+    busy_timeout=settings.SQLITE_BUSY_TIMEOUT_MS,
+    mmap_size=settings.SQLITE_MMAP_SIZE,
+    cache_size=settings.SQLITE_CACHE_SIZE,
 )
 
+# Database setup
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+apply_sqlite_pragmas(engine, SQLITE_PRAGMAS)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the API. Requests run the crud functions on it through
+# AsyncSession.run_sync, so database I/O no longer blocks the event loop.
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, async_driver=True))
+apply_sqlite_pragmas(async_engine.sync_engine, SQLITE_PRAGMAS)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+def _replica_engine(url: str):
+    url = async_database_url(url.strip())
+    replica = create_async_engine(url, **_engine_options(url, async_driver=True))
+    # The journal mode belongs to the file and cannot be set on a read-only one
+    apply_sqlite_pragmas(
+        replica.sync_engine, {name: value for name, value in SQLITE_PRAGMAS.items() if name != "journal_mode"}
+    )
+    return replica
+
+
+# Read replicas. They are only read from; keeping them in sync with the
+# primary is up to the database (or, for SQLite files, whatever copies them).
+replicas = ReplicaSet(
+    [_replica_engine(url) for url in settings.READ_REPLICA_URLS.split(",") if url.strip()],
+    retry_after=settings.REPLICA_RETRY_SECONDS,
+)
+
+
+def _instrument(sync_engine, name: str):
+    guard_engine(sync_engine)
+    if settings.METRICS_ENABLED:
+        instrument_engine(sync_engine, name)
+
+
+_instrument(engine, "primary")
+_instrument(async_engine.sync_engine, "primary_async")
+for number, replica in enumerate(replicas.engines, start=1):
+    _instrument(replica.sync_engine, f"replica_{number}")
+
 Base = declarative_base()
 
+
+def pool_stats_by_engine() -> dict:
+    pools = {"primary": pool_stats(engine), "primary_async": pool_stats(async_engine.sync_engine)}
+    for number, replica in enumerate(replicas.engines, start=1):
+        pools[f"replica_{number}"] = pool_stats(replica.sync_engine)
+    return pools
+
+
+def database_stats() -> dict:
+    """Pool occupancy and checkout wait times of both engines."""
+    return {
+        "profile": settings.DATABASE_PROFILE,
+        "pragmas": SQLITE_PRAGMAS if engine.dialect.name == "sqlite" else {},
+        "pool": pool_stats(engine),
+        "async_pool": pool_stats(async_engine.sync_engine),
+        "replicas": [
+            {**status, "pool": pool_stats(replica.sync_engine)}
+            for status, replica in zip(replicas.stats(), replicas.engines)
+        ],
+    }
+
 # Dependency for routes
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Session on the primary, for reads that must not lag behind writes."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _wrote_recently(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(settings.READ_YOUR_WRITES_COOKIE, "")) > time.time()
+    except ValueError:
+        return False
+
+
+async def open_read_session(use_primary: bool = False) -> AsyncSession:
+    """Returns a session on a healthy replica, or on the primary when there is none."""
+    while not use_primary:
+        replica = replicas.choose()
+        if replica is None:
+            break
+        db = AsyncSessionLocal(bind=replica)
+        try:
+            await db.connection()
+            return db
+        except DBAPIError:
+            await db.close()
+            replicas.mark_down(replica)
+    return AsyncSessionLocal()
+
+
+async def get_read_db(request: Request):
+    """
+    Session for endpoints that only read.
+
+    Served by a replica, except for clients that wrote within the last
+    READ_YOUR_WRITES_SECONDS, which read from the primary so they see
+    their own changes.
+    """
+    async with await open_read_session(use_primary=_wrote_recently(request)) as db:
+        yield db
+
+
+async def get_write_db(response: Response):
+    """Session on the primary; starts the client's read-your-writes window when replicas are used."""
+    if replicas:
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            settings.READ_YOUR_WRITES_COOKIE, f"{time.time() + window:.3f}",
+            max_age=math.ceil(window), httponly=True, samesite="lax"
+        )
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,165 @@
+import time
+from threading import Lock
+from typing import Any, Dict, Optional
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# SQLite pragmas applied to every new connection, per DATABASE_PROFILE.
+DATABASE_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Driver defaults: rollback journal, a writer blocks every reader
+    "default": {},
+    # Write-ahead log: readers and the writer no longer block each other.
+    # synchronous=NORMAL is safe in WAL mode; a power loss can drop the
+    # last commits but never corrupts the database.
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "temp_store": "MEMORY",
+    },
+    # WAL with every commit synced to disk
+    "wal_durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+
+# Upper bounds, in seconds, of the pool checkout wait histogram
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def sqlite_pragmas(profile: str, **overrides) -> Dict[str, Any]:
+    """Returns the pragmas of ``profile`` with every override that is not None applied."""
+    if profile not in DATABASE_PROFILES:
+        raise ValueError(f"Unknown database profile {profile!r}, expected one of {', '.join(DATABASE_PROFILES)}")
+    pragmas = dict(DATABASE_PROFILES[profile])
+    pragmas.update({name: value for name, value in overrides.items() if value is not None})
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]):
+    """Runs the pragmas on every connection ``engine`` opens. Does nothing for other databases."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def _is_memory_database(url: str) -> bool:
+    return url.startswith("sqlite") and (url.rstrip("/").endswith(":") or ":memory:" in url or url.endswith("://"))
+
+
+def engine_options(
+    url: str,
+    async_driver: bool = False,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False
+) -> Dict[str, Any]:
+    """Keyword arguments for create_engine / create_async_engine with a timed, tunable pool."""
+    options: Dict[str, Any] = {}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    # In-memory SQLite keeps SQLAlchemy's single-connection pools
+    if _is_memory_database(url):
+        return options
+
+    options.update(
+        poolclass=TimedAsyncQueuePool if async_driver else TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+    )
+    return options
+
+
+class PoolWaitMetrics:
+    """Counts pool checkouts and how long callers waited for a connection."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.buckets = [0] * len(POOL_WAIT_BUCKETS)
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            for index, bound in enumerate(POOL_WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[index] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_total": self.wait_seconds * 1000,
+                "wait_ms_avg": self.wait_seconds * 1000 / self.checkouts if self.checkouts else 0.0,
+                "wait_ms_max": self.max_wait_seconds * 1000,
+                # Cumulative counts of checkouts that waited at most each bound
+                "wait_buckets": dict(zip(POOL_WAIT_BUCKETS, self.buckets)),
+            }
+
+
+class _TimedCheckout:
+    """
+    Pool mixin timing how long each checkout waits for a free connection.
+
+    The metrics live on the pool, so they restart when the engine is disposed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_metrics = PoolWaitMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_metrics.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(engine: Engine) -> Optional[Dict[str, Any]]:
+    pool = engine.pool
+    metrics = getattr(pool, "wait_metrics", None)
+    if metrics is None:
+        return None
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        **metrics.snapshot(),
+    }
@@ -0,0 +1,147 @@
+import logging
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, Session
+
+GUARD_MODES = ("log", "raise")
+GUARD_HEADER = b"x-query-guard"
+
+logger = logging.getLogger(__name__)
+
+
+class LazyLoadError(RuntimeError):
+    """A relationship was loaded lazily, one query per parent row, while the guard was on."""
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request issued more SQL statements than its endpoint's query budget."""
+
+
+class QueryGuard:
+    """
+    Watches the statements of one request (or one block of code).
+
+    Unplanned lazy relationship loads and statements beyond ``budget`` are
+    violations: with mode "raise" they raise at the offending statement,
+    with mode "log" they are logged with the stack that issued them.
+    """
+
+    def __init__(self, mode: str = "raise", budget: Optional[int] = None, scope: Optional[dict] = None):
+        if mode not in GUARD_MODES:
+            raise ValueError(f"Unknown query guard mode {mode!r}, expected one of {', '.join(GUARD_MODES)}")
+        self.mode = mode
+        self._budget = budget
+        self.scope = scope
+        self.statements = 0
+        self.violations = []
+
+    @property
+    def budget(self) -> Optional[int]:
+        if self._budget is not None or self.scope is None:
+            return self._budget
+        # Requests take the budget of the endpoint they were routed to
+        return getattr(self.scope.get("endpoint"), "query_budget", None)
+
+    @property
+    def where(self) -> str:
+        if self.scope is None:
+            return "guarded block"
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+    def violation(self, error: RuntimeError):
+        self.violations.append(str(error))
+        if self.mode == "raise":
+            raise error
+        logger.warning("%s\n%s", error, "".join(traceback.format_stack(limit=30)[:-2]))
+
+
+_current_guard: ContextVar[Optional[QueryGuard]] = ContextVar("query_guard", default=None)
+
+
+@contextmanager
+def query_guard(mode: str = "raise", budget: Optional[int] = None, scope: Optional[dict] = None):
+    """Guards the statements run inside the block; yields the QueryGuard for inspection."""
+    guard = QueryGuard(mode, budget, scope)
+    token = _current_guard.set(guard)
+    try:
+        yield guard
+    finally:
+        _current_guard.reset(token)
+
+
+def query_budget(statements: int) -> Callable:
+    """
+    Declares how many SQL statements one call of the decorated endpoint may issue.
+
+    Place it below the route decorator. The budget is only enforced while
+    the query guard is on.
+    """
+    def decorate(endpoint: Callable) -> Callable:
+        endpoint.query_budget = statements
+        return endpoint
+    return decorate
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _check_lazy_load(orm_execute_state: ORMExecuteState):
+    guard = _current_guard.get()
+    if guard is None or not orm_execute_state.is_select or orm_execute_state.lazy_loaded_from is None:
+        return
+    parent = orm_execute_state.lazy_loaded_from
+    attribute = orm_execute_state.loader_strategy_path[-1] if orm_execute_state.loader_strategy_path else "?"
+    guard.violation(LazyLoadError(
+        f"Lazy load of {parent.class_.__name__}.{getattr(attribute, 'key', attribute)} during {guard.where}; "
+        "load it eagerly (joinedload, selectinload or contains_eager) in the query"
+    ))
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    guard = _current_guard.get()
+    if guard is None:
+        return
+    guard.statements += 1
+    budget = guard.budget
+    if budget is not None and guard.statements == budget + 1:
+        guard.violation(QueryBudgetExceeded(
+            f"{guard.where} issued more than its budget of {budget} SQL statements; "
+            f"statement {guard.statements}: {' '.join(statement.split())[:500]}"
+        ))
+
+
+def guard_engine(engine: Engine):
+    """Counts ``engine``'s statements against the guard of the current request."""
+    event.listen(engine, "before_cursor_execute", _count_statement)
+
+
+class QueryGuardMiddleware:
+    """
+    ASGI middleware turning the query guard on for HTTP requests.
+
+    The mode comes from the ``X-Query-Guard`` request header when
+    ``allow_header`` is set, otherwise from ``default_mode``; requests
+    without a mode run unguarded.
+    """
+
+    def __init__(self, app, default_mode: str = "", allow_header: bool = False):
+        self.app = app
+        self.default_mode = default_mode
+        self.allow_header = allow_header
+
+    async def __call__(self, scope, receive, send):
+        mode = self.default_mode
+        if scope["type"] == "http" and self.allow_header:
+            for name, value in scope["headers"]:
+                if name == GUARD_HEADER:
+                    mode = value.decode("latin-1").strip().lower()
+                    break
+        if scope["type"] != "http" or mode not in GUARD_MODES:
+            await self.app(scope, receive, send)
+            return
+
+        with query_guard(mode, scope=scope):
+            await self.app(scope, receive, send)
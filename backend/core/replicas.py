@@ -0,0 +1,67 @@
+import itertools
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class ReplicaSet:
+    """
+    Round-robin choice between read replica engines.
+
+    A replica that fails to connect, or drops a connection mid-query, is
+    marked down and skipped for ``retry_after`` seconds; reads go to the
+    primary while every replica is down.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], retry_after: float = 30.0):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._down_until: Dict[int, float] = {}
+        self._failures: Dict[int, int] = {}
+        self._next = itertools.cycle(range(len(engines)))
+        self._lock = Lock()
+        for engine in engines:
+            event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def _handle_error(self, context):
+        if context.is_disconnect:
+            for engine in self.engines:
+                if engine.sync_engine is context.engine:
+                    self.mark_down(engine)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Returns the next healthy replica, None when there is none."""
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                index = next(self._next)
+                if self._down_until.get(index, 0.0) <= now:
+                    return self.engines[index]
+        return None
+
+    def mark_down(self, engine: AsyncEngine):
+        index = self.engines.index(engine)
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_after
+            self._failures[index] = self._failures.get(index, 0) + 1
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": engine.url.render_as_string(hide_password=True),
+                    "healthy": self._down_until.get(index, 0.0) <= now,
+                    "failures": self._failures.get(index, 0),
+                }
+                for index, engine in enumerate(self.engines)
+            ]
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
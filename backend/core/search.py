@@ -0,0 +1,75 @@
+import re
+from typing import Optional
+from sqlalchemy import Float, Integer, column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# Full-text index over posts (SQLite FTS5), created by migration m0002. The
+# index is kept in sync by triggers, so every writer (crud, seed script, raw
+# SQL) updates it.
+POSTS_FTS_TABLE = "posts_fts"
+
+# bm25() column weights, in the order of the FTS columns: title,
+# description, requirement, long_description, company_name
+POSTS_FTS_WEIGHTS = (10.0, 2.0, 1.0, 1.0, 5.0)
+
+POSTS_FTS_BACKFILL = """
+    INSERT INTO posts_fts(rowid, title, description, requirement, long_description, company_name)
+    SELECT p.id, p.title, p.description, p.requirement, p.long_description, c.name
+    FROM posts p LEFT JOIN companies c ON c.id = p.company_id
+"""
+
+# Student directory search over name, nick name and about me (migration m0005)
+STUDENTS_FTS_TABLE = "students_fts"
+
+STUDENTS_FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def rebuild_search_index(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        return
+
+    conn.execute(text("DELETE FROM posts_fts"))
+    conn.execute(text(POSTS_FTS_BACKFILL))
+
+
+def has_search_index(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def build_match_query(search: str) -> Optional[str]:
+    """
+    Turns free text typed in the search box into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term so the user input can never be
+    parsed as FTS syntax, and partially typed words still match.
+    """
+    tokens = _TOKEN_RE.findall(search)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _search_hits(table: str, weights: tuple, match: str, name: str):
+    weights = ", ".join(str(weight) for weight in weights)
+    return (
+        text(
+            f"SELECT rowid, bm25({table}, {weights}) AS rank "
+            f"FROM {table} WHERE {table} MATCH :match"
+        )
+        .bindparams(match=match)
+        .columns(column("rowid", Integer), column("rank", Float))
+        .subquery(name)
+    )
+
+
+def post_search_hits(match: str):
+    """Returns a (rowid, rank) subquery of posts matching ``match``, lower rank is better."""
+    return _search_hits(POSTS_FTS_TABLE, POSTS_FTS_WEIGHTS, match, "post_search_hits")
+
+
+def student_search_hits(match: str):
+    """Returns a (rowid, rank) subquery of students matching ``match``, lower rank is better."""
+    return _search_hits(STUDENTS_FTS_TABLE, STUDENTS_FTS_WEIGHTS, match, "student_search_hits")
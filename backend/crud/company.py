@@ -1,26 +1,94 @@
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional, Tuple
 from ..models.company import Company
+from ..models.post import Post
 from ..schemas.company import CompanyCreate
+from .location import location_slug, resolve_location_ids
+from .table_version import bump_table_version
+from ..utils.pagination import decode_cursor, encode_cursor, keyset_filter
 
-def get_companies(db: Session, search: str = None):
+_SORT_KEYS = [(Company.id, False, int)]
+
+def _posts_count():
+    # Correlated COUNT(*) per company row, answered from the posts.company_id index
+    return (
+        select(func.count(Post.id))
+        .where(Post.company_id == Company.id)
+        .correlate(Company)
+        .scalar_subquery()
+        .label("posts_count")
+    )
+
+def get_companies(
+    db: Session,
+    search: str = None,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_count: bool = True
+):
+    """
+    Returns ([(company, posts_count)], total, next_cursor).
+
+    Companies are ordered by id. posts_count is computed in the same
+    statement, so a page costs one query however many posts it has.
+    """
     query = db.query(Company)
     if search:
         query = query.filter(
             Company.name.contains(search) |
             Company.location.contains(search)
         )
-    return query.all()
+    
+    total = query.count() if include_count else None
+    
+    query = query.add_columns(_posts_count()).order_by(Company.id)
+    if cursor:
+        query = query.filter(keyset_filter(_SORT_KEYS, decode_cursor(cursor, _SORT_KEYS)))
+    else:
+        query = query.offset((page - 1) * page_size)
+    
+    rows = query.limit(page_size + 1).all()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([rows[-1][0].id])
+    
+    return [(company, posts_count) for company, posts_count in rows], total, next_cursor
 
 def get_company(db: Session, company_id: int):
     return db.query(Company).filter(Company.id == company_id).first()
 
+def get_company_with_posts_count(db: Session, company_id: int) -> Optional[Tuple[Company, int]]:
+    row = db.query(Company, _posts_count()).filter(Company.id == company_id).first()
+    return tuple(row) if row else None
+
 def get_company_by_user_id(db: Session, user_id: int) -> Optional[Company]:
     return db.query(Company).filter(Company.user_id == user_id).first()
 
 def create_company(db: Session, company: CompanyCreate):
     db_company = Company(**company.dict())
+    db_company.location = location_slug(company.location)
+    db_company.location_id = resolve_location_ids(db, [db_company.location]).get(db_company.location)
     db.add(db_company)
+    bump_table_version(db, "companies")
     db.commit()
     db.refresh(db_company)
     return db_company
+
+def create_companies(db: Session, companies: List[CompanyCreate]) -> List[Company]:
+    """Creates a batch of companies with a single multi-row INSERT ... RETURNING in one transaction."""
+    if not companies:
+        return []
+    rows = [company.model_dump() for company in companies]
+    for row in rows:
+        row["location"] = location_slug(row["location"])
+    location_ids = resolve_location_ids(db, (row["location"] for row in rows))
+    for row in rows:
+        row["location_id"] = location_ids.get(row["location"])
+    db_companies = db.scalars(insert(Company).returning(Company, sort_by_parameter_order=True), rows).all()
+    bump_table_version(db, "companies")
+    db.commit()
+    return db_companies
@@ -0,0 +1,43 @@
+from sqlalchemy import Select, select
+from ..models.company import Company
+from ..models.post import Post
+from ..models.student import Student
+
+EXPORT_DATASETS = ("posts", "companies", "students")
+
+# Columns each export may contain. Listed explicitly, so a column added to
+# a model (an email, an owner's user id) is not exported until it is named
+# here; students leave out their email and user id.
+EXPORT_COLUMNS = {
+    "posts": (
+        "id", "company_id", "title", "work_field", "employment_type", "location", "onsite", "salary",
+        "min_year", "requirement", "description", "long_description", "image_url", "created_at", "updated_at",
+    ),
+    "companies": (
+        "id", "name", "website", "logo_url", "location", "description", "contacts", "created_at", "updated_at",
+    ),
+    "students": (
+        "id", "name", "nick_name", "pronoun", "year", "ku_generation", "faculty", "major", "about_me", "created_at",
+    ),
+}
+
+def _columns(model, dataset: str) -> list:
+    return [model.__table__.columns[name] for name in EXPORT_COLUMNS[dataset]]
+
+def export_statement(dataset: str) -> Select:
+    """
+    Returns the query behind an export, as its ``EXPORT_COLUMNS`` in id order.
+
+    Raises ValueError for an unknown dataset.
+    """
+    if dataset == "posts":
+        return (
+            select(*_columns(Post, "posts"), Company.name.label("company_name"))
+            .outerjoin(Company, Company.id == Post.company_id)
+            .order_by(Post.id)
+        )
+    if dataset == "companies":
+        return select(*_columns(Company, "companies")).order_by(Company.id)
+    if dataset == "students":
+        return select(*_columns(Student, "students")).order_by(Student.id)
+    raise ValueError(f"Unknown export {dataset}")
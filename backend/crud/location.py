@@ -0,0 +1,147 @@
+from sqlalchemy import select, union, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..models.company import Company
+from ..models.location import Location, Region
+from ..models.post import Post
+
+# slug -> location id. Locations are never renumbered, so ids read from the
+# database stay valid for the life of the process.
+_location_ids: Dict[str, int] = {}
+
+def location_slug(value: Optional[str]) -> Optional[str]:
+    """Canonical slug of a location as written by users and feeds: "Chiang Mai" -> "chiang-mai"."""
+    if value is None:
+        return None
+    return "-".join(str(value).strip().lower().split()) or None
+
+def location_name(slug: str) -> str:
+    return slug.replace("-", " ").title()
+
+def _insert_locations(db: Session, slugs: Iterable[str]) -> Dict[str, int]:
+    """
+    Adds region-less locations for the given slugs and returns {slug: id} of all of them.
+
+    Uses INSERT ... ON CONFLICT DO NOTHING RETURNING, so a slug another
+    transaction added meanwhile is skipped rather than failing on the
+    unique constraint; only then is it read back with a second SELECT.
+    """
+    slugs = set(slugs)
+    if not slugs:
+        return {}
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement = sqlite.insert(Location).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        statement = postgresql.insert(Location).on_conflict_do_nothing()
+    else:
+        raise ValueError(f"Adding locations is not supported on {dialect}")
+    found = dict(db.execute(
+        statement.returning(Location.slug, Location.id),
+        [{"slug": slug, "name": location_name(slug)} for slug in sorted(slugs)],
+    ).all())
+    if slugs - found.keys():
+        found.update(db.query(Location.slug, Location.id).filter(Location.slug.in_(slugs - found.keys())).all())
+    return found
+
+def resolve_location_ids(db: Session, locations: Iterable[Optional[str]]) -> Dict[str, int]:
+    """
+    Returns {slug: location id} for the given locations, keyed by their ``location_slug``.
+
+    New slugs are added as locations without a region. Known slugs are
+    answered from memory; the rest cost one SELECT, plus one INSERT when
+    some are not in the table yet. Does not commit.
+    """
+    slugs = {slug for slug in map(location_slug, locations) if slug}
+    missing = slugs - _location_ids.keys()
+    if missing:
+        found = dict(db.query(Location.slug, Location.id).filter(Location.slug.in_(missing)).all())
+        _location_ids.update(found)
+        # Not cached until a later lookup reads them back, in case this transaction rolls back
+        found.update(_insert_locations(db, missing - found.keys()))
+        return {slug: _location_ids.get(slug) or found[slug] for slug in slugs}
+    return {slug: _location_ids[slug] for slug in slugs}
+
+def link_locations(db: Session):
+    """
+    Fills location_id on posts and companies that only have a location slug.
+
+    For rows written without going through create_post or create_company,
+    such as bulk imports. Locations that are not canonical slugs ("Chiang
+    Mai") are rewritten to their ``location_slug`` first; slugs that are
+    not in the locations table yet are added without a region.
+    """
+    known = select(Location.slug)
+    unknown = union(
+        select(Post.location).where(Post.location.is_not(None), Post.location.not_in(known)),
+        select(Company.location).where(Company.location.is_not(None), Company.location.not_in(known)),
+    )
+    slugs = {value: location_slug(value) for value in db.execute(unknown).scalars()}
+    for model in (Post, Company):
+        for value, slug in slugs.items():
+            if slug != value:
+                # updated_at is set to itself so its onupdate default does not touch every row
+                db.execute(
+                    update(model)
+                    .where(model.location == value)
+                    .values(location=slug, updated_at=model.updated_at)
+                    .execution_options(synchronize_session=False)
+                )
+    _insert_locations(db, {slug for slug in slugs.values() if slug})
+
+    for model in (Post, Company):
+        db.execute(
+            update(model)
+            .where(model.location_id.is_(None), model.location.is_not(None))
+            .values(
+                location_id=select(Location.id).where(Location.slug == model.location).scalar_subquery(),
+                updated_at=model.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+def location_filter(column, location: Optional[str] = None, region: Optional[str] = None):
+    """
+    Filter clauses matching a location_id ``column`` against a location slug and/or a region slug.
+
+    Both lookups happen inside the statement: a location is one equality
+    seek on the location_id index, a region expands to an ``IN`` over its
+    location ids.
+    """
+    clauses = []
+    if location:
+        clauses.append(
+            column == select(Location.id).where(Location.slug == location_slug(location)).scalar_subquery()
+        )
+    if region:
+        clauses.append(column.in_(
+            select(Location.id).join(Region, Region.id == Location.region_id).where(Region.slug == region)
+        ))
+    return clauses
+
+def get_region_location_slugs(db: Session, region: str) -> List[str]:
+    return list(db.scalars(
+        select(Location.slug).join(Region, Region.id == Location.region_id).where(Region.slug == region)
+    ))
+
+def get_regions(db: Session) -> List[Tuple[str, str, List[Tuple[str, str]]]]:
+    """
+    Returns [(region slug, region name, [(location slug, location name)])] ordered by name.
+
+    Locations without a region are listed last under a ``None`` region.
+    """
+    rows = (
+        db.query(Region.slug, Region.name, Location.slug, Location.name)
+        .select_from(Location)
+        .outerjoin(Region, Region.id == Location.region_id)
+        .order_by(Region.id.is_(None), Region.name, Location.name)
+        .all()
+    )
+    regions: Dict[Optional[str], Tuple[str, str, List[Tuple[str, str]]]] = {}
+    for region_slug, region_name, slug, name in rows:
+        if region_slug not in regions:
+            regions[region_slug] = (region_slug, region_name, [])
+        regions[region_slug][2].append((slug, name))
+    return list(regions.values())
@@ -1,23 +1,95 @@
-from sqlalchemy.orm import Session
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import String, func, insert, type_coerce
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
 from ..models.post import Post
 from ..models.company import Company
+from ..models.post_facet import PostFacetCount
+from .location import get_region_location_slugs, location_filter, location_slug, resolve_location_ids
+from .table_version import bump_table_version
 from ..schemas.post import PostCreate
-from ..schemas.enums import WorkField
-from typing import Optional
+from ..schemas.enums import PostSort, WorkField
+from ..core.search import has_search_index, build_match_query, post_search_hits
+from ..utils.cache import TTLCache
+from ..utils.result_cache import result_cache
+from ..utils.pagination import SortKey, decode_cursor, encode_cursor, keyset_filter, order_by_clauses
+from typing import Dict, List, Optional, Sequence, Tuple
 
-def get_posts(
+# Exact totals per filter combination and table versions, so a post written
+# by another worker bumps the versions and is counted right away.
+_count_cache = TTLCache(maxsize=1024, ttl=60.0)
+
+FACET_COLUMNS = ("work_field", "location", "onsite", "employment_type")
+
+def _created_at_sort_key(db: Session) -> SortKey:
+    # SQLite stores func.now() defaults without microseconds while bound
+    # datetimes get them, so the keyset has to compare the stored text as is.
+    if db.get_bind().dialect.name == "sqlite":
+        return (type_coerce(Post.created_at, String), True, str)
+    return (Post.created_at, True, datetime.fromisoformat)
+
+def _sort_keys(db: Session, sort: PostSort) -> List[SortKey]:
+    # Each order ends in id, in the same direction, so the keyset seek is a
+    # row-value comparison on an index whose entries end in the rowid.
+    if sort == PostSort.SALARY:
+        return [(Post.salary, True, int), (Post.id, True, int)]
+    if sort == PostSort.MIN_YEAR:
+        return [(Post.min_year, False, int), (Post.id, False, int)]
+    return [_created_at_sort_key(db), (Post.id, True, int)]
+
+# Columns shown on a listing card, read in one joined query. A post
+# without an image shows its company's logo.
+POST_LIST_COLUMNS = (
+    Post.id,
+    Post.title,
+    Company.name.label("company_name"),
+    Post.work_field,
+    Post.employment_type,
+    Post.location,
+    Post.onsite,
+    Post.salary,
+    Post.min_year,
+    Post.requirement,
+    Post.description,
+    func.coalesce(Post.image_url, Company.logo_url).label("image_url"),
+    Post.created_at,
+    Post.updated_at,
+)
+
+def _filtered_query(
     db: Session,
-    page: int = 1,
-    page_size: int = 12,
-    search: Optional[str] = None,
-    work_field: Optional[WorkField] = None,
-    location: Optional[str] = None,
-    onsite: Optional[bool] = None
+    search: Optional[str],
+    work_field: Optional[WorkField],
+    location: Optional[str],
+    onsite: Optional[bool],
+    columns: tuple = (Post,),
+    region: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+    min_year_min: Optional[int] = None,
+    min_year_max: Optional[int] = None,
+    sort: Optional[PostSort] = None
 ):
-    offset = (page - 1) * page_size
-    query = db.query(Post).join(Company)
+    """
+    Returns the filtered posts query and the sort keys it should be paginated on.
+
+    Without ``sort`` posts are ordered newest first, or by relevance when
+    searching. Posts without a salary (or minimum year) are left out when
+    sorting by it, as the keyset cannot seek past a NULL.
+    """
+    query = db.query(*columns).select_from(Post).join(Company, Company.id == Post.company_id)
+    sort_keys = _sort_keys(db, sort)
     
-    if search:
+    if search and has_search_index(db):
+        match = build_match_query(search)
+        if match:
+            hits = post_search_hits(match)
+            query = query.join(hits, hits.c.rowid == Post.id)
+            if sort is None:
+                sort_keys = [(hits.c.rank, False, float), (Post.id, True, int)]
+    elif search:
         query = query.filter(
             Post.title.contains(search) |
             Post.description.contains(search) |
@@ -27,23 +99,299 @@ def get_posts(
     if work_field:
         query = query.filter(Post.work_field == work_field)
     
-    if location:
-        query = query.filter(Post.location == location)
+    if location or region:
+        query = query.filter(*location_filter(Post.location_id, location, region))
     
     if onsite is not None:
         query = query.filter(Post.onsite == onsite)
     
-    total = query.count()
-    posts = query.order_by(Post.created_at.desc()).offset(offset).limit(page_size).all()
+    if salary_min is not None:
+        query = query.filter(Post.salary >= salary_min)
+    if salary_max is not None:
+        query = query.filter(Post.salary <= salary_max)
+    if min_year_min is not None:
+        query = query.filter(Post.min_year >= min_year_min)
+    if min_year_max is not None:
+        query = query.filter(Post.min_year <= min_year_max)
+    
+    if sort == PostSort.SALARY:
+        query = query.filter(Post.salary.is_not(None))
+    elif sort == PostSort.MIN_YEAR:
+        query = query.filter(Post.min_year.is_not(None))
+    
+    return query, sort_keys
+
+def _count_posts(query, cache_key: tuple) -> int:
+    total = _count_cache.get(cache_key)
+    if total is None:
+        total = query.count()
+        _count_cache.set(cache_key, total)
+    return total
+
+def get_posts(
+    db: Session,
+    page: int = 1,
+    page_size: int = 12,
+    search: Optional[str] = None,
+    work_field: Optional[WorkField] = None,
+    location: Optional[str] = None,
+    onsite: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    include_count: bool = True,
+    region: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+    min_year_min: Optional[int] = None,
+    min_year_max: Optional[int] = None,
+    sort: Optional[PostSort] = None,
+    versions: Optional[Dict[str, int]] = None
+):
+    """
+    Returns (rows, total, next_cursor), rows holding ``POST_LIST_COLUMNS``.
+
+    Without ``cursor`` the page is located with OFFSET. With a cursor taken from
+    a previous response the next page is located with a keyset seek, so every
+    page costs the same however deep the client scrolls. ``total`` is None when
+    ``include_count`` is False. Given the table ``versions`` the caller read
+    (see crud.table_version), it is cached under them; without, it is
+    counted every time. ``region`` narrows the posts to the locations of
+    that region; the salary and min_year bounds are inclusive. ``sort``
+    picks newest first, highest salary first or lowest min_year first;
+    cursors are only valid for the sort they were issued under.
+    """
+    ranges = {
+        "salary_min": salary_min, "salary_max": salary_max,
+        "min_year_min": min_year_min, "min_year_max": min_year_max,
+    }
+    query, sort_keys = _filtered_query(
+        db, search, work_field, location, onsite, POST_LIST_COLUMNS, region, sort=sort, **ranges
+    )
+    
+    total = None
+    if include_count and versions is None:
+        total = query.count()
+    elif include_count:
+        total = _count_posts(
+            query, (*versions.values(), search, work_field, location, onsite, region, sort, *ranges.values())
+        )
+    
+    query = query.add_columns(*(column for column, _, _ in sort_keys))
+    query = query.order_by(*order_by_clauses(sort_keys))
+    if cursor:
+        query = query.filter(keyset_filter(sort_keys, decode_cursor(cursor, sort_keys)))
+    else:
+        query = query.offset((page - 1) * page_size)
+    
+    rows = query.limit(page_size + 1).all()
     
-    return posts, total
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][len(POST_LIST_COLUMNS):])
+    
+    return rows, total, next_cursor
+
+def _facet_value(value):
+    value = getattr(value, "value", value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+def _facet_key(post: Post) -> tuple:
+    return tuple(getattr(getattr(post, name), "value", getattr(post, name)) for name in FACET_COLUMNS)
+
+def _increment_facet_counts(db: Session, counts: Dict[tuple, int]):
+    """
+    Adds ``counts`` ({facet key: posts}) to the facet counters.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE, so concurrent writers adding the
+    same new key neither fail on the unique constraint nor wait on a
+    read-then-write. Keys holding a NULL never conflict (NULLs are distinct
+    in unique constraints), so those are updated in place or added instead.
+    """
+    rows = [{"count": amount, **dict(zip(FACET_COLUMNS, key))} for key, amount in counts.items()]
+    for row in [row for row in rows if None in row.values()]:
+        rows.remove(row)
+        amount = row.pop("count")
+        updated = (
+            db.query(PostFacetCount)
+            .filter_by(**row)
+            .update({PostFacetCount.count: PostFacetCount.count + amount}, synchronize_session=False)
+        )
+        if not updated:
+            db.add(PostFacetCount(count=amount, **row))
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement = sqlite.insert(PostFacetCount)
+    elif dialect == "postgresql":
+        statement = postgresql.insert(PostFacetCount)
+    else:
+        raise ValueError(f"Counting post facets is not supported on {dialect}")
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=list(FACET_COLUMNS),
+            set_={"count": PostFacetCount.count + statement.excluded["count"]},
+        ),
+        rows,
+    )
+
+def rebuild_facet_counts(db: Session):
+    """Recomputes the facet counter table from scratch, for data loaded outside create_post."""
+    columns = [getattr(Post, name) for name in FACET_COLUMNS]
+    db.query(PostFacetCount).delete()
+    for row in db.query(*columns, func.count()).group_by(*columns):
+        db.add(PostFacetCount(count=row[-1], **dict(zip(FACET_COLUMNS, row[:-1]))))
+    db.commit()
+
+def get_post_facets(
+    db: Session,
+    search: Optional[str] = None,
+    work_field: Optional[WorkField] = None,
+    location: Optional[str] = None,
+    onsite: Optional[bool] = None,
+    employment_type: Optional[str] = None,
+    region: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+    min_year_min: Optional[int] = None,
+    min_year_max: Optional[int] = None
+):
+    """
+    Returns post counts for every facet value plus the total under the given filters.
+
+    Each facet is counted with all filters applied except its own, so the
+    sidebar can show how many posts every alternative value would return.
+    Without a search or a salary/min_year bound the counts come from the
+    counter table maintained by create_post; otherwise they come from one
+    grouped aggregation over the matching posts. ``region`` and the bounds
+    restrict every facet, location included; ``location`` is matched by
+    its ``location_slug`` like in the listing.
+    """
+    ranges = {
+        "salary_min": salary_min, "salary_max": salary_max,
+        "min_year_min": min_year_min, "min_year_max": min_year_max,
+    }
+    if search or any(value is not None for value in ranges.values()):
+        query, _ = _filtered_query(db, search, None, None, None, region=region, **ranges)
+        columns = [getattr(Post, name) for name in FACET_COLUMNS]
+        rows = query.with_entities(*columns, func.count()).group_by(*columns).all()
+    else:
+        query = db.query(*(getattr(PostFacetCount, name) for name in FACET_COLUMNS), PostFacetCount.count)
+        if region:
+            query = query.filter(PostFacetCount.location.in_(get_region_location_slugs(db, region)))
+        rows = query.all()
+    
+    filters = {
+        "work_field": _facet_value(work_field),
+        "location": location_slug(location),
+        "onsite": _facet_value(onsite),
+        "employment_type": _facet_value(employment_type),
+    }
+    facets: Dict[str, Dict[str, int]] = {name: {} for name in FACET_COLUMNS}
+    total = 0
+    remote = 0
+    
+    for row in rows:
+        values = {name: _facet_value(value) for name, value in zip(FACET_COLUMNS, row)}
+        count = row[-1]
+        if not count:
+            continue
+        mismatched = {
+            name for name in FACET_COLUMNS
+            if filters[name] is not None and values[name] != filters[name]
+        }
+        if not mismatched:
+            total += count
+        for name in FACET_COLUMNS:
+            if mismatched <= {name} and values[name] is not None:
+                facets[name][values[name]] = facets[name].get(values[name], 0) + count
+        # "remote" is offered as a location and means onsite == False
+        if values["onsite"] == "false" and mismatched <= {"location", "onsite"}:
+            remote += count
+    
+    if remote:
+        facets["location"]["remote"] = remote
+    
+    return facets, total
 
 def get_post(db: Session, post_id: int):
-    return db.query(Post).join(Company).filter(Post.id == post_id).first()
+    return (
+        db.query(Post)
+        .join(Company)
+        .options(contains_eager(Post.company))
+        .filter(Post.id == post_id)
+        .first()
+    )
+
+def get_post_list_items(db: Session, post_ids: Sequence[int]):
+    """Rows of ``POST_LIST_COLUMNS`` for the given posts, in the given order; missing posts are skipped."""
+    if not post_ids:
+        return []
+    rows = (
+        db.query(*POST_LIST_COLUMNS)
+        .select_from(Post)
+        .join(Company, Company.id == Post.company_id)
+        .filter(Post.id.in_(post_ids))
+        .all()
+    )
+    by_id = {row.id: row for row in rows}
+    return [by_id[post_id] for post_id in post_ids if post_id in by_id]
 
 def create_post(db: Session, post: PostCreate):
     db_post = Post(**post.dict())
+    db_post.location = location_slug(post.location)
+    db_post.location_id = resolve_location_ids(db, [db_post.location]).get(db_post.location)
     db.add(db_post)
+    _increment_facet_counts(db, {_facet_key(db_post): 1})
+    bump_table_version(db, "posts")
     db.commit()
     db.refresh(db_post)
+    _count_cache.clear()
+    result_cache.invalidate("posts")
     return db_post
+
+def create_posts(db: Session, posts: List[PostCreate]) -> List[Tuple[Optional[Post], Optional[str]]]:
+    """
+    Creates a batch of posts in one transaction.
+
+    All referenced companies are resolved with one query and the posts are
+    written with a single multi-row INSERT ... RETURNING. Returns one
+    ``(post, error)`` pair per input, in order; posts whose company does
+    not exist are skipped with an error.
+    """
+    company_ids = {post.company_id for post in posts}
+    companies = {
+        company.id: company
+        for company in db.query(Company).filter(Company.id.in_(company_ids))
+    }
+
+    rows = [post.model_dump(mode="json") for post in posts if post.company_id in companies]
+    for row in rows:
+        row["location"] = location_slug(row["location"])
+    location_ids = resolve_location_ids(db, (row["location"] for row in rows))
+    for row in rows:
+        row["location_id"] = location_ids.get(row["location"])
+    created = iter(
+        db.scalars(insert(Post).returning(Post, sort_by_parameter_order=True), rows).all() if rows else []
+    )
+
+    results = []
+    facet_counts = Counter()
+    for post in posts:
+        if post.company_id not in companies:
+            results.append((None, f"Company {post.company_id} not found"))
+            continue
+        db_post = next(created)
+        set_committed_value(db_post, "company", companies[post.company_id])
+        facet_counts[_facet_key(db_post)] += 1
+        results.append((db_post, None))
+
+    if facet_counts:
+        _increment_facet_counts(db, facet_counts)
+        bump_table_version(db, "posts")
+        db.commit()
+        _count_cache.clear()
+        result_cache.invalidate("posts")
+    return results
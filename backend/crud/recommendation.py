@@ -0,0 +1,24 @@
+from sqlalchemy.orm import Session
+from ..models.company import Company
+from ..models.post import Post
+from ..models.recommendation import StudentRecommendation
+from .post import POST_LIST_COLUMNS
+
+def get_student_recommendations(db: Session, student_id: int, limit: int = 20):
+    """
+    Returns a student's stored recommendations, best first, as rows of ``POST_LIST_COLUMNS`` plus ``score``.
+
+    A single seek on the (student_id, score) index; the lists are computed
+    ahead of time by the recommendation refresh, so a student created
+    moments ago may not have any yet.
+    """
+    return (
+        db.query(*POST_LIST_COLUMNS, StudentRecommendation.score)
+        .select_from(StudentRecommendation)
+        .join(Post, Post.id == StudentRecommendation.post_id)
+        .join(Company, Company.id == Post.company_id)
+        .filter(StudentRecommendation.student_id == student_id)
+        .order_by(StudentRecommendation.score.desc(), StudentRecommendation.post_id)
+        .limit(limit)
+        .all()
+    )
@@ -1,10 +1,84 @@
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence
 from ..models.student import Student
-from ..schemas.student import StudentCreate
+from ..schemas.student import StudentCreate, StudentResponse
+from .table_version import bump_table_version
+from ..core.search import has_search_index, build_match_query, student_search_hits
+from ..utils.pagination import SortKey, decode_cursor, encode_cursor, keyset_filter, order_by_clauses
 
-def get_students(db: Session):
-    return db.query(Student).all()
+# Fields a directory listing can select; id is always returned
+STUDENT_FIELDS = tuple(StudentResponse.model_fields)
+
+def get_students(
+    db: Session,
+    search: Optional[str] = None,
+    faculty: Optional[str] = None,
+    major: Optional[str] = None,
+    year: Optional[int] = None,
+    ku_generation: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    include_count: bool = True
+):
+    """
+    Returns ([student dict], total, next_cursor) for the student directory.
+
+    Students are ordered by id, or by relevance when searching. Only the
+    requested ``fields`` are read from the database. Raises ValueError for
+    unknown fields or a malformed cursor.
+    """
+    if fields:
+        unknown = set(fields) - set(STUDENT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        fields = ["id"] + [field for field in STUDENT_FIELDS if field in fields and field != "id"]
+    else:
+        fields = list(STUDENT_FIELDS)
+
+    query = db.query(*(getattr(Student, field) for field in fields))
+    sort_keys: List[SortKey] = [(Student.id, False, int)]
+
+    if search and has_search_index(db):
+        match = build_match_query(search)
+        if match:
+            hits = student_search_hits(match)
+            query = query.join(hits, hits.c.rowid == Student.id)
+            sort_keys = [(hits.c.rank, False, float), (Student.id, False, int)]
+    elif search:
+        query = query.filter(
+            Student.name.contains(search) |
+            Student.nick_name.contains(search) |
+            Student.about_me.contains(search)
+        )
+
+    if faculty:
+        query = query.filter(Student.faculty == faculty)
+    if major:
+        query = query.filter(Student.major == major)
+    if year is not None:
+        query = query.filter(Student.year == year)
+    if ku_generation is not None:
+        query = query.filter(Student.ku_generation == ku_generation)
+
+    total = query.count() if include_count else None
+
+    query = query.add_columns(*(column for column, _, _ in sort_keys)).order_by(*order_by_clauses(sort_keys))
+    if cursor:
+        query = query.filter(keyset_filter(sort_keys, decode_cursor(cursor, sort_keys)))
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    rows = query.limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][len(fields):])
+
+    students: List[Dict[str, Any]] = [dict(zip(fields, row[:len(fields)])) for row in rows]
+    return students, total, next_cursor
 
 def get_student(db: Session, student_id: int):
     return db.query(Student).filter(Student.id == student_id).first()
@@ -15,6 +89,7 @@ def get_student_by_user_id(db: Session, user_id: int) -> Optional[Student]:
 def create_student(db: Session, student: StudentCreate):
     db_student = Student(**student.dict())
     db.add(db_student)
+    bump_table_version(db, "students")
     db.commit()
     db.refresh(db_student)
     return db_student
\ No newline at end of file
@@ -0,0 +1,23 @@
+from sqlalchemy.orm import Session
+from typing import Dict
+from ..models.table_version import TableVersion
+
+def bump_table_version(db: Session, *table_names: str):
+    """Increments the change stamp of each table. Does not commit."""
+    for table_name in table_names:
+        updated = (
+            db.query(TableVersion)
+            .filter(TableVersion.table_name == table_name)
+            .update({TableVersion.version: TableVersion.version + 1}, synchronize_session=False)
+        )
+        if not updated:
+            db.add(TableVersion(table_name=table_name, version=1))
+
+def get_table_versions(db: Session, *table_names: str) -> Dict[str, int]:
+    rows = (
+        db.query(TableVersion.table_name, TableVersion.version)
+        .filter(TableVersion.table_name.in_(table_names))
+        .all()
+    )
+    versions = dict(rows)
+    return {table_name: versions.get(table_name, 0) for table_name in table_names}
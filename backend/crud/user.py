@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import Optional
 from ..models.user import User
+from ..utils.auth_cache import invalidate_user
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
@@ -48,4 +49,13 @@ def update_user_oauth_info(
         user.profile_picture = profile_picture
     db.commit()
     db.refresh(user)
+    invalidate_user(user.id)
+    return user
+
+
+def deactivate_user(db: Session, user: User) -> User:
+    user.is_active = False
+    db.commit()
+    db.refresh(user)
+    invalidate_user(user.id)
     return user
@@ -0,0 +1,42 @@
+"""
+Streaming bulk import of users, companies and posts.
+
+Reads Django ``dumpdata`` JSON files (such as ``fixtures/data.json``) and
+partner job feeds in NDJSON or CSV without loading them into memory, and
+writes them in chunked ``executemany`` batches inside bounded transactions.
+
+Usage (from the repository root):
+    python -m backend.importer backend/fixtures/data.json
+    python -m backend.importer jobs.ndjson partner.csv --batch-size 10000
+"""
+from .loader import BulkLoader, load_django_dump, load_feed
+from .readers import iter_csv, iter_django_dump, iter_json_array, iter_ndjson
+
+FORMATS = {
+    ".json": "django",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".csv": "csv",
+}
+
+
+def detect_format(path: str) -> str:
+    for suffix, name in FORMATS.items():
+        if path.lower().endswith(suffix):
+            return name
+    raise ValueError(f"Cannot tell the format of {path}, pass --format")
+
+
+def import_file(loader: BulkLoader, path: str, format: str = "auto"):
+    if format == "auto":
+        format = detect_format(path)
+
+    with open(path, encoding="utf-8", newline="" if format == "csv" else None) as fp:
+        if format == "django":
+            load_django_dump(loader, iter_django_dump(fp))
+        elif format == "ndjson":
+            load_feed(loader, iter_ndjson(fp))
+        elif format == "csv":
+            load_feed(loader, iter_csv(fp))
+        else:
+            raise ValueError(f"Unknown format {format}")
@@ -0,0 +1,28 @@
+import argparse
+import time
+from .. import migrations
+from ..core.database import engine
+from . import BulkLoader, import_file
+
+parser = argparse.ArgumentParser(description="Import Django dumps and job feeds")
+parser.add_argument("paths", nargs="+", help="Django dumpdata .json, .ndjson/.jsonl or .csv files")
+parser.add_argument("--format", choices=["auto", "django", "ndjson", "csv"], default="auto")
+parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany")
+parser.add_argument("--transaction-rows", type=int, default=50000, help="rows per committed transaction")
+parser.add_argument("--skip-existing", action="store_true", help="ignore rows whose id or unique key exists")
+args = parser.parse_args()
+
+migrations.upgrade(engine)
+
+start = time.perf_counter()
+with BulkLoader(
+    engine, batch_size=args.batch_size, transaction_rows=args.transaction_rows, skip_existing=args.skip_existing
+) as loader:
+    for path in args.paths:
+        import_file(loader, path, args.format)
+        print(f"Read {path}")
+elapsed = time.perf_counter() - start
+
+for name, count in sorted(loader.counts.items()):
+    print(f"{name}: {count}")
+print(f"Imported {loader.counts['posts']} posts in {elapsed:.1f}s ({loader.counts['posts'] / elapsed:.0f} posts/s)")
@@ -0,0 +1,267 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .. import recommendations
+from ..crud.location import link_locations, location_slug
+from ..crud.post import rebuild_facet_counts
+from ..crud.table_version import bump_table_version
+from ..models import Company, Post, User
+from ..schemas.enums import EmploymentType, WorkField
+
+WORK_FIELDS = {field.value for field in WorkField}
+EMPLOYMENT_TYPES = {kind.value for kind in EmploymentType}
+
+_TRUE = {"1", "true", "t", "yes", "y", "on"}
+
+# Listing fields feeds often leave out, and what is stored instead. A missing
+# salary stays NULL ("not disclosed"): no default amount would be truthful.
+POST_DEFAULTS = {"min_year": 0, "requirement": ""}
+
+
+def _datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE
+    return bool(value)
+
+
+def _int(value) -> Optional[int]:
+    if value is None or isinstance(value, int):
+        return value
+    if not str(value).strip():
+        return None
+    return int(float(str(value).replace(",", "").strip()))
+
+
+def _choice(value, choices: set, default: str, separator: str = "-") -> str:
+    value = location_slug(value)
+    if value is not None:
+        value = value.replace("_" if separator == "-" else "-", separator)
+    return value if value in choices else default
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class BulkLoader:
+    """
+    Writes users, companies and posts in chunked ``executemany`` batches.
+
+    Rows are buffered per table and flushed, parents first, whenever a
+    buffer reaches ``batch_size``. The transaction is committed every
+    ``transaction_rows`` rows, so a failure loses at most one transaction
+    and memory stays bounded by the batch size.
+    """
+
+    def __init__(self, engine: Engine, batch_size: int = 5000, transaction_rows: int = 50000,
+                 skip_existing: bool = False):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.transaction_rows = transaction_rows
+        self.counts = Counter()
+        self._buffers: Dict[str, List[dict]] = {"users": [], "companies": [], "posts": []}
+        self._statements = {
+            "users": self._insert(User, skip_existing),
+            "companies": self._insert(Company, skip_existing),
+            "posts": self._insert(Post, skip_existing),
+        }
+        self._company_ids: Optional[Dict[str, int]] = None
+        # Lowest source id given per table, and the highest post id before the import
+        self._min_ids: Dict[str, int] = {}
+        self._last_post_id = 0
+        self._uncommitted = 0
+        self._conn = None
+        self._transaction = None
+
+    def _insert(self, model, skip_existing: bool):
+        if not skip_existing:
+            return insert(model)
+        dialect = self.engine.dialect.name
+        if dialect == "sqlite":
+            return sqlite.insert(model).on_conflict_do_nothing()
+        if dialect == "postgresql":
+            return postgresql.insert(model).on_conflict_do_nothing()
+        raise ValueError(f"Skipping existing rows is not supported on {dialect}")
+
+    def __enter__(self):
+        self._conn = self.engine.connect()
+        self._transaction = self._conn.begin()
+        self._last_post_id = self._conn.execute(select(func.max(Post.id))).scalar() or 0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+                self._transaction.commit()
+            else:
+                self._transaction.rollback()
+        finally:
+            self._conn.close()
+        if exc_type is None and (self.counts["posts"] or self.counts["companies"] or self.counts["users"]):
+            self._refresh_derived_data()
+
+    def _add(self, table: str, row: dict, pk=None):
+        if pk is not None:
+            row["id"] = pk = _int(pk)
+            self._min_ids[table] = min(self._min_ids.get(table, pk), pk)
+        buffer = self._buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table in ("users", "companies", "posts"):
+            rows = self._buffers[table]
+            if not rows:
+                continue
+            # executemany needs the same columns in every row; ids may be
+            # given for some records only
+            batches: Dict[tuple, List[dict]] = {}
+            for row in rows:
+                batches.setdefault(tuple(row), []).append(row)
+            for batch in batches.values():
+                result = self._conn.execute(self._statements[table], batch)
+                self.counts[table] += result.rowcount if result.rowcount >= 0 else len(batch)
+            self._uncommitted += len(rows)
+            self._buffers[table] = []
+
+        if self._uncommitted >= self.transaction_rows:
+            self._transaction.commit()
+            self._transaction = self._conn.begin()
+            self._uncommitted = 0
+
+    def _refresh_derived_data(self):
+        # The FTS triggers index every inserted post; location ids, facet
+        # counters, change stamps and student recommendations are refreshed
+        # once for the whole import.
+        with Session(self.engine) as db:
+            link_locations(db)
+            rebuild_facet_counts(db)
+            bump_table_version(db, "posts", "companies")
+            self._reset_sequences(db)
+            db.commit()
+            if self._min_ids.get("posts", self._last_post_id + 1) <= self._last_post_id:
+                # Source ids below existing posts are behind the id watermarks
+                recommendations.rebuild_after_backfill(db)
+            else:
+                recommendations.refresh(db)
+
+    def _reset_sequences(self, db: Session):
+        # Postgres does not advance an id sequence past explicitly given ids
+        if self.engine.dialect.name != "postgresql":
+            return
+        for table in self._min_ids:
+            db.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+            ))
+
+    def add_user(self, fields: dict, pk=None):
+        self._add("users", {
+            "email": fields.get("email") or None,
+            "first_name": fields.get("first_name", ""),
+            "last_name": fields.get("last_name", ""),
+            "is_active": _bool(fields.get("is_active", True)),
+            "created_at": _datetime(fields.get("created_at") or fields.get("date_joined")) or _now(),
+        }, pk)
+
+    def add_company(self, fields: dict, pk=None):
+        self._add("companies", {
+            "user_id": _int(fields.get("user_id", fields.get("user"))),
+            "name": fields["name"],
+            "website": fields.get("website"),
+            "logo_url": fields.get("logo_url"),
+            "location": location_slug(fields.get("location")),
+            "description": fields.get("description"),
+            "contacts": fields.get("contacts"),
+            "created_at": _datetime(fields.get("created_at")) or _now(),
+            "updated_at": _datetime(fields.get("updated_at") or fields.get("created_at")) or _now(),
+        }, pk)
+
+    def add_post(self, fields: dict, pk=None):
+        company_id = _int(fields.get("company_id", fields.get("company")))
+        if company_id is None:
+            company_id = self.company_id_for(fields.get("company_name"))
+
+        # Reported per field in counts, so a feed with gaps does not go unnoticed
+        for field in ("location", "salary", "min_year", "requirement"):
+            if fields.get(field) in (None, ""):
+                self.counts[f"posts without {field}"] += 1
+        min_year = _int(fields.get("min_year"))
+
+        created_at = _datetime(fields.get("created_at")) or _now()
+        self._add("posts", {
+            "company_id": company_id,
+            "title": fields["title"],
+            "work_field": _choice(fields.get("work_field"), WORK_FIELDS, WorkField.OTHER.value),
+            "employment_type": _choice(
+                fields.get("employment_type"), EMPLOYMENT_TYPES, EmploymentType.FULL_TIME.value, separator="_"
+            ),
+            "location": location_slug(fields.get("location")),
+            "onsite": _bool(fields.get("onsite", False)),
+            "salary": _int(fields.get("salary")),
+            "min_year": POST_DEFAULTS["min_year"] if min_year is None else min_year,
+            "requirement": fields.get("requirement") or POST_DEFAULTS["requirement"],
+            "description": fields.get("description", ""),
+            "long_description": fields.get("long_description"),
+            "image_url": fields.get("image_url"),
+            "created_at": created_at,
+            "updated_at": _datetime(fields.get("updated_at")) or created_at,
+        }, pk)
+
+    def company_id_for(self, name: Optional[str]) -> int:
+        """Resolves a feed's company name to an id, creating the company when it is new."""
+        if not name:
+            raise ValueError("Post has neither company_id nor company_name")
+        if self._company_ids is None:
+            self._company_ids = {
+                company_name: company_id
+                for company_id, company_name in self._conn.execute(select(Company.id, Company.name))
+            }
+        company_id = self._company_ids.get(name)
+        if company_id is None:
+            # Pending company rows must exist before one is looked up by name
+            self.flush()
+            now = _now()
+            company_id = self._conn.execute(
+                insert(Company).values(name=name, created_at=now, updated_at=now)
+            ).inserted_primary_key[0]
+            self._company_ids[name] = company_id
+            self.counts["companies"] += 1
+        return company_id
+
+
+DJANGO_MODELS = {
+    "auth.user": "add_user",
+    "jobs.company": "add_company",
+    "jobs.post": "add_post",
+}
+
+
+def load_django_dump(loader: BulkLoader, records: Iterable):
+    """Maps ``(model, pk, fields)`` records from a Django dump onto the loader, skipping other models."""
+    for model, pk, fields in records:
+        method = DJANGO_MODELS.get(model)
+        if method is None:
+            loader.counts[f"skipped {model}"] += 1
+            continue
+        getattr(loader, method)(fields, pk=pk)
+
+
+def load_feed(loader: BulkLoader, records: Iterable[dict]):
+    """Loads job feed records, one post per record, with the company given by id or name."""
+    for record in records:
+        loader.add_post(record, pk=record.get("id"))
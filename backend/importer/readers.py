@@ -0,0 +1,98 @@
+import csv
+import json
+from typing import IO, Dict, Iterator, Tuple
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(fp: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Yields the elements of a top-level JSON array one at a time.
+
+    The file is read in chunks and each element is decoded with
+    ``JSONDecoder.raw_decode`` as soon as it is complete, so memory use is
+    bounded by the largest element rather than the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    def skip(separators: str) -> str:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not fill():
+                return ""
+
+    if skip(_WHITESPACE) != "[":
+        raise ValueError("Expected a JSON array")
+    position += 1
+
+    expect_comma = False
+    while True:
+        char = skip(_WHITESPACE)
+        if char == "]":
+            return
+        if char == "":
+            raise ValueError("Unexpected end of JSON array")
+        if expect_comma:
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+            position += 1
+            if skip(_WHITESPACE) in ("]", ""):
+                raise ValueError("Trailing comma in JSON array")
+
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The element continues past the buffered text
+                if eof or not fill():
+                    raise
+                continue
+            # A number is only complete once its terminator is buffered
+            if end == len(buffer) and not eof and fill():
+                continue
+            break
+
+        position = end
+        expect_comma = True
+        yield element
+
+
+def iter_django_dump(fp: IO[str]) -> Iterator[Tuple[str, object, Dict]]:
+    """Yields (model, pk, fields) for every object of a Django ``dumpdata`` JSON file."""
+    for record in iter_json_array(fp):
+        yield record["model"], record.get("pk"), record.get("fields", {})
+
+
+def iter_ndjson(fp: IO[str]) -> Iterator[Dict]:
+    for line_number, line in enumerate(fp, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+
+
+def iter_csv(fp: IO[str]) -> Iterator[Dict]:
+    for row in csv.DictReader(fp):
+        yield {key: value for key, value in row.items() if key and value != ""}
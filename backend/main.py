@@ -1,13 +1,48 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .core.database import Base, engine
+from .core.query_guard import QueryGuardMiddleware
+from .core.database import async_engine, database_stats, engine, pool_stats_by_engine, replicas
+from . import migrations, recommendations
 from .api.v1.api import api_router
 from .config import settings
+from .utils.google_oauth import GoogleOAuth
+from .utils.result_cache import result_cache
+from .utils import auth_cache, metrics
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0")
+def prepare_schema(mode: str):
+    """Applies or verifies the migrations according to SCHEMA_ON_STARTUP."""
+    if mode == "migrate":
+        migrations.upgrade(engine)
+    elif mode == "check":
+        pending = migrations.pending_migrations(engine)
+        if pending:
+            raise RuntimeError(
+                f"Database schema is behind: migrations {', '.join(str(m.version) for m in pending)} are pending; "
+                "run python -m backend.migrations"
+            )
+    elif mode != "skip":
+        raise ValueError(f"Unknown SCHEMA_ON_STARTUP {mode!r}, expected migrate, check or skip")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema work happens here, not at import, so importing the app stays cheap
+    prepare_schema(settings.SCHEMA_ON_STARTUP)
+    # The index build goes first on the background thread, so similar-post lookups are not kept waiting by a refresh
+    if settings.SIMILAR_POSTS_PRELOAD:
+        recommendations.preload_similar_index()
+    recommendations.refresh_if_behind()
+    yield
+    recommendations.shutdown()
+    await GoogleOAuth.aclose()
+    # Pooled aiosqlite connections each hold a worker thread
+    await async_engine.dispose()
+    await replicas.dispose()
+
+app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -16,11 +51,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated listings that answer with a bare array put their paging here
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
+if settings.QUERY_GUARD or settings.QUERY_GUARD_HEADER:
+    app.add_middleware(
+        QueryGuardMiddleware, default_mode=settings.QUERY_GUARD, allow_header=settings.QUERY_GUARD_HEADER
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 @app.get("/")
 async def root():
     return {"message": settings.PROJECT_NAME}
 
+@app.get("/stats/cache")
+async def cache_stats():
+    return {"results": result_cache.stats(), "auth": auth_cache.stats()}
+
+@app.get("/stats/db")
+async def db_stats():
+    return database_stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(pool_stats_by_engine()), media_type=metrics.CONTENT_TYPE)
+
 # Include API router
 app.include_router(api_router, prefix="/api")
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Versioned schema migrations.
+
+Each module in ``migrations/versions`` defines ``version`` (an increasing
+integer), a one-line ``description`` and ``upgrade(conn)``. ``upgrade``
+applies every migration newer than the version recorded in the
+``schema_migrations`` table, each in its own transaction.
+
+Usage (from the repository root):
+    python -m backend.migrations            # upgrade to the latest version
+    python -m backend.migrations --status   # show applied and pending versions
+"""
+import importlib
+import pkgutil
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from . import versions as versions_package
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        description VARCHAR NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def load_migrations() -> List:
+    modules = [
+        importlib.import_module(f"{versions_package.__name__}.{info.name}")
+        for info in pkgutil.iter_modules(versions_package.__path__)
+    ]
+    modules.sort(key=lambda module: module.version)
+
+    seen = set()
+    for module in modules:
+        if module.version in seen:
+            raise RuntimeError(f"Duplicate migration version {module.version}")
+        seen.add(module.version)
+    return modules
+
+
+def current_version(engine: Engine) -> int:
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA_MIGRATIONS_DDL))
+        return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def pending_migrations(engine: Engine) -> List:
+    version = current_version(engine)
+    return [migration for migration in load_migrations() if migration.version > version]
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """Applies pending migrations in order, up to ``target`` if given, and returns the versions applied."""
+    applied = []
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                {"version": migration.version, "description": migration.description}
+            )
+        applied.append(migration.version)
+    return applied
@@ -0,0 +1,16 @@
+import argparse
+from ..core.database import engine
+from . import current_version, load_migrations, upgrade
+
+parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+parser.add_argument("--status", action="store_true", help="show applied and pending versions only")
+args = parser.parse_args()
+
+if args.status:
+    version = current_version(engine)
+    for migration in load_migrations():
+        state = "applied" if migration.version <= version else "pending"
+        print(f"{migration.version:04d} {state:<8} {migration.description}")
+else:
+    applied = upgrade(engine)
+    print(f"Applied {len(applied)} migration(s); schema at version {current_version(engine)}")
@@ -0,0 +1,98 @@
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text, UniqueConstraint
+)
+from sqlalchemy.engine import Connection
+
+version = 1
+description = "Initial schema (tables previously created by create_all)"
+
+# The schema create_all built before migrations existed, written out here
+# rather than taken from the models, so it stays what it was. Model changes
+# since then are applied by the later migrations.
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("email", String, unique=True, index=True),
+    Column("first_name", String),
+    Column("last_name", String),
+    Column("is_active", Boolean),
+    Column("created_at", DateTime),
+    Column("google_id", String, unique=True, index=True, nullable=True),
+    Column("profile_picture", String, nullable=True),
+)
+
+Table(
+    "companies", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("name", String, index=True),
+    Column("website", String, nullable=True),
+    Column("logo_url", String, nullable=True),
+    Column("location", String, nullable=True),
+    Column("description", Text, nullable=True),
+    Column("contacts", Text, nullable=True),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+Table(
+    "students", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), index=True),
+    Column("name", String, nullable=True),
+    Column("nick_name", String, nullable=True),
+    Column("pronoun", String, nullable=True),
+    Column("age", Integer, nullable=True),
+    Column("year", Integer),
+    Column("ku_generation", Integer),
+    Column("faculty", String),
+    Column("major", String, nullable=True),
+    Column("about_me", Text, nullable=True),
+    Column("email", String),
+    Column("created_at", DateTime),
+)
+
+Table(
+    "posts", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("company_id", Integer, ForeignKey("companies.id"), index=True),
+    Column("title", String, index=True),
+    Column("work_field", String),
+    Column("employment_type", String),
+    Column("location", String),
+    Column("onsite", Boolean),
+    Column("salary", Integer),
+    Column("min_year", Integer),
+    Column("requirement", Text),
+    Column("description", String),
+    Column("long_description", Text, nullable=True),
+    Column("image_url", String, nullable=True),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Index("ix_posts_created_at_id", "created_at", "id"),
+    Index("ix_posts_work_field_location_onsite", "work_field", "location", "onsite", "created_at"),
+)
+
+Table(
+    "post_facet_counts", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("work_field", String),
+    Column("location", String),
+    Column("onsite", Boolean),
+    Column("employment_type", String),
+    Column("count", Integer, nullable=False),
+    UniqueConstraint("work_field", "location", "onsite", "employment_type"),
+)
+
+Table(
+    "table_versions", metadata,
+    Column("table_name", String, primary_key=True),
+    Column("version", Integer, nullable=False),
+)
+
+
+def upgrade(conn: Connection):
+    # checkfirst keeps databases created by the old create_all call intact
+    metadata.create_all(bind=conn, checkfirst=True)
@@ -0,0 +1,64 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+version = 2
+description = "Posts FTS5 search index and sync triggers"
+
+# Written out here rather than shared with core.search, so the migration
+# keeps creating the index it created when it was written
+DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, description, requirement, long_description, company_name,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, description, requirement, long_description, company_name)
+        VALUES (
+            new.id, new.title, new.description, new.requirement, new.long_description,
+            (SELECT name FROM companies WHERE id = new.company_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au
+    AFTER UPDATE OF title, description, requirement, long_description, company_id ON posts BEGIN
+        DELETE FROM posts_fts WHERE rowid = old.id;
+        INSERT INTO posts_fts(rowid, title, description, requirement, long_description, company_name)
+        VALUES (
+            new.id, new.title, new.description, new.requirement, new.long_description,
+            (SELECT name FROM companies WHERE id = new.company_id)
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_fts_au AFTER UPDATE OF name ON companies BEGIN
+        UPDATE posts_fts SET company_name = new.name
+        WHERE rowid IN (SELECT id FROM posts WHERE company_id = new.id);
+    END
+    """,
+]
+
+BACKFILL = """
+    INSERT INTO posts_fts(rowid, title, description, requirement, long_description, company_name)
+    SELECT p.id, p.title, p.description, p.requirement, p.long_description, c.name
+    FROM posts p LEFT JOIN companies c ON c.id = p.company_id
+"""
+
+
+def upgrade(conn: Connection):
+    # FTS5 is SQLite only; elsewhere search falls back to LIKE
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'")).first()
+    for statement in DDL:
+        conn.execute(text(statement))
+    if not exists:
+        conn.execute(text(BACKFILL))
@@ -0,0 +1,18 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+version = 3
+description = "Backfill post facet counters"
+
+BACKFILL = """
+    INSERT INTO post_facet_counts (work_field, location, onsite, employment_type, count)
+    SELECT work_field, location, onsite, employment_type, COUNT(*)
+    FROM posts
+    GROUP BY work_field, location, onsite, employment_type
+"""
+
+
+def upgrade(conn: Connection):
+    # Counters already kept by create_post are left alone rather than counted twice
+    if conn.execute(text("SELECT 1 FROM post_facet_counts LIMIT 1")).first() is None:
+        conn.execute(text(BACKFILL))
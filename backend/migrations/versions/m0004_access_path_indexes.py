@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+version = 4
+description = "Indexes for listing order, filters, company posts and per-user lookups"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_posts_created_at_id ON posts (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_company_id ON posts (company_id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_work_field_location_onsite "
+    "ON posts (work_field, location, onsite, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_companies_user_id ON companies (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_students_user_id ON students (user_id)",
+]
+
+
+def upgrade(conn: Connection):
+    for statement in INDEXES:
+        conn.execute(text(statement))
@@ -0,0 +1,59 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+version = 5
+description = "Student directory filter indexes and FTS5 search index"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_students_faculty_major_year ON students (faculty, major, year)",
+    "CREATE INDEX IF NOT EXISTS ix_students_year_ku_generation ON students (year, ku_generation)",
+    "CREATE INDEX IF NOT EXISTS ix_students_ku_generation ON students (ku_generation)",
+]
+
+# Written out here rather than shared with core.search, so the migration
+# keeps creating the index it created when it was written
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5(
+        name, nick_name, about_me,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_ai AFTER INSERT ON students BEGIN
+        INSERT INTO students_fts(rowid, name, nick_name, about_me)
+        VALUES (new.id, new.name, new.nick_name, new.about_me);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_ad AFTER DELETE ON students BEGIN
+        DELETE FROM students_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_fts_au AFTER UPDATE OF name, nick_name, about_me ON students BEGIN
+        DELETE FROM students_fts WHERE rowid = old.id;
+        INSERT INTO students_fts(rowid, name, nick_name, about_me)
+        VALUES (new.id, new.name, new.nick_name, new.about_me);
+    END
+    """,
+]
+
+FTS_BACKFILL = """
+    INSERT INTO students_fts(rowid, name, nick_name, about_me)
+    SELECT id, name, nick_name, about_me FROM students
+"""
+
+
+def upgrade(conn: Connection):
+    for statement in INDEXES:
+        conn.execute(text(statement))
+
+    # FTS5 is SQLite only; elsewhere search falls back to LIKE
+    if conn.dialect.name != "sqlite":
+        return
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'students_fts'")).first()
+    for statement in FTS_DDL:
+        conn.execute(text(statement))
+    if not exists:
+        conn.execute(text(FTS_BACKFILL))
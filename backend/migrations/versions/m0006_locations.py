@@ -0,0 +1,147 @@
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, inspect, text
+from sqlalchemy.engine import Connection
+
+version = 6
+description = "Locations and regions, with location_id on posts and companies"
+
+# Provinces per region, following the six-region grouping
+REGIONS = {
+    "northern": ("Northern Thailand", [
+        "chiang-mai", "chiang-rai", "lampang", "lamphun", "mae-hong-son", "nan", "phayao", "phrae",
+        "uttaradit",
+    ]),
+    "northeastern": ("Northeastern Thailand", [
+        "amnat-charoen", "bueng-kan", "buriram", "chaiyaphum", "kalasin", "khon-kaen", "loei",
+        "maha-sarakham", "mukdahan", "nakhon-phanom", "nakhon-ratchasima", "nong-bua-lamphu", "nong-khai",
+        "roi-et", "sakon-nakhon", "sisaket", "surin", "ubon-ratchathani", "udon-thani", "yasothon",
+    ]),
+    "central": ("Central Thailand", [
+        "bangkok", "ang-thong", "ayutthaya", "chai-nat", "kamphaeng-phet", "lopburi", "nakhon-nayok",
+        "nakhon-pathom", "nakhon-sawan", "nonthaburi", "pathum-thani", "phetchabun", "phichit",
+        "phitsanulok", "samut-prakan", "samut-sakhon", "samut-songkhram", "saraburi", "sing-buri",
+        "sukhothai", "suphan-buri", "uthai-thani",
+    ]),
+    "eastern": ("Eastern Thailand", [
+        "chachoengsao", "chanthaburi", "chonburi", "prachinburi", "rayong", "sa-kaeo", "trat",
+    ]),
+    "western": ("Western Thailand", [
+        "kanchanaburi", "phetchaburi", "prachuap-khiri-khan", "ratchaburi", "tak",
+    ]),
+    "southern": ("Southern Thailand", [
+        "chumphon", "krabi", "nakhon-si-thammarat", "narathiwat", "pattani", "phang-nga", "phatthalung",
+        "phuket", "ranong", "satun", "songkhla", "surat-thani", "trang", "yala",
+    ]),
+}
+
+metadata = MetaData()
+
+Table(
+    "regions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("slug", String, unique=True, nullable=False),
+    Column("name", String, nullable=False),
+)
+
+Table(
+    "locations", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("slug", String, unique=True, nullable=False),
+    Column("name", String, nullable=False),
+    Column("region_id", Integer, ForeignKey("regions.id"), index=True, nullable=True),
+)
+
+COLUMNS = {
+    "posts": "ALTER TABLE posts ADD COLUMN location_id INTEGER REFERENCES locations (id)",
+    "companies": "ALTER TABLE companies ADD COLUMN location_id INTEGER REFERENCES locations (id)",
+}
+
+INDEXES = [
+    "DROP INDEX IF EXISTS ix_posts_work_field_location_onsite",
+    "CREATE INDEX IF NOT EXISTS ix_posts_work_field_location_id_onsite "
+    "ON posts (work_field, location_id, onsite, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_location_id_created_at ON posts (location_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_companies_location_id ON companies (location_id)",
+]
+
+
+FACET_COUNTS = """
+    INSERT INTO post_facet_counts (work_field, location, onsite, employment_type, count)
+    SELECT work_field, location, onsite, employment_type, COUNT(*)
+    FROM posts
+    GROUP BY work_field, location, onsite, employment_type
+"""
+
+
+def _slug(value: str):
+    # As crud.location.location_slug did when this migration was written
+    return "-".join(value.strip().lower().split()) or None
+
+
+def _name(slug: str) -> str:
+    return slug.replace("-", " ").title()
+
+
+def _unknown_locations(conn: Connection) -> set:
+    return set(conn.execute(text(" UNION ".join(
+        f"SELECT location FROM {table} WHERE location IS NOT NULL AND location NOT IN (SELECT slug FROM locations)"
+        for table in COLUMNS
+    ))).scalars())
+
+
+def upgrade(conn: Connection):
+    metadata.create_all(bind=conn, checkfirst=True)
+    inspector = inspect(conn)
+    for table, statement in COLUMNS.items():
+        if "location_id" not in {column["name"] for column in inspector.get_columns(table)}:
+            conn.execute(text(statement))
+    for statement in INDEXES:
+        conn.execute(text(statement))
+
+    for region_slug, (region_name, slugs) in REGIONS.items():
+        conn.execute(
+            text(
+                "INSERT INTO regions (slug, name) SELECT :slug, :name "
+                "WHERE NOT EXISTS (SELECT 1 FROM regions WHERE slug = :slug)"
+            ),
+            {"slug": region_slug, "name": region_name},
+        )
+        region_id = conn.execute(text("SELECT id FROM regions WHERE slug = :slug"), {"slug": region_slug}).scalar()
+        for slug in slugs:
+            conn.execute(
+                text("UPDATE locations SET region_id = :region_id WHERE slug = :slug AND region_id IS NULL"),
+                {"slug": slug, "region_id": region_id},
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO locations (slug, name, region_id) SELECT :slug, :name, :region_id "
+                    "WHERE NOT EXISTS (SELECT 1 FROM locations WHERE slug = :slug)"
+                ),
+                {"slug": slug, "name": _name(slug), "region_id": region_id},
+            )
+
+    # Link posts and companies to their locations, rewriting values that
+    # are not slugs yet ("Chiang Mai") and adding unknown slugs without a
+    # region. Plain UPDATEs leave updated_at as it was.
+    rewritten = False
+    for value in _unknown_locations(conn):
+        slug = _slug(value)
+        if slug != value:
+            rewritten = True
+            for table in COLUMNS:
+                conn.execute(
+                    text(f"UPDATE {table} SET location = :slug WHERE location = :value"),
+                    {"slug": slug, "value": value},
+                )
+    if rewritten:
+        # The facet counters are keyed by the old values; recount them under the slugs
+        conn.execute(text("DELETE FROM post_facet_counts"))
+        conn.execute(text(FACET_COUNTS))
+    for slug in _unknown_locations(conn):
+        conn.execute(
+            text("INSERT INTO locations (slug, name) VALUES (:slug, :name)"), {"slug": slug, "name": _name(slug)}
+        )
+    for table in COLUMNS:
+        conn.execute(text(
+            f"UPDATE {table} SET location_id = (SELECT id FROM locations WHERE locations.slug = {table}.location) "
+            "WHERE location_id IS NULL AND location IS NOT NULL"
+        ))
@@ -0,0 +1,17 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+version = 7
+description = "Indexes for salary and min_year sort orders and range filters"
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_posts_salary_id ON posts (salary, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_min_year_id ON posts (min_year, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_work_field_salary_id ON posts (work_field, salary, id)",
+    "CREATE INDEX IF NOT EXISTS ix_posts_work_field_min_year_id ON posts (work_field, min_year, id)",
+]
+
+
+def upgrade(conn: Connection):
+    for statement in INDEXES:
+        conn.execute(text(statement))
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer, MetaData, String, Table, text
+from sqlalchemy.engine import Connection
+
+version = 8
+description = "Stored student recommendations and their refresh watermarks"
+
+metadata = MetaData()
+
+# Only referenced by the foreign keys below; created by earlier migrations
+Table("students", metadata, Column("id", Integer, primary_key=True))
+Table("posts", metadata, Column("id", Integer, primary_key=True))
+
+student_recommendations = Table(
+    "student_recommendations", metadata,
+    Column("student_id", Integer, ForeignKey("students.id"), primary_key=True),
+    Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
+    Column("score", Float, nullable=False),
+    Index("ix_student_recommendations_student_id_score", "student_id", "score"),
+)
+
+recommendation_watermarks = Table(
+    "recommendation_watermarks", metadata,
+    Column("name", String, primary_key=True),
+    Column("last_id", Integer, nullable=False),
+)
+
+
+def upgrade(conn: Connection):
+    metadata.create_all(bind=conn, tables=[student_recommendations, recommendation_watermarks], checkfirst=True)
+    # Starting from zero, the first refresh ranks every existing student
+    for name in ("posts", "students"):
+        conn.execute(
+            text(
+                "INSERT INTO recommendation_watermarks (name, last_id) SELECT :name, 0 "
+                "WHERE NOT EXISTS (SELECT 1 FROM recommendation_watermarks WHERE name = :name)"
+            ),
+            {"name": name},
+        )
@@ -2,5 +2,10 @@ from ..models.user import User
 from ..models.company import Company
 from ..models.student import Student
 from ..models.post import Post
+from ..models.location import Location, Region
+from ..models.post_facet import PostFacetCount
+from ..models.recommendation import StudentRecommendation, RecommendationWatermark
+from ..models.table_version import TableVersion
 
-__all__ = ["User", "Company", "Student", "Post"]
\ No newline at end of file
+__all__ = ["User", "Company", "Student", "Post", "Location", "Region", "PostFacetCount",
+           "StudentRecommendation", "RecommendationWatermark", "TableVersion"]
\ No newline at end of file
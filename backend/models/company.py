@@ -7,11 +7,12 @@ class Company(Base):
     __tablename__ = "companies"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     name = Column(String, index=True)
     website = Column(String, nullable=True)
     logo_url = Column(String, nullable=True)
     location = Column(String, nullable=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), index=True, nullable=True)
     description = Column(Text, nullable=True)
     contacts = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from ..core.database import Base
+
+class Region(Base):
+    """A group of provinces, such as Northern Thailand."""
+    __tablename__ = "regions"
+
+    id = Column(Integer, primary_key=True)
+    slug = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
+
+    # Relationships
+    locations = relationship("Location", back_populates="region")
+
+class Location(Base):
+    """A province (or any other place posts are filed under), optionally within a region."""
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True)
+    slug = Column(String, unique=True, nullable=False)
+    name = Column(String, nullable=False)
+    region_id = Column(Integer, ForeignKey("regions.id"), index=True, nullable=True)
+
+    # Relationships
+    region = relationship("Region", back_populates="locations")
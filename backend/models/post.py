@@ -1,17 +1,33 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination seeks on (created_at, id)
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # Filtered listings, newest first
+        Index("ix_posts_work_field_location_id_onsite", "work_field", "location_id", "onsite", "created_at"),
+        # Location and region filters, newest first
+        Index("ix_posts_location_id_created_at", "location_id", "created_at"),
+        # Salary and min_year sort orders and range filters, alone and within a work field;
+        # the trailing id keeps the keyset unique
+        Index("ix_posts_salary_id", "salary", "id"),
+        Index("ix_posts_min_year_id", "min_year", "id"),
+        Index("ix_posts_work_field_salary_id", "work_field", "salary", "id"),
+        Index("ix_posts_work_field_min_year_id", "work_field", "min_year", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    company_id = Column(Integer, ForeignKey("companies.id"))
+    company_id = Column(Integer, ForeignKey("companies.id"), index=True)
     title = Column(String, index=True)
     work_field = Column(String)
     employment_type = Column(String)
+    # Slug of location_id, kept for display and the facet counters
     location = Column(String)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=True)
     onsite = Column(Boolean, default=False)
     salary = Column(Integer)
     min_year = Column(Integer)
@@ -23,4 +39,4 @@ class Post(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     # Relationships
-    company = relationship("Company", back_populates="posts")
\ No newline at end of file
+    company = relationship("Company", back_populates="posts")
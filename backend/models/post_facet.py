@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Boolean, UniqueConstraint
+from ..core.database import Base
+
+class PostFacetCount(Base):
+    """Number of posts per (work_field, location, onsite, employment_type) combination."""
+    __tablename__ = "post_facet_counts"
+    __table_args__ = (
+        UniqueConstraint("work_field", "location", "onsite", "employment_type"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    work_field = Column(String)
+    location = Column(String)
+    onsite = Column(Boolean)
+    employment_type = Column(String)
+    count = Column(Integer, nullable=False, default=0)
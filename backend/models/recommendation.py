@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from ..core.database import Base
+
+class StudentRecommendation(Base):
+    """One of a student's top recommended posts, written by the recommendation refresh."""
+    __tablename__ = "student_recommendations"
+    __table_args__ = (
+        # A student's recommendations, best first
+        Index("ix_student_recommendations_student_id_score", "student_id", "score"),
+    )
+
+    student_id = Column(Integer, ForeignKey("students.id"), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), primary_key=True)
+    score = Column(Float, nullable=False)
+
+class RecommendationWatermark(Base):
+    """Highest post or student id the stored recommendations account for."""
+    __tablename__ = "recommendation_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
@@ -1,13 +1,19 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        # Directory filters, paginated by id
+        Index("ix_students_faculty_major_year", "faculty", "major", "year"),
+        Index("ix_students_year_ku_generation", "year", "ku_generation"),
+        Index("ix_students_ku_generation", "ku_generation"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     name = Column(String, nullable=True)
     nick_name = Column(String, nullable=True)
     pronoun = Column(String, nullable=True)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from ..core.database import Base
+
+class TableVersion(Base):
+    """Change stamp per table, bumped in the same transaction as every write to it."""
+    __tablename__ = "table_versions"
+    
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
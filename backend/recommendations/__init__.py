@@ -0,0 +1,205 @@
+"""
+Precomputed student -> post recommendations, and similar posts.
+
+Writes call ``schedule_refresh`` once they have committed new posts or
+students; the refresh runs on one background thread, outside the request
+and its query budget, and only scores the new rows. Reads go straight to
+the ``student_recommendations`` table (see crud.recommendation).
+
+Similar posts are answered from an in-process index (see ``similar``)
+by ``similar_posts``, which blocks and belongs on a worker thread. The
+index is built on the background thread too; until it is ready lookups
+raise ``SimilarIndexNotReady`` instead of waiting for it.
+
+Both follow new rows by id. Writes that add posts below the highest
+existing id, such as imports keeping their source ids, call
+``rebuild_after_backfill``, which rebuilds the stored lists and bumps the
+``POSTS_BACKFILL`` change stamp; every API process then rebuilds its
+similar-posts index in the background and swaps it in.
+
+NumPy is imported with the engine or the similar-posts index, on first
+use, so importing this package costs nothing at startup.
+
+Usage (from the repository root):
+    python -m backend.recommendations             # incremental refresh
+    python -m backend.recommendations --rebuild   # recompute every student
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..core.database import SessionLocal
+from ..crud.table_version import bump_table_version, get_table_versions
+from ..models import Post, RecommendationWatermark, Student
+
+logger = logging.getLogger(__name__)
+
+# Change stamp (see crud.table_version) of posts written below the highest existing id
+POSTS_BACKFILL = "posts_backfill"
+
+_engine = None
+_similar_index = None
+_executor: Optional[ThreadPoolExecutor] = None
+_queued: Optional[Future] = None
+_similar_build: Optional[Future] = None
+_lock = threading.Lock()
+
+
+class SimilarIndexNotReady(Exception):
+    """The similar-posts index is still being built; try again shortly."""
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        from .engine import RecommendationEngine
+        _engine = RecommendationEngine(settings.RECOMMENDATIONS_TOP_K)
+    return _engine
+
+
+def get_similar_index():
+    """The built similar-posts index, or None until the first build is done."""
+    return _similar_index
+
+
+def similar_posts(post_id: int, limit: int) -> Optional[List[Tuple[int, float]]]:
+    """
+    (post id, score) pairs of the posts most similar to ``post_id``, or None if it does not exist.
+
+    Reads new posts from the primary first. Raises ``SimilarIndexNotReady``
+    until the index is built, and starts the build if nothing has. After
+    a backfill the current index keeps answering while its replacement is
+    built.
+    """
+    index = _similar_index
+    if index is None:
+        preload_similar_index()
+        raise SimilarIndexNotReady()
+    with SessionLocal() as db:
+        if get_table_versions(db, POSTS_BACKFILL)[POSTS_BACKFILL] != index.backfill:
+            _schedule_similar_build(rebuild=True)
+        return index.similar(db, post_id, limit)
+
+
+def refresh(db: Session) -> Dict[str, int]:
+    """Scores posts and students added since the last refresh and stores the changed lists."""
+    return get_engine().refresh(db)
+
+
+def rebuild(db: Session) -> Dict[str, int]:
+    """Recomputes every student's recommendations from scratch."""
+    return get_engine().rebuild(db)
+
+
+def rebuild_after_backfill(db: Session) -> Dict[str, int]:
+    """
+    Rebuilds the stored lists and stamps ``POSTS_BACKFILL``, after posts were written below existing ids.
+
+    A refresh only scores rows past its watermarks and the similar-posts
+    index only appends ids past its last one, so both would miss them.
+    """
+    bump_table_version(db, POSTS_BACKFILL)
+    db.commit()
+    return rebuild(db)
+
+
+def _refresh_in_background():
+    try:
+        with SessionLocal() as db:
+            return refresh(db)
+    except Exception:
+        logger.exception("Recommendation refresh failed")
+
+
+def _background() -> ThreadPoolExecutor:
+    """The background thread's executor; call with ``_lock`` held."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recommendations")
+    return _executor
+
+
+def schedule_refresh() -> Optional[Future]:
+    """
+    Queues a refresh on the background thread and returns its future.
+
+    A refresh that is queued but not started yet will see the caller's
+    rows too, so it is returned instead of queueing another one.
+    """
+    global _queued
+    if not settings.RECOMMENDATIONS_REFRESH:
+        return None
+    with _lock:
+        if _queued is not None and not _queued.running() and not _queued.done():
+            return _queued
+        _queued = _background().submit(_refresh_in_background)
+        return _queued
+
+
+def refresh_if_behind() -> Optional[Future]:
+    """
+    Schedules a refresh when posts or students exist past the stored watermarks.
+
+    Called at startup, so lists catch up after a migration, seed or import
+    without waiting for the next create. Costs two small queries and does
+    not load the engine.
+    """
+    try:
+        with SessionLocal() as db:
+            watermarks = dict(db.execute(select(RecommendationWatermark.name, RecommendationWatermark.last_id)).all())
+            latest = db.execute(select(
+                select(func.max(Post.id)).scalar_subquery(), select(func.max(Student.id)).scalar_subquery()
+            )).one()
+    except SQLAlchemyError:
+        logger.exception("Could not read the recommendation watermarks")
+        return None
+    if (latest[0] or 0) > watermarks.get("posts", 0) or (latest[1] or 0) > watermarks.get("students", 0):
+        return schedule_refresh()
+    return None
+
+
+def _build_similar_index():
+    global _similar_index
+    try:
+        from .similar import SimilarPostIndex
+        index = SimilarPostIndex()
+        with SessionLocal() as db:
+            # Read before the posts, so a backfill during the build triggers another
+            index.backfill = get_table_versions(db, POSTS_BACKFILL)[POSTS_BACKFILL]
+            index.update(db)
+        with _lock:
+            _similar_index = index
+    except Exception:
+        logger.exception("Building the similar posts index failed")
+
+
+def _schedule_similar_build(rebuild: bool) -> Future:
+    global _similar_build
+    with _lock:
+        building = _similar_build is not None and not _similar_build.done()
+        if not building and (rebuild or _similar_index is None):
+            _similar_build = _background().submit(_build_similar_index)
+        return _similar_build
+
+
+def preload_similar_index() -> Future:
+    """
+    Builds the similar-posts index on the background thread and returns the build's future.
+
+    Submits a build only while there is no index (none yet, or the last
+    build failed) and none is running; otherwise returns the last build.
+    """
+    return _schedule_similar_build(rebuild=False)
+
+
+def shutdown():
+    """Waits for a running or queued refresh and stops the background thread."""
+    global _executor, _queued
+    with _lock:
+        executor, _executor, _queued = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -0,0 +1,21 @@
+import argparse
+import time
+from .. import migrations
+from ..core.database import SessionLocal, engine
+from . import rebuild, refresh
+
+parser = argparse.ArgumentParser(description="Refresh the stored student recommendations")
+parser.add_argument("--rebuild", action="store_true", help="drop every stored list and recompute all students")
+args = parser.parse_args()
+
+migrations.upgrade(engine)
+
+start = time.perf_counter()
+with SessionLocal() as db:
+    stats = rebuild(db) if args.rebuild else refresh(db)
+elapsed = time.perf_counter() - start
+
+print(
+    f"Scored {stats['posts']} new posts and {stats['students']} new students, "
+    f"rewrote {stats['rewritten']} lists in {elapsed:.1f}s"
+)
@@ -0,0 +1,233 @@
+"""
+Student -> post recommendation engine.
+
+Students and posts are vectorized into sparse hashed tf-idf matrices
+sharing the posts' idf weights. A student's score for a post is the
+cosine similarity of the two vectors, halved when the post asks for a
+later year than the student is in. The top ``k`` posts of every student
+are kept in memory and in the ``student_recommendations`` table.
+
+A refresh only looks at rows past the stored watermarks: new posts are
+scored against every known student in one vectorized pass and merged
+into their lists, and new students are scored against every post in
+batches. Only students whose list changed are rewritten.
+"""
+import logging
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from ..models import Post, RecommendationWatermark, Student, StudentRecommendation
+from .vectors import SparseIndex, term_counts, top_k
+
+logger = logging.getLogger(__name__)
+
+# Scores computed per batch (students x posts), bounding the memory of one pass
+BATCH_CELLS = 4_000_000
+# Fraction of the similarity kept for posts that ask for a later year than the student's
+SENIORITY_PENALTY = 0.5
+WATERMARKS = ("posts", "students")
+# Student ids per DELETE ... IN (...)
+DELETE_CHUNK = 500
+
+POST_COLUMNS = (Post.id, Post.title, Post.work_field, Post.requirement, Post.description, Post.min_year)
+STUDENT_COLUMNS = (Student.id, Student.faculty, Student.major, Student.about_me, Student.year)
+
+
+def post_terms(title, work_field, requirement, description) -> Dict[int, float]:
+    return term_counts([
+        (title, 2.0), ((work_field or "").replace("-", " "), 2.0), (requirement, 2.0), (description, 1.0),
+    ])
+
+
+def student_terms(faculty, major, about_me) -> Dict[int, float]:
+    return term_counts([(faculty, 1.0), (major, 2.0), (about_me, 1.0)])
+
+
+def read_watermarks(db: Session) -> Dict[str, int]:
+    stored = dict(db.execute(select(RecommendationWatermark.name, RecommendationWatermark.last_id)).all())
+    return {name: stored.get(name, 0) for name in WATERMARKS}
+
+
+class RecommendationEngine:
+    """In-memory matrices and top-k lists, kept in step with the stored recommendations."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.posts = SparseIndex()
+        self.students = SparseIndex(idf_source=self.posts)
+        self.post_min_year = np.empty(0, np.int32)
+        self.student_year = np.empty(0, np.int32)
+        # Post ids (-1 for empty slots) and scores of every student's list, best first
+        self.top_posts = np.full((0, self.k), -1, np.int64)
+        self.top_scores = np.zeros((0, self.k), np.float32)
+        # Watermarks the in-memory state matches; None until loaded from the database
+        self.watermarks: Optional[Dict[str, int]] = None
+
+    def _add_posts(self, rows) -> List[int]:
+        self.posts.add([row.id for row in rows], [
+            post_terms(row.title, row.work_field, row.requirement, row.description) for row in rows
+        ])
+        self.post_min_year = np.concatenate(
+            (self.post_min_year, np.array([row.min_year or 0 for row in rows], np.int32))
+        )
+        return [self.posts.position(row.id) for row in rows]
+
+    def _add_students(self, rows) -> List[int]:
+        self.students.add([row.id for row in rows], [
+            student_terms(row.faculty, row.major, row.about_me) for row in rows
+        ])
+        self.student_year = np.concatenate(
+            (self.student_year, np.array([row.year or 0 for row in rows], np.int32))
+        )
+        self.top_posts = np.concatenate((self.top_posts, np.full((len(rows), self.k), -1, np.int64)))
+        self.top_scores = np.concatenate((self.top_scores, np.zeros((len(rows), self.k), np.float32)))
+        return [self.students.position(row.id) for row in rows]
+
+    def _penalize(self, scores: np.ndarray, student_years: np.ndarray, post_min_years: np.ndarray) -> np.ndarray:
+        return np.where(post_min_years[None, :] > student_years[:, None], scores * SENIORITY_PENALTY, scores)
+
+    def _load(self, db: Session, watermarks: Dict[str, int]):
+        """Rebuilds the in-memory state from the rows and lists the stored watermarks cover."""
+        self._reset()
+        posts = select(*POST_COLUMNS).where(Post.id <= watermarks["posts"]).order_by(Post.id)
+        self._add_posts(db.execute(posts).all())
+        self.posts.compact()
+        students = select(*STUDENT_COLUMNS).where(Student.id <= watermarks["students"]).order_by(Student.id)
+        self._add_students(db.execute(students).all())
+        self.students.compact()
+
+        recommendation = StudentRecommendation
+        stored = db.execute(
+            select(recommendation.student_id, recommendation.post_id, recommendation.score)
+            .order_by(recommendation.student_id, recommendation.score.desc(), recommendation.post_id)
+        ).all()
+        slot, previous = 0, None
+        for student_id, post_id, score in stored:
+            slot = slot + 1 if student_id == previous else 0
+            previous = student_id
+            position = self.students.position(student_id)
+            if position is not None and slot < self.k:
+                self.top_posts[position, slot] = post_id
+                self.top_scores[position, slot] = score
+        self.watermarks = watermarks
+
+    def _merge_new_posts(self, positions: List[int]) -> np.ndarray:
+        """Merges new posts into the lists of the known students; returns the positions of changed lists."""
+        n_students = len(self.students)
+        if not n_students or not positions:
+            return np.empty(0, np.int64)
+        post_ids = self.posts.ids[positions]
+        batch = max(1, BATCH_CELLS // n_students)
+        changed = np.zeros(n_students, bool)
+        for start in range(0, len(positions), batch):
+            chunk = positions[start:start + batch]
+            scores = self.students.batch_scores([self.posts.row(p) for p in chunk]).T
+            scores = self._penalize(scores, self.student_year, self.post_min_year[chunk])
+
+            new_ids = np.broadcast_to(post_ids[start:start + batch], scores.shape)
+            candidates = np.concatenate((self.top_posts, new_ids), 1)
+            candidate_scores = np.concatenate((np.where(self.top_posts >= 0, self.top_scores, 0), scores), 1)
+            best = top_k(candidate_scores, self.k)
+            top_posts = np.where(best >= 0, np.take_along_axis(candidates, np.maximum(best, 0), 1), -1)
+            top_scores = np.where(best >= 0, np.take_along_axis(candidate_scores, np.maximum(best, 0), 1), 0)
+            changed |= (top_posts != self.top_posts).any(axis=1)
+            self.top_posts, self.top_scores = top_posts, top_scores.astype(np.float32)
+        return np.flatnonzero(changed)
+
+    def _rank_new_students(self, positions: List[int]):
+        if not positions or not len(self.posts):
+            return
+        batch = max(1, BATCH_CELLS // len(self.posts))
+        for start in range(0, len(positions), batch):
+            chunk = positions[start:start + batch]
+            scores = self.posts.batch_scores([self.students.row(p) for p in chunk])
+            scores = self._penalize(scores, self.student_year[chunk], self.post_min_year)
+            best = top_k(scores, self.k)
+            self.top_posts[chunk] = np.where(best >= 0, self.posts.ids[np.maximum(best, 0)], -1)
+            self.top_scores[chunk] = np.where(best >= 0, np.take_along_axis(scores, np.maximum(best, 0), 1), 0)
+
+    def _write(self, db: Session, positions: np.ndarray):
+        student_ids = self.students.ids[positions].tolist()
+        for start in range(0, len(student_ids), DELETE_CHUNK):
+            db.execute(delete(StudentRecommendation).where(
+                StudentRecommendation.student_id.in_(student_ids[start:start + DELETE_CHUNK])
+            ))
+        rows = [
+            {"student_id": student_id, "post_id": int(post_id), "score": float(score)}
+            for student_id, posts, scores in zip(student_ids, self.top_posts[positions], self.top_scores[positions])
+            for post_id, score in zip(posts, scores) if post_id >= 0
+        ]
+        if rows:
+            db.execute(insert(StudentRecommendation), rows)
+
+    def refresh(self, db: Session) -> Dict[str, int]:
+        """
+        Brings the stored recommendations up to date with posts and students created since the last refresh.
+
+        Returns counts of the new posts, new students and rewritten lists.
+        If another process moved the watermarks meanwhile, nothing is
+        written and the next refresh starts from its results.
+        """
+        with self._lock:
+            try:
+                return self._refresh(db)
+            except Exception:
+                db.rollback()
+                self.watermarks = None
+                raise
+
+    def _refresh(self, db: Session) -> Dict[str, int]:
+        watermarks = read_watermarks(db)
+        if self.watermarks != watermarks:
+            self._load(db, watermarks)
+
+        new_posts = db.execute(select(*POST_COLUMNS).where(Post.id > watermarks["posts"]).order_by(Post.id)).all()
+        new_students = db.execute(
+            select(*STUDENT_COLUMNS).where(Student.id > watermarks["students"]).order_by(Student.id)
+        ).all()
+        stats = {"posts": len(new_posts), "students": len(new_students), "rewritten": 0}
+        if not new_posts and not new_students:
+            db.rollback()
+            return stats
+
+        changed = self._merge_new_posts(self._add_posts(new_posts)) if new_posts else np.empty(0, np.int64)
+        student_positions = self._add_students(new_students) if new_students else []
+        self._rank_new_students(student_positions)
+        positions = np.union1d(changed, np.array(student_positions, np.int64)).astype(np.int64)
+        self._write(db, positions)
+        stats["rewritten"] = len(positions)
+
+        advanced = {
+            "posts": new_posts[-1].id if new_posts else watermarks["posts"],
+            "students": new_students[-1].id if new_students else watermarks["students"],
+        }
+        for name in WATERMARKS:
+            updated = db.execute(
+                update(RecommendationWatermark)
+                .where(RecommendationWatermark.name == name, RecommendationWatermark.last_id == watermarks[name])
+                .values(last_id=advanced[name])
+            ).rowcount
+            if not updated:
+                logger.info("Recommendation watermarks moved during refresh; reloading next time")
+                db.rollback()
+                self.watermarks = None
+                return stats
+        db.commit()
+        self.watermarks = advanced
+        return stats
+
+    def rebuild(self, db: Session) -> Dict[str, int]:
+        """Drops every stored list and recomputes all of them from scratch."""
+        with self._lock:
+            db.execute(delete(StudentRecommendation))
+            db.execute(delete(RecommendationWatermark))
+            db.execute(insert(RecommendationWatermark), [{"name": name, "last_id": 0} for name in WATERMARKS])
+            db.commit()
+            self._reset()
+        return self.refresh(db)
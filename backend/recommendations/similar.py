@@ -0,0 +1,90 @@
+"""
+Posts similar to a given post, by hashed tf-idf over words and word pairs.
+
+The index lives in the API process. It is filled from the posts table on
+the background thread (see ``preload_similar_index``), and every lookup
+first appends the posts created since the previous one, so new posts are
+found (and find others) right away. Posts added below ``last_id`` are
+not appended; the package rebuilds the index when they are stamped.
+
+A lookup scores the post's ``QUERY_TERMS`` highest weighted features
+against the posting lists, which keeps it away from the long lists of
+terms most posts share, then rescores the best ``CANDIDATES`` with the
+full vectors so the returned scores are exact cosine similarities.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models import Post
+from .vectors import SparseIndex, term_counts, top_k
+
+# Features of the looked-up post used to find candidates
+QUERY_TERMS = 32
+# Candidates rescored with the full vectors
+CANDIDATES = 200
+
+POST_COLUMNS = (Post.id, Post.title, Post.requirement, Post.description, Post.long_description)
+
+
+def post_terms(title, requirement, description, long_description) -> Dict[int, float]:
+    return term_counts(
+        [(title, 3.0), (requirement, 2.0), (description, 1.0), (long_description, 1.0)], bigrams=True
+    )
+
+
+class SimilarPostIndex:
+    """Hashed unigram and bigram vectors of every post, appended as posts are created."""
+
+    def __init__(self):
+        self.index = SparseIndex()
+        self.last_id = 0
+        # POSTS_BACKFILL stamp the index was built under
+        self.backfill = 0
+        self._lock = threading.Lock()
+
+    def _update(self, db: Session) -> int:
+        rows = db.execute(select(*POST_COLUMNS).where(Post.id > self.last_id).order_by(Post.id)).all()
+        if rows:
+            self.index.add([row.id for row in rows], [
+                post_terms(row.title, row.requirement, row.description, row.long_description) for row in rows
+            ])
+            if self.last_id == 0:
+                # The first load always gets idf weights, however few posts there are
+                self.index.compact()
+            self.last_id = rows[-1].id
+        return len(rows)
+
+    def update(self, db: Session) -> int:
+        """Appends posts created since the last update; returns how many."""
+        with self._lock:
+            return self._update(db)
+
+    def similar(self, db: Session, post_id: int, k: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Returns up to ``k`` (post id, score) pairs most similar to the post, best first.
+
+        None when the post does not exist. Posts sharing no terms with it
+        are left out, so the list can be shorter than ``k``.
+        """
+        with self._lock:
+            self._update(db)
+            index = self.index
+            position = index.position(post_id)
+            if position is None:
+                return None
+
+            features, weights = index.row(position)
+            query = (features, weights)
+            if len(features) > QUERY_TERMS:
+                keep = np.sort(np.argpartition(-weights, QUERY_TERMS - 1)[:QUERY_TERMS])
+                query = (features[keep], weights[keep])
+            scores = index.scores(query)
+            scores[position] = 0
+            candidates = top_k(scores, CANDIDATES)[0]
+            candidates = candidates[candidates >= 0]
+
+            exact = index.row_scores((features, weights), candidates)
+            best = np.argsort(-exact, kind="stable")[:k]
+            return [(int(index.ids[candidates[i]]), float(exact[i])) for i in best if exact[i] > 0]
@@ -0,0 +1,271 @@
+"""
+Hashed bag-of-words vectors and an append-only sparse index scored with NumPy.
+
+Tokens are hashed into ``FEATURES`` columns with CRC32, which is stable
+across processes, so no vocabulary has to be stored or shared. Rows hold
+raw term frequencies; scoring uses log-scaled tf-idf weights normalized
+to unit length, so a dot product is a cosine similarity.
+"""
+import math
+import re
+import zlib
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+FEATURES = 1 << 20
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the to we will with you your".split()
+)
+
+# A query or row vector: sorted unique feature ids and their weights
+Vector = Tuple[np.ndarray, np.ndarray]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    tokens = (token.rstrip(".") for token in _TOKEN_RE.findall(text.lower()))
+    return [token for token in tokens if token and token not in STOP_WORDS]
+
+
+# Odd multiplier mixing the first word of a pair, so "a b" and "b a" land apart
+_PAIR_MULTIPLIER = 0x9E3779B1
+
+# token -> feature id, bounded so an unusual vocabulary cannot grow it forever
+_feature_cache: Dict[str, int] = {}
+FEATURE_CACHE_SIZE = 1 << 20
+
+
+def _feature(token: str) -> int:
+    feature = _feature_cache.get(token)
+    if feature is None:
+        if len(_feature_cache) >= FEATURE_CACHE_SIZE:
+            _feature_cache.clear()
+        feature = _feature_cache[token] = zlib.crc32(token.encode()) & (FEATURES - 1)
+    return feature
+
+
+def term_counts(fields: Iterable[Tuple[Optional[str], float]], bigrams: bool = False) -> Dict[int, float]:
+    """Weighted term counts of the given (text, weight) fields, keyed by hashed feature id."""
+    counts: Dict[int, float] = {}
+    for text, weight in fields:
+        features = [_feature(token) for token in tokenize(text)]
+        if bigrams:
+            # A word pair hashes from its two word features, without building the pair string
+            features += [(a * _PAIR_MULTIPLIER ^ b) & (FEATURES - 1) for a, b in zip(features, features[1:])]
+        for feature, n in Counter(features).items():
+            counts[feature] = counts.get(feature, 0.0) + weight * n
+    return counts
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(start, end) for every pair, without a Python loop."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, np.int64)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+class SparseIndex:
+    """
+    Rows of hashed term frequencies, appended incrementally and scored against query vectors.
+
+    Rows up to the last compaction are held as posting lists (feature ->
+    rows), so scoring a query only touches the rows sharing one of its
+    features. Rows appended since then form a small delta that is scored
+    by matching its features against the query. The delta is folded into
+    the postings once it outgrows ``compact_ratio`` of the index; document
+    frequencies, and so the idf weights, are recomputed at that point.
+
+    An index built with ``idf_source`` weighs its rows with the idf of that
+    other index, so vectors of two kinds of documents (students and posts)
+    are comparable.
+    """
+
+    def __init__(self, idf_source: Optional["SparseIndex"] = None, compact_ratio: float = 0.05,
+                 min_delta: int = 512):
+        self.idf_source = idf_source
+        self.compact_ratio = compact_ratio
+        self.min_delta = min_delta
+        self.ids = np.empty(0, np.int64)
+        self._positions: Dict[int, int] = {}
+        # All rows, CSR: row i holds _features/_tf/_weights[_indptr[i]:_indptr[i + 1]]
+        self._indptr = np.zeros(1, np.int64)
+        self._features = np.empty(0, np.int32)
+        self._tf = np.empty(0, np.float32)
+        self._weights = np.empty(0, np.float32)
+        # Posting lists of rows [0, _compacted)
+        self._compacted = 0
+        self._posting_features = np.empty(0, np.int32)
+        self._posting_starts = np.zeros(1, np.int64)
+        self._posting_rows = np.empty(0, np.int32)
+        self._posting_weights = np.empty(0, np.float32)
+        # Delta rows [_compacted, len): row number of every stored value
+        self._delta_rows = np.empty(0, np.int32)
+        self._idf_features = np.empty(0, np.int32)
+        self._idf_values = np.empty(0, np.float32)
+        self._idf_default = 1.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, row_id: int) -> Optional[int]:
+        return self._positions.get(row_id)
+
+    def idf(self, features: np.ndarray) -> np.ndarray:
+        if self.idf_source is not None:
+            return self.idf_source.idf(features)
+        if not len(self._idf_features):
+            return np.full(len(features), self._idf_default, np.float32)
+        positions = np.minimum(np.searchsorted(self._idf_features, features), len(self._idf_features) - 1)
+        known = self._idf_features[positions] == features
+        return np.where(known, self._idf_values[positions], self._idf_default).astype(np.float32)
+
+    def _weigh(self, features: np.ndarray, tf: np.ndarray, rows: np.ndarray, n_rows: int) -> np.ndarray:
+        weights = np.log1p(tf) * self.idf(features)
+        norms = np.sqrt(np.bincount(rows, weights * weights, minlength=n_rows))
+        norms[norms == 0] = 1.0
+        return (weights / norms[rows]).astype(np.float32)
+
+    def vector(self, counts: Dict[int, float]) -> Vector:
+        """Unit-length tf-idf query vector of the given term counts."""
+        if not counts:
+            return np.empty(0, np.int32), np.empty(0, np.float32)
+        features = np.fromiter(counts.keys(), np.int32, len(counts))
+        tf = np.fromiter(counts.values(), np.float32, len(counts))
+        order = np.argsort(features)
+        features, tf = features[order], tf[order]
+        return features, self._weigh(features, tf, np.zeros(len(features), np.int64), 1)
+
+    def row(self, position: int) -> Vector:
+        start, end = self._indptr[position], self._indptr[position + 1]
+        return self._features[start:end], self._weights[start:end]
+
+    def add(self, ids: Sequence[int], counts: Sequence[Dict[int, float]]):
+        """Appends one row per id; an id already in the index is ignored."""
+        new = [(row_id, row) for row_id, row in zip(ids, counts) if row_id not in self._positions]
+        if not new:
+            return
+        lengths = np.array([len(row) for _, row in new], np.int64)
+        features = np.fromiter(chain.from_iterable(row.keys() for _, row in new), np.int32, int(lengths.sum()))
+        tf = np.fromiter(chain.from_iterable(row.values() for _, row in new), np.float32, len(features))
+        local_rows = np.repeat(np.arange(len(new)), lengths)
+        # Features sorted within each row, so a row can be matched with searchsorted
+        order = np.lexsort((features, local_rows))
+        features, tf = features[order], tf[order]
+
+        first = len(self.ids)
+        for offset, (row_id, _) in enumerate(new):
+            self._positions[row_id] = first + offset
+        self.ids = np.concatenate((self.ids, np.array([row_id for row_id, _ in new], np.int64)))
+        self._indptr = np.concatenate((self._indptr, self._indptr[-1] + np.cumsum(lengths)))
+        self._features = np.concatenate((self._features, features))
+        self._tf = np.concatenate((self._tf, tf))
+        self._weights = np.concatenate((self._weights, self._weigh(features, tf, local_rows, len(new))))
+        self._delta_rows = np.concatenate((self._delta_rows, (local_rows + first).astype(np.int32)))
+
+        if len(self) - self._compacted > max(self.min_delta, self.compact_ratio * len(self)):
+            self.compact()
+
+    def compact(self):
+        """Rebuilds the posting lists (and idf) over all rows, emptying the delta."""
+        n_rows = len(self)
+        if n_rows == self._compacted:
+            return
+        rows = np.repeat(np.arange(n_rows, dtype=np.int32), np.diff(self._indptr))
+        if self.idf_source is None:
+            self._idf_features, df = np.unique(self._features, return_counts=True)
+            self._idf_values = (np.log((1 + n_rows) / (1 + df)) + 1).astype(np.float32)
+            self._idf_default = math.log(1 + n_rows) + 1
+        self._weights = self._weigh(self._features, self._tf, rows, n_rows)
+
+        order = np.argsort(self._features, kind="stable")
+        self._posting_features, starts = np.unique(self._features[order], return_index=True)
+        self._posting_starts = np.append(starts, len(order)).astype(np.int64)
+        self._posting_rows = rows[order]
+        self._posting_weights = self._weights[order]
+        self._compacted = n_rows
+        self._delta_rows = np.empty(0, np.int32)
+
+    def batch_scores(self, queries: Sequence[Vector]) -> np.ndarray:
+        """Cosine similarity of every query against every row, as a (queries, rows) float32 array."""
+        n_rows = len(self)
+        if not queries or not n_rows:
+            return np.zeros((len(queries), n_rows), np.float32)
+        query_rows = np.repeat(np.arange(len(queries)), [len(features) for features, _ in queries])
+        query_features = np.concatenate([features for features, _ in queries])
+        query_weights = np.concatenate([weights for _, weights in queries])
+        flat = np.zeros(len(queries) * n_rows, np.float64)
+
+        # Compacted rows: walk the posting list of every query feature
+        if len(self._posting_features) and len(query_features):
+            positions = np.minimum(
+                np.searchsorted(self._posting_features, query_features), len(self._posting_features) - 1
+            )
+            hit = self._posting_features[positions] == query_features
+            starts = self._posting_starts[positions[hit]]
+            ends = self._posting_starts[positions[hit] + 1]
+            entries = _ranges(starts, ends)
+            owners = np.repeat(np.flatnonzero(hit), ends - starts)
+            flat += np.bincount(
+                query_rows[owners] * n_rows + self._posting_rows[entries],
+                query_weights[owners] * self._posting_weights[entries],
+                minlength=len(flat),
+            )
+
+        # Delta rows: match each stored feature against each query's features
+        delta_start = self._indptr[self._compacted]
+        if len(self._delta_rows):
+            delta_features = self._features[delta_start:]
+            delta_weights = self._weights[delta_start:]
+            for q, (features, weights) in enumerate(queries):
+                if not len(features):
+                    continue
+                positions = np.minimum(np.searchsorted(features, delta_features), len(features) - 1)
+                hit = features[positions] == delta_features
+                flat[q * n_rows:(q + 1) * n_rows] += np.bincount(
+                    self._delta_rows[hit], delta_weights[hit] * weights[positions[hit]], minlength=n_rows
+                )
+        return flat.reshape(len(queries), n_rows).astype(np.float32)
+
+    def scores(self, query: Vector) -> np.ndarray:
+        return self.batch_scores([query])[0]
+
+    def row_scores(self, query: Vector, positions: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query against the given rows only."""
+        features, weights = query
+        positions = np.asarray(positions, np.int64)
+        if not len(features) or not len(positions):
+            return np.zeros(len(positions), np.float32)
+        starts, ends = self._indptr[positions], self._indptr[positions + 1]
+        entries = _ranges(starts, ends)
+        owners = np.repeat(np.arange(len(positions)), ends - starts)
+        matches = np.minimum(np.searchsorted(features, self._features[entries]), len(features) - 1)
+        hit = features[matches] == self._features[entries]
+        return np.bincount(
+            owners[hit], self._weights[entries[hit]] * weights[matches[hit]], minlength=len(positions)
+        ).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column positions of the ``k`` highest positive scores of every row, best first.
+
+    Always ``k`` columns wide; slots without a positive score hold -1.
+    """
+    scores = np.atleast_2d(scores)
+    result = np.full((scores.shape[0], k), -1, np.int64)
+    n = min(k, scores.shape[1])
+    if n == 0:
+        return result
+    best = np.argpartition(-scores, n - 1, axis=1)[:, :n]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1, kind="stable")
+    best = np.take_along_axis(best, order, axis=1)
+    result[:, :n] = np.where(np.take_along_axis(scores, best, axis=1) > 0, best, -1)
+    return result
@@ -1,11 +1,17 @@
 from ..schemas.company import CompanyBase, CompanyCreate, CompanyResponse
 from ..schemas.student import StudentBase, StudentCreate, StudentResponse
-from ..schemas.post import PostBase, PostCreate, PostResponse
-from ..schemas.enums import WorkField, EmploymentType
+from ..schemas.post import PostBase, PostCreate, PostResponse, PostFacetsResponse, PostListItem, PostListResponse
+from ..schemas.location import LocationResponse, RegionResponse
+from ..schemas.recommendation import RecommendedPost, StudentRecommendationsResponse, SimilarPostsResponse
+from ..schemas.bulk import BulkItemResult, BulkCreateResponse
+from ..schemas.enums import WorkField, EmploymentType, PostSort
 
 __all__ = [
     "CompanyBase", "CompanyCreate", "CompanyResponse",
     "StudentBase", "StudentCreate", "StudentResponse",
-    "PostBase", "PostCreate", "PostResponse", 
-    "WorkField", "EmploymentType"
+    "PostBase", "PostCreate", "PostResponse", "PostFacetsResponse", "PostListItem", "PostListResponse",
+    "LocationResponse", "RegionResponse",
+    "RecommendedPost", "StudentRecommendationsResponse", "SimilarPostsResponse",
+    "BulkItemResult", "BulkCreateResponse",
+    "WorkField", "EmploymentType", "PostSort"
 ]
\ No newline at end of file
@@ -20,4 +20,4 @@ class CompanyResponse(CompanyBase):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
@@ -27,4 +27,9 @@ class EmploymentType(str, Enum):
     FULL_TIME = "full_time"
     PART_TIME = "part_time"
     INTERNSHIP = "internship"
-    CONTRACT = "contract"
\ No newline at end of file
+    CONTRACT = "contract"
+
+class PostSort(str, Enum):
+    NEWEST = "newest"
+    SALARY = "salary"
+    MIN_YEAR = "min_year"
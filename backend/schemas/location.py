@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class LocationResponse(BaseModel):
+    slug: str
+    name: str
+
+class RegionResponse(BaseModel):
+    """A region and its locations; locations outside any region are grouped under a null slug."""
+    slug: Optional[str] = None
+    name: Optional[str] = None
+    locations: List[LocationResponse]
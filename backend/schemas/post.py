@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 from .enums import WorkField, EmploymentType
 
@@ -28,4 +28,41 @@ class PostResponse(PostBase):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PostListItem(BaseModel):
+    """A post as shown on a listing card, read from the projected listing columns."""
+    id: int
+    title: str
+    company_name: str
+    work_field: str
+    employment_type: Optional[str] = None
+    location: Optional[str] = None
+    onsite: bool
+    salary: Optional[str] = None
+    min_year: Optional[int] = None
+    requirement: Optional[str] = None
+    description: Optional[str] = None
+    image_url: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    @field_validator("salary", mode="before")
+    @classmethod
+    def format_salary(cls, value):
+        return f"{value:,}" if isinstance(value, int) else value
+
+    class Config:
+        from_attributes = True
+
+class PostListResponse(BaseModel):
+    count: Optional[int] = None
+    results: List[PostListItem]
+    next_cursor: Optional[str] = None
+
+class PostFacetsResponse(BaseModel):
+    total: int
+    work_field: Dict[str, int]
+    location: Dict[str, int]
+    onsite: Dict[str, int]
+    employment_type: Dict[str, int]
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List
+from .post import PostListItem
+
+class RecommendedPost(PostListItem):
+    """A listing card with the cosine similarity it was recommended with."""
+    score: float
+
+class StudentRecommendationsResponse(BaseModel):
+    student_id: int
+    results: List[RecommendedPost]
+
+class SimilarPostsResponse(BaseModel):
+    post_id: int
+    results: List[RecommendedPost]
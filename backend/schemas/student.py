@@ -22,4 +22,4 @@ class StudentResponse(StudentBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
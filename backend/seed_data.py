@@ -1,9 +1,16 @@
 from sqlalchemy.orm import sessionmaker
-from .main import engine
-from .models import Company, Post, User, Student
+from . import migrations, recommendations
+from .core.database import engine
+from .models import Company, Post, User, Student, StudentRecommendation
 from .schemas import WorkField, EmploymentType
+from .crud.location import link_locations
+from .crud.post import rebuild_facet_counts
+from .crud.table_version import bump_table_version
 import random
 
+# The app only migrates in its lifespan hook, so make sure the schema exists
+migrations.upgrade(engine)
+
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 db = SessionLocal()
@@ -161,6 +168,7 @@ jobs_data = [
 
 def seed_database():
     # Clear existing data
+    db.query(StudentRecommendation).delete()
     db.query(Post).delete()
     db.query(Company).delete()
     db.query(Student).delete()
@@ -199,6 +207,8 @@ def seed_database():
         db.add(post)
     
     db.commit()
+    link_locations(db)
+    rebuild_facet_counts(db)
 
     # Create you as a student
     me_user = User(
@@ -228,7 +238,11 @@ def seed_database():
     )
     db.add(student)
 
+    bump_table_version(db, "posts", "companies", "students")
     db.commit()
+    # Ids restart after the deletes above, so the lists and any running
+    # API's similar-posts index are rebuilt rather than refreshed
+    recommendations.rebuild_after_backfill(db)
 
     print("Database seeded successfully!")
 
@@ -1,17 +1,23 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import settings
-from ..core.database import get_db
+from ..core.database import get_async_db, get_read_db
+from ..crud import user as crud_user
 from ..models.user import User
+from ..schemas.user import UserResponse
+from .auth_cache import cache_user, token_cache, user_cache
 
 security = HTTPBearer()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    # python-jose is imported on first use to keep it out of worker boot
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -24,9 +30,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -34,28 +44,72 @@ def decode_access_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(token, payload, ttl=min(token_cache.ttl, remaining))
+    return payload
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    payload = decode_access_token(token)
 
-    user_id: int = payload.get("sub")
-    if user_id is None:
+def _get_user_id(credentials: HTTPAuthorizationCredentials) -> int:
+    payload = decode_access_token(credentials.credentials)
+
+    try:
+        return int(payload["sub"])
+    except (KeyError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+
+def _check_user(user):
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Returns the authenticated user as an ORM object. Always reads the database."""
+    user_id = _get_user_id(credentials)
+
+    user = await db.run_sync(crud_user.get_user_by_id, user_id)
+    _check_user(user)
+    cache_user(user)
 
     return user
+
+
+async def get_current_identity(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_read_db)
+) -> UserResponse:
+    """
+    Returns a snapshot of the authenticated user.
+
+    For endpoints that only need to know who is calling: the snapshot comes
+    from the auth cache, and the database is only read on a cache miss.
+    """
+    user_id = _get_user_id(credentials)
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        user = await db.run_sync(crud_user.get_user_by_id, user_id)
+        _check_user(user)
+        snapshot = cache_user(user)
+    else:
+        _check_user(snapshot)
+
+    return snapshot
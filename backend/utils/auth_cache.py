@@ -0,0 +1,26 @@
+from ..config import settings
+from ..schemas.user import UserResponse
+from .cache import TTLCache
+
+# Verified access token -> decoded payload, so repeated requests skip the
+# signature check. Entries never outlive the token's own expiry.
+token_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+# User id -> snapshot of the user row, so identity-only requests skip the
+# database. crud/user invalidates an entry whenever it changes the row; other
+# workers see the change once their entry expires.
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+
+def cache_user(user) -> UserResponse:
+    snapshot = UserResponse.from_orm(user)
+    user_cache.set(snapshot.id, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int):
+    user_cache.pop(user_id)
+
+
+def stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
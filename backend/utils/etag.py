@@ -0,0 +1,28 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+def make_etag(*parts) -> str:
+    """Builds a strong ETag from the values that determine a response body."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+def query_key(request: Request) -> tuple:
+    """Query parameters in a canonical order, for use in an ETag."""
+    return tuple(sorted(request.query_params.multi_items()))
+
+def check_etag(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Sets the ETag on ``response`` and returns a 304 response when the client
+    already holds this version (If-None-Match), so the caller can skip
+    building the body. Returns None otherwise.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or etag in candidates:
+            return Response(status_code=304, headers=headers)
+    return None
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import AsyncIterator, Sequence
+from sqlalchemy import Select
+from ..core.database import open_read_session
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+async def stream_partitions(statement: Select, batch_size: int) -> AsyncIterator[Sequence]:
+    """
+    Yields the rows of ``statement`` in lists of at most ``batch_size``.
+
+    Reads through a server-side cursor with ``yield_per`` on a session of
+    its own, on a replica when there is one, so it can outlive the
+    request's session and only one batch is held in memory at a time.
+    """
+    async with await open_read_session() as db:
+        result = await db.stream(statement.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def ndjson_chunks(partitions: AsyncIterator[Sequence]) -> AsyncIterator[str]:
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(row._asdict(), default=_json_default, ensure_ascii=False) + "\n" for row in rows
+        )
+
+
+async def csv_chunks(columns: Sequence[str], partitions: AsyncIterator[Sequence]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
@@ -1,16 +1,118 @@
-import requests
-from typing import Dict, Optional
+import asyncio
+from typing import TYPE_CHECKING, Dict, Optional
+from urllib.parse import urlencode
 from ..config import settings
+from .cache import TTLCache
+
+# httpx and python-jose are imported on first use; neither is needed to boot
+if TYPE_CHECKING:
+    import httpx
 
 
 class GoogleOAuth:
+    """
+    Async Google OAuth2 / OpenID Connect client.
+
+    All calls share one pooled keep-alive ``httpx.AsyncClient`` with timeouts,
+    and at most ``GOOGLE_OAUTH_MAX_CONCURRENCY`` requests are in flight at a
+    time. The discovery document and JWKS are cached, so a login normally
+    costs a single round trip: the code exchange, with the user read from the
+    verified ID token. Setting ``GOOGLE_OAUTH_BASE_URL`` points the client at
+    another issuer (e.g. a local stub) that serves its own discovery document.
+    """
 
     GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
     GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
     GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+    GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
+    # Seconds the fixed endpoints stand in for a discovery document that failed to load
+    DISCOVERY_FALLBACK_TTL = 60.0
+
+    _client: Optional["httpx.AsyncClient"] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+    _transport: Optional["httpx.AsyncBaseTransport"] = None
+    _cache = TTLCache(maxsize=8, ttl=settings.GOOGLE_OAUTH_CACHE_TTL)
+
+    @classmethod
+    def configure(cls, transport: Optional["httpx.AsyncBaseTransport"] = None):
+        """Replaces the HTTP transport, e.g. with an in-process stub for benchmarks."""
+        cls._transport = transport
+        cls._client = None
+        cls._semaphore = None
+        cls._cache.clear()
+
+    @classmethod
+    async def aclose(cls):
+        """Closes the shared client; the next request opens a new one on the running event loop."""
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = None
+        cls._semaphore = None
+
+    @classmethod
+    def _get_client(cls) -> "httpx.AsyncClient":
+        if cls._client is None:
+            import httpx
+
+            cls._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(settings.GOOGLE_OAUTH_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=settings.GOOGLE_OAUTH_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GOOGLE_OAUTH_MAX_CONNECTIONS,
+                ),
+                transport=cls._transport,
+            )
+            # Created with the client, so both belong to the event loop that first used them
+            cls._semaphore = asyncio.Semaphore(settings.GOOGLE_OAUTH_MAX_CONCURRENCY)
+        return cls._client
+
+    @classmethod
+    async def _request(cls, method: str, url: str, **kwargs) -> "httpx.Response":
+        client = cls._get_client()
+        async with cls._semaphore:
+            return await client.request(method, url, **kwargs)
+
+    @classmethod
+    async def _get_cached_json(cls, url: str) -> Dict:
+        data = cls._cache.get(url)
+        if data is None:
+            response = await cls._request("GET", url)
+            if response.status_code != 200:
+                import httpx
+
+                raise httpx.HTTPStatusError(
+                    f"Failed to fetch {url}: {response.status_code} {response.text}",
+                    request=response.request,
+                    response=response,
+                )
+            data = response.json()
+            cls._cache.set(url, data)
+        return data
 
-    @staticmethod
-    def get_authorization_url(state: Optional[str] = None) -> str:
+    @classmethod
+    async def get_endpoints(cls) -> Dict:
+        """Returns the issuer's OpenID configuration, falling back to Google's fixed endpoints."""
+        base_url = settings.GOOGLE_OAUTH_BASE_URL.rstrip("/")
+        if base_url:
+            return await cls._get_cached_json(f"{base_url}/.well-known/openid-configuration")
+
+        import httpx
+
+        try:
+            return await cls._get_cached_json(cls.GOOGLE_DISCOVERY_URL)
+        except (httpx.HTTPError, ValueError):
+            # Cached briefly, so logins do not each retry discovery while it is down
+            fallback = {
+                "authorization_endpoint": cls.GOOGLE_AUTH_URL,
+                "token_endpoint": cls.GOOGLE_TOKEN_URL,
+                "userinfo_endpoint": cls.GOOGLE_USERINFO_URL,
+            }
+            cls._cache.set(cls.GOOGLE_DISCOVERY_URL, fallback, ttl=cls.DISCOVERY_FALLBACK_TTL)
+            return fallback
+
+    @classmethod
+    async def get_authorization_url(cls, state: Optional[str] = None) -> str:
+        endpoints = await cls.get_endpoints()
         params = {
             "client_id": settings.GOOGLE_CLIENT_ID,
             "redirect_uri": settings.GOOGLE_REDIRECT_URI,
@@ -21,11 +123,11 @@ class GoogleOAuth:
         if state:
             params["state"] = state
 
-        query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{GoogleOAuth.GOOGLE_AUTH_URL}?{query_string}"
+        return f"{endpoints['authorization_endpoint']}?{urlencode(params)}"
 
-    @staticmethod
-    def exchange_code_for_token(code: str) -> Dict:
+    @classmethod
+    async def exchange_code_for_token(cls, code: str) -> Dict:
+        endpoints = await cls.get_endpoints()
         data = {
             "code": code,
             "client_id": settings.GOOGLE_CLIENT_ID,
@@ -34,20 +136,70 @@ class GoogleOAuth:
             "grant_type": "authorization_code",
         }
 
-        response = requests.post(GoogleOAuth.GOOGLE_TOKEN_URL, data=data)
+        response = await cls._request("POST", endpoints["token_endpoint"], data=data)
 
         if response.status_code != 200:
             raise Exception(f"Failed to exchange code for token: {response.text}")
 
         return response.json()
 
-    @staticmethod
-    def get_user_info(access_token: str) -> Dict:
+    @classmethod
+    async def get_user_info(cls, access_token: str) -> Dict:
+        endpoints = await cls.get_endpoints()
         headers = {"Authorization": f"Bearer {access_token}"}
 
-        response = requests.get(GoogleOAuth.GOOGLE_USERINFO_URL, headers=headers)
+        response = await cls._request("GET", endpoints["userinfo_endpoint"], headers=headers)
 
         if response.status_code != 200:
             raise Exception(f"Failed to get user info: {response.text}")
 
-        return response.json()
+        user_info = response.json()
+        # The OpenID Connect userinfo endpoint names the Google account id "sub"
+        user_info.setdefault("id", user_info.get("sub"))
+        return user_info
+
+    @classmethod
+    async def verify_id_token(cls, id_token: str) -> Dict:
+        """Verifies an ID token against the issuer's cached JWKS and returns its claims."""
+        from jose import jwt
+
+        endpoints = await cls.get_endpoints()
+        jwks = await cls._get_cached_json(endpoints["jwks_uri"])
+        return jwt.decode(
+            id_token,
+            jwks,
+            algorithms=["RS256"],
+            audience=settings.GOOGLE_CLIENT_ID,
+            issuer=endpoints.get("issuer"),
+            options={"verify_at_hash": False},
+        )
+
+    @classmethod
+    async def get_user_info_from_tokens(cls, token_data: Dict) -> Dict:
+        """
+        Returns the user profile for a token response.
+
+        Reads it from the ID token when it verifies, which needs no extra
+        round trip, and otherwise asks the userinfo endpoint.
+        """
+        id_token = token_data.get("id_token")
+        if id_token:
+            import httpx
+            from jose import JWTError
+
+            try:
+                endpoints = await cls.get_endpoints()
+                if "jwks_uri" in endpoints:
+                    claims = await cls.verify_id_token(id_token)
+                    return {
+                        "id": claims["sub"],
+                        "email": claims.get("email"),
+                        "given_name": claims.get("given_name", ""),
+                        "family_name": claims.get("family_name", ""),
+                        "picture": claims.get("picture"),
+                    }
+            except (JWTError, KeyError, ValueError, httpx.HTTPError):
+                # Unverifiable token or JWKS unavailable: ask the userinfo endpoint instead
+                pass
+
+        return await cls.get_user_info(token_data["access_token"])
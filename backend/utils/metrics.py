@@ -0,0 +1,245 @@
+import bisect
+import logging
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_log = logging.getLogger(__name__ + ".slow_queries")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Iterable, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[tuple, float] = {}
+        self._lock = Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labels, labels)} {_number(value)}" for labels, value in values]
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram keeping per-bucket counts for every label set."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[tuple, list] = {}
+        self._lock = Lock()
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, values in series:
+            lines += render_histogram(self.name, self.labels, labels, self.buckets, values[:-1], values[-1])
+        return lines
+
+
+def render_histogram(name: str, label_names, labels, buckets, counts, total) -> List[str]:
+    """Sample lines of one histogram series from non-cumulative bucket counts (the last one is +Inf)."""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(buckets) + ["+Inf"], counts):
+        cumulative += count
+        le = f'le="{bound}"'
+        lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(label_names, labels)} {_number(float(total))}")
+    lines.append(f"{name}_count{_labels(label_names, labels)} {cumulative}")
+    return lines
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status"))
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route.", ("method", "route"), LATENCY_BUCKETS
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements", "SQL statements issued per HTTP request.", ("method", "route"),
+    STATEMENT_COUNT_BUCKETS
+)
+REQUEST_SQL_SECONDS = Counter(
+    "http_request_sql_seconds_total", "Time spent executing SQL, by method and route.", ("method", "route")
+)
+SQL_DURATION = Histogram(
+    "sql_statement_duration_seconds", "SQL statement execution time by engine.", ("engine",), SQL_BUCKETS
+)
+SLOW_QUERIES = Counter(
+    "sql_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS, by engine and route.", ("engine", "route")
+)
+
+METRICS = [REQUESTS, REQUEST_DURATION, REQUEST_SQL_STATEMENTS, REQUEST_SQL_SECONDS, SQL_DURATION, SLOW_QUERIES]
+
+
+class _RequestMetrics:
+    __slots__ = ("scope", "statements", "sql_seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        return _route_of(self.scope)
+
+
+_current_request: ContextVar[Optional[_RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def _route_of(scope) -> str:
+    # Path template of the matched route, so /posts/1 and /posts/2 share a series
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+def instrument_engine(engine: Engine, name: str):
+    """Times every statement ``engine`` runs and charges it to the current request."""
+    slow_seconds = settings.SLOW_QUERY_MS / 1000
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        SQL_DURATION.observe((name,), seconds)
+
+        request = _current_request.get()
+        if request is not None:
+            request.statements += 1
+            request.sql_seconds += seconds
+        if seconds >= slow_seconds:
+            route = request.route if request is not None else "-"
+            SLOW_QUERIES.inc((name, route))
+            slow_query_log.warning(
+                "%.1f ms on %s for %s: %s", seconds * 1000, name,
+                f"{request.scope['method']} {route}" if request is not None else "no request",
+                " ".join(statement.split())[:2000]
+            )
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL use of every HTTP request.
+
+    Requests are labelled with the matched route's path template. Streaming
+    responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = _RequestMetrics(scope)
+        token = _current_request.set(request)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            _current_request.reset(token)
+            labels = (scope["method"], request.route)
+            REQUESTS.inc((*labels, status))
+            REQUEST_DURATION.observe(labels, seconds)
+            REQUEST_SQL_STATEMENTS.observe(labels, request.statements)
+            REQUEST_SQL_SECONDS.inc(labels, request.sql_seconds)
+
+
+def _render_pools(pools: Dict[str, Optional[dict]]) -> List[str]:
+    pools = {name: stats for name, stats in pools.items() if stats is not None}
+    gauges: List[Tuple[str, str, str]] = [
+        ("db_pool_size", "gauge", "size"),
+        ("db_pool_checked_out", "gauge", "checked_out"),
+        ("db_pool_overflow", "gauge", "overflow"),
+        ("db_pool_checkout_timeouts_total", "counter", "timeouts"),
+    ]
+    lines = []
+    for metric, kind, key in gauges:
+        lines += [f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{engine="{_escape(name)}"}} {stats[key]}' for name, stats in pools.items()]
+
+    lines.append("# HELP db_pool_checkout_wait_seconds Time spent waiting for a pooled connection.")
+    lines.append("# TYPE db_pool_checkout_wait_seconds histogram")
+    for name, stats in pools.items():
+        cumulative = list(stats["wait_buckets"].values())
+        counts = [count - previous for count, previous in zip(cumulative, [0] + cumulative[:-1])]
+        counts.append(stats["checkouts"] - (cumulative[-1] if cumulative else 0))
+        lines += render_histogram(
+            "db_pool_checkout_wait_seconds", ("engine",), (name,), list(stats["wait_buckets"]),
+            counts, stats["wait_ms_total"] / 1000
+        )
+    return lines
+
+
+def render(pools: Dict[str, Optional[dict]]) -> str:
+    """All metrics and the given pool stats in the Prometheus text exposition format."""
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    lines += _render_pools(pools)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,76 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, or_, tuple_
+
+# A sort key is (column expression, descending, parser for the cursor value)
+SortKey = Tuple[Any, bool, Callable[[Any], Any]]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encodes the sort key values of the last row of a page into an opaque token."""
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[SortKey]) -> List[Any]:
+    """Decodes a cursor produced by ``encode_cursor``. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise ValueError("Invalid cursor")
+
+    try:
+        return [parse(value) for (_, _, parse), value in zip(sort_keys, values)]
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(sort_keys: Sequence[SortKey], values: Sequence[Any]):
+    """
+    Builds the WHERE clause selecting rows strictly after ``values`` in the
+    order given by ``sort_keys``. The last sort key must be unique (usually id).
+    """
+    directions = {descending for _, descending, _ in sort_keys}
+    columns = [column for column, _, _ in sort_keys]
+
+    if len(directions) == 1:
+        # Uniform direction: a row-value comparison the index can seek on
+        if directions.pop():
+            return tuple_(*columns) < tuple_(*values)
+        return tuple_(*columns) > tuple_(*values)
+
+    clauses = []
+    for i, (column, descending, _) in enumerate(sort_keys):
+        equal_prefix = [sort_keys[j][0] == values[j] for j in range(i)]
+        after = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+
+def order_by_clauses(sort_keys: Sequence[SortKey]) -> list:
+    return [column.desc() if descending else column.asc() for column, descending, _ in sort_keys]
+
+
+def set_page_headers(response, total: Optional[int], next_cursor: Optional[str]):
+    """
+    Sets ``X-Total-Count`` and ``X-Next-Cursor`` for listings whose body is a bare JSON array.
+
+    Each header is left out when there is nothing to say: no count was
+    requested, or this is the last page.
+    """
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
@@ -0,0 +1,19 @@
+from typing import Any
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+def fast_json_response(content: Any, response: Response) -> ORJSONResponse:
+    """
+    Renders already-serialized ``content`` with orjson, skipping FastAPI's
+    response_model validation and jsonable_encoder pass.
+
+    Headers and cookies set on the injected ``response`` (ETag, Cache-Control)
+    are carried over, as FastAPI would do for a plain return value.
+    """
+    rendered = ORJSONResponse(content)
+    rendered.raw_headers.extend(
+        (name, value) for name, value in response.raw_headers
+        if name not in (b"content-length", b"content-type")
+    )
+    return rendered
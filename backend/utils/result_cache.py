@@ -0,0 +1,153 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Optional
+from fastapi.encoders import jsonable_encoder
+from ..config import settings
+
+
+class MemoryBackend:
+    """In-process LRU with TTL, bounded by both entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._data: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self.bytes += len(value)
+            while len(self._data) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+
+    def clear(self, prefix: str):
+        with self._lock:
+            for key in [key for key in self._data if key.startswith(prefix)]:
+                self._remove(key)
+
+    def _remove(self, key: str):
+        _, value = self._data.pop(key)
+        self.bytes -= len(value)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "entries": len(self._data), "bytes": self.bytes}
+
+
+class RedisBackend:
+    """Shared cache on a Redis-compatible server. Needs the optional ``redis`` package."""
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RESULT_CACHE_BACKEND=redis requires the 'redis' package") from e
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes):
+        self.client.set(key, value, ex=max(1, int(self.ttl)))
+
+    def clear(self, prefix: str):
+        keys = list(self.client.scan_iter(match=f"{prefix}*", count=500))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "entries": self.client.dbsize(),
+            "bytes": self.client.info("memory").get("used_memory"),
+        }
+
+
+class ResultCache:
+    """
+    Read-through cache of serialized query results, grouped in namespaces.
+
+    Keys are derived from the namespace and the normalized query parameters;
+    values are stored as JSON so every backend holds the same bytes.
+    Writers call ``invalidate(namespace)`` to drop every cached result that
+    may include the rows they changed.
+    """
+
+    KEY_PREFIX = "kutechnest:results:"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, namespace: str, params: dict) -> str:
+        raw = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        return f"{self.KEY_PREFIX}{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def get(self, namespace: str, params: dict) -> Optional[Any]:
+        if self.backend is None:
+            return None
+        value = self.backend.get(self._key(namespace, params))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, namespace: str, params: dict, result: Any):
+        if self.backend is None:
+            return
+        value = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode()
+        self.backend.set(self._key(namespace, params), value)
+
+    def invalidate(self, namespace: str):
+        if self.backend is not None:
+            self.backend.clear(f"{self.KEY_PREFIX}{namespace}:")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+
+def _build_backend():
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        return MemoryBackend(
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+            ttl=settings.RESULT_CACHE_TTL,
+        )
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.RESULT_CACHE_REDIS_URL, ttl=settings.RESULT_CACHE_TTL)
+    return None
+
+
+result_cache = ResultCache(_build_backend())